@@ -1,533 +1,106 @@
-import base64
-import numbers
+import hashlib
+import json
 import sqlite3
+import threading
 from datetime import datetime
 from pathlib import Path
 import pandas as pd
 import streamlit as st
 import streamlit.components.v1 as components
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from backlog_db import (
+    BACKLOG_TEAMS,
+    CROSS_VIEW_SORTS,
+    DEPENDENCY_TEAMS,
+    PLACEHOLDER_OPTION,
+    PROFILE_ENABLED,
+    PROFILE_LOG_PATH,
+    RerunProfile,
+    SPRINTS,
+    backlog_label,
+    clear_csv_import_progress,
+    count_backlogs,
+    count_cross_view_backlogs,
+    count_meeting_notes,
+    csv_import_settings,
+    decode_pasted_image,
+    fetch_backlog_dependency_id_sets,
+    fetch_backlog_dependency_ids,
+    fetch_backlog_label_index,
+    fetch_backlog_page,
+    fetch_backlogs_for_dependency,
+    fetch_backlogs_for_sub_backlog,
+    fetch_cross_view_page,
+    fetch_csv_import_progress,
+    fetch_dependencies,
+    fetch_dependencies_for_backlog,
+    fetch_dependency_label_index,
+    fetch_evaluation_label_index,
+    fetch_evaluation_rows,
+    fetch_evaluations,
+    fetch_image,
+    fetch_image_thumbnail,
+    fetch_meeting_note_feed,
+    fetch_meeting_note_link_id_sets,
+    fetch_meeting_notes_for_backlog,
+    fetch_meeting_notes_for_dependency,
+    fetch_meeting_notes_for_evaluation,
+    fetch_meeting_notes_for_sub_backlog,
+    fetch_meeting_notes_for_theme,
+    fetch_meetings,
+    fetch_sprint_team_rollup,
+    fetch_sub_backlog_ids_for_backlog,
+    fetch_sub_backlog_label_index,
+    fetch_sub_backlogs,
+    fetch_team_capacities,
+    fetch_theme_label_index,
+    fetch_theme_rows,
+    fetch_themes,
+    fetch_todo_meeting_notes,
+    get_profile_state,
+    import_backlog_csv,
+    import_dependency_csv,
+    init_db,
+    insert_backlog,
+    insert_dependency,
+    insert_evaluation,
+    insert_meeting,
+    insert_meeting_note,
+    insert_sub_backlog,
+    insert_theme,
+    merge_backlogs,
+    normalize_choice,
+    parse_meeting_date,
+    prepare_image,
+    preview_image,
+    read_csv_preview,
+    search_item_ids,
+    split_backlog,
+    store_image,
+    stream_csv_import,
+    sync_links,
+    update_meeting_note_statuses,
+    upsert_backlog_dependencies,
+    upsert_backlog_sub_backlogs,
+    upsert_meeting_note_backlogs,
+    upsert_meeting_note_dependencies,
+    upsert_meeting_note_evaluations,
+    upsert_meeting_note_themes,
+    upsert_sub_backlog_backlogs,
+    upsert_team_capacity,
+    with_placeholder,
+    write_conn,
+)
 
 
-DB_PATH = "backlog.db"
-BACKLOG_TEAMS = ["Team 1", "Team 2"]
-DEPENDENCY_TEAMS = ["PC", "BC", "CC", "Integration", "Auth", "Digital"]
-SPRINTS = [f"Sprint {i}" for i in range(1, 12)]
-PLACEHOLDER_OPTION = "Choose options"
-
-
-def with_placeholder(options):
-    return [PLACEHOLDER_OPTION] + list(options)
-
-
-def normalize_choice(value):
-    return None if value == PLACEHOLDER_OPTION else value
-
-
-def get_conn():
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
-    return conn
-
-
-def init_db():
-    with get_conn() as conn:
-        conn.execute("PRAGMA foreign_keys = OFF")
-        conn.executescript(
-            """
-            CREATE TABLE IF NOT EXISTS backlog (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                task TEXT NOT NULL,
-                task_details TEXT,
-                lob TEXT,
-                image_blob BLOB,
-                theme TEXT NOT NULL,
-                evaluation TEXT,
-                estimation INTEGER,
-                team TEXT,
-                sprint TEXT
-            );
-
-            CREATE TABLE IF NOT EXISTS dependency (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                task TEXT NOT NULL,
-                sub_task TEXT,
-                team TEXT NOT NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS theme (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE
-            );
-
-            CREATE TABLE IF NOT EXISTS evaluation (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL UNIQUE,
-                note TEXT
-            );
-
-            CREATE TABLE IF NOT EXISTS backlog_dependency (
-                backlog_id INTEGER NOT NULL,
-                dependency_id INTEGER NOT NULL,
-                PRIMARY KEY (backlog_id, dependency_id),
-                FOREIGN KEY (backlog_id) REFERENCES backlog(id) ON DELETE CASCADE,
-                FOREIGN KEY (dependency_id) REFERENCES dependency(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS sub_backlog (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                backlog_id INTEGER,
-                title TEXT NOT NULL,
-                note TEXT
-            );
-
-            CREATE TABLE IF NOT EXISTS sub_backlog_backlog (
-                sub_backlog_id INTEGER NOT NULL,
-                backlog_id INTEGER NOT NULL,
-                PRIMARY KEY (sub_backlog_id, backlog_id),
-                FOREIGN KEY (sub_backlog_id) REFERENCES sub_backlog(id) ON DELETE CASCADE,
-                FOREIGN KEY (backlog_id) REFERENCES backlog(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS meeting (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                meeting_datetime TEXT NOT NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS meeting_note (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                meeting_id INTEGER,
-                meeting_date TEXT,
-                topic TEXT,
-                note_type TEXT NOT NULL DEFAULT '',
-                note TEXT NOT NULL,
-                status TEXT NOT NULL DEFAULT 'open',
-                FOREIGN KEY (meeting_id) REFERENCES meeting(id) ON DELETE SET NULL
-            );
-
-            CREATE TABLE IF NOT EXISTS meeting_note_backlog (
-                meeting_note_id INTEGER NOT NULL,
-                backlog_id INTEGER NOT NULL,
-                PRIMARY KEY (meeting_note_id, backlog_id),
-                FOREIGN KEY (meeting_note_id) REFERENCES meeting_note(id) ON DELETE CASCADE,
-                FOREIGN KEY (backlog_id) REFERENCES backlog(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS meeting_note_dependency (
-                meeting_note_id INTEGER NOT NULL,
-                dependency_id INTEGER NOT NULL,
-                PRIMARY KEY (meeting_note_id, dependency_id),
-                FOREIGN KEY (meeting_note_id) REFERENCES meeting_note(id) ON DELETE CASCADE,
-                FOREIGN KEY (dependency_id) REFERENCES dependency(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS meeting_note_theme (
-                meeting_note_id INTEGER NOT NULL,
-                theme_id INTEGER NOT NULL,
-                PRIMARY KEY (meeting_note_id, theme_id),
-                FOREIGN KEY (meeting_note_id) REFERENCES meeting_note(id) ON DELETE CASCADE,
-                FOREIGN KEY (theme_id) REFERENCES theme(id) ON DELETE CASCADE
-            );
-
-            CREATE TABLE IF NOT EXISTS meeting_note_evaluation (
-                meeting_note_id INTEGER NOT NULL,
-                evaluation_id INTEGER NOT NULL,
-                PRIMARY KEY (meeting_note_id, evaluation_id),
-                FOREIGN KEY (meeting_note_id) REFERENCES meeting_note(id) ON DELETE CASCADE,
-                FOREIGN KEY (evaluation_id) REFERENCES evaluation(id) ON DELETE CASCADE
-            );
-            """
-        )
-        backlog_info = conn.execute("PRAGMA table_info(backlog)").fetchall()
-        backlog_columns = [row["name"] for row in backlog_info]
-        sub_task_info = next(
-            (row for row in backlog_info if row["name"] == "task_details"),
-            None,
-        )
-        if "task" not in backlog_columns:
-            conn.execute("ALTER TABLE backlog ADD COLUMN task TEXT NOT NULL DEFAULT ''")
-        if "task_details" not in backlog_columns:
-            conn.execute("ALTER TABLE backlog ADD COLUMN task_details TEXT")
-            if "sub_task" in backlog_columns:
-                conn.execute(
-                    """
-                    UPDATE backlog
-                    SET task_details = sub_task
-                    WHERE (task_details IS NULL OR TRIM(task_details) = '')
-                        AND sub_task IS NOT NULL
-                        AND TRIM(sub_task) != ''
-                    """
-                )
-        if "lob" not in backlog_columns:
-            conn.execute("ALTER TABLE backlog ADD COLUMN lob TEXT")
-        if "image_blob" not in backlog_columns:
-            conn.execute("ALTER TABLE backlog ADD COLUMN image_blob BLOB")
-        if "evaluation" not in backlog_columns:
-            conn.execute("ALTER TABLE backlog ADD COLUMN evaluation TEXT")
-        if sub_task_info and sub_task_info["notnull"]:
-            conn.executescript(
-                """
-                CREATE TABLE backlog_new (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    task TEXT NOT NULL,
-                    task_details TEXT,
-                    lob TEXT,
-                    image_blob BLOB,
-                    theme TEXT NOT NULL,
-                    evaluation TEXT,
-                    estimation INTEGER,
-                    team TEXT,
-                    sprint TEXT
-                );
-                INSERT INTO backlog_new (id, task, task_details, lob, image_blob, theme, evaluation, estimation, team, sprint)
-                SELECT id, task, task_details, lob, image_blob, theme, evaluation, estimation, team, sprint FROM backlog;
-                DROP TABLE backlog;
-                ALTER TABLE backlog_new RENAME TO backlog;
-                """
-            )
-        if "name" in backlog_columns:
-            conn.execute(
-                "UPDATE backlog SET task = name WHERE task = '' AND name IS NOT NULL"
-            )
-        estimation_info = next(
-            (row for row in backlog_info if row["name"] == "estimation"), None
-        )
-        if estimation_info and (
-            estimation_info["type"].upper() != "INTEGER" or estimation_info["notnull"]
-        ):
-            conn.executescript(
-                """
-                CREATE TABLE backlog_new (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    task TEXT NOT NULL,
-                    task_details TEXT,
-                    lob TEXT,
-                    image_blob BLOB,
-                    theme TEXT NOT NULL,
-                    evaluation TEXT,
-                    estimation INTEGER,
-                    team TEXT,
-                    sprint TEXT
-                );
-                INSERT INTO backlog_new (id, task, task_details, lob, image_blob, theme, evaluation, estimation, team, sprint)
-                SELECT id, task, task_details, lob, image_blob, theme, evaluation, CAST(estimation AS INTEGER), team, sprint FROM backlog;
-                DROP TABLE backlog;
-                ALTER TABLE backlog_new RENAME TO backlog;
-                """
-            )
-        backlog_info = conn.execute("PRAGMA table_info(backlog)").fetchall()
-        team_info = next((row for row in backlog_info if row["name"] == "team"), None)
-        sprint_info = next((row for row in backlog_info if row["name"] == "sprint"), None)
-        sub_task_info = next(
-            (row for row in backlog_info if row["name"] == "task_details"),
-            None,
-        )
-        estimation_info = next(
-            (row for row in backlog_info if row["name"] == "estimation"), None
-        )
-        if (
-            (team_info and team_info["notnull"])
-            or (sprint_info and sprint_info["notnull"])
-            or (sub_task_info and sub_task_info["notnull"])
-            or (estimation_info and estimation_info["type"].upper() != "INTEGER")
-            or (estimation_info and estimation_info["notnull"])
-        ):
-            conn.executescript(
-                """
-                CREATE TABLE backlog_new (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    task TEXT NOT NULL,
-                    task_details TEXT,
-                    lob TEXT,
-                    image_blob BLOB,
-                    theme TEXT NOT NULL,
-                    evaluation TEXT,
-                    estimation INTEGER,
-                    team TEXT,
-                    sprint TEXT
-                );
-                INSERT INTO backlog_new (id, task, task_details, lob, image_blob, theme, evaluation, estimation, team, sprint)
-                SELECT id, task, task_details, lob, image_blob, theme, evaluation, CAST(estimation AS INTEGER), team, sprint FROM backlog;
-                DROP TABLE backlog;
-                ALTER TABLE backlog_new RENAME TO backlog;
-                """
-            )
-
-        dependency_info = conn.execute("PRAGMA table_info(dependency)").fetchall()
-        dependency_columns = [row["name"] for row in dependency_info]
-        if "task" not in dependency_columns:
-            conn.execute("ALTER TABLE dependency ADD COLUMN task TEXT NOT NULL DEFAULT ''")
-        if "sub_task" not in dependency_columns:
-            conn.execute("ALTER TABLE dependency ADD COLUMN sub_task TEXT")
-        if "name" in dependency_columns and "task" in dependency_columns:
-            conn.execute(
-                "UPDATE dependency SET task = name WHERE task = '' AND name IS NOT NULL"
-            )
-        if "name" in dependency_columns or "sprint" in dependency_columns:
-            conn.executescript(
-                """
-                CREATE TABLE dependency_new (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    task TEXT NOT NULL,
-                    sub_task TEXT,
-                    team TEXT NOT NULL
-                );
-                INSERT INTO dependency_new (id, task, sub_task, team)
-                SELECT id, task, sub_task, team FROM dependency;
-                DROP TABLE dependency;
-                ALTER TABLE dependency_new RENAME TO dependency;
-                """
-            )
-        evaluation_info = conn.execute("PRAGMA table_info(evaluation)").fetchall()
-        evaluation_columns = [row["name"] for row in evaluation_info]
-        if "note" not in evaluation_columns:
-            conn.execute("ALTER TABLE evaluation ADD COLUMN note TEXT")
-
-        legacy_sub_task = conn.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name='sub_task'"
-        ).fetchone()
-        sub_backlog_exists = conn.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name='sub_backlog'"
-        ).fetchone()
-        if legacy_sub_task and not sub_backlog_exists:
-            conn.execute("ALTER TABLE sub_task RENAME TO sub_backlog")
-
-        sub_backlog_info = conn.execute("PRAGMA table_info(sub_backlog)").fetchall()
-        sub_backlog_columns = [row["name"] for row in sub_backlog_info]
-        backlog_id_info = next(
-            (row for row in sub_backlog_info if row["name"] == "backlog_id"),
-            None,
-        )
-        if backlog_id_info and backlog_id_info["notnull"]:
-            conn.executescript(
-                """
-                CREATE TABLE sub_backlog_new (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    backlog_id INTEGER,
-                    title TEXT NOT NULL,
-                    note TEXT
-                );
-                INSERT INTO sub_backlog_new (id, backlog_id, title, note)
-                SELECT id, backlog_id, COALESCE(title, ''), note FROM sub_backlog;
-                DROP TABLE sub_backlog;
-                ALTER TABLE sub_backlog_new RENAME TO sub_backlog;
-                """
-            )
-            sub_backlog_info = conn.execute("PRAGMA table_info(sub_backlog)").fetchall()
-            sub_backlog_columns = [row["name"] for row in sub_backlog_info]
-        if "backlog_id" not in sub_backlog_columns:
-            conn.execute("ALTER TABLE sub_backlog ADD COLUMN backlog_id INTEGER")
-        if "title" not in sub_backlog_columns:
-            conn.execute(
-                "ALTER TABLE sub_backlog ADD COLUMN title TEXT NOT NULL DEFAULT ''"
-            )
-        if "note" not in sub_backlog_columns:
-            conn.execute("ALTER TABLE sub_backlog ADD COLUMN note TEXT")
-
-        sub_backlog_backlog_info = conn.execute(
-            "PRAGMA table_info(sub_backlog_backlog)"
-        ).fetchall()
-        if not sub_backlog_backlog_info:
-            conn.execute(
-                """
-                CREATE TABLE IF NOT EXISTS sub_backlog_backlog (
-                    sub_backlog_id INTEGER NOT NULL,
-                    backlog_id INTEGER NOT NULL,
-                    PRIMARY KEY (sub_backlog_id, backlog_id),
-                    FOREIGN KEY (sub_backlog_id) REFERENCES sub_backlog(id) ON DELETE CASCADE,
-                    FOREIGN KEY (backlog_id) REFERENCES backlog(id) ON DELETE CASCADE
-                )
-                """
-            )
-        if "backlog_id" in sub_backlog_columns:
-            conn.execute(
-                """
-                INSERT OR IGNORE INTO sub_backlog_backlog (sub_backlog_id, backlog_id)
-                SELECT id, backlog_id
-                FROM sub_backlog
-                WHERE backlog_id IS NOT NULL
-                """
-            )
-
-        meeting_note_info = conn.execute("PRAGMA table_info(meeting_note)").fetchall()
-        meeting_note_columns = [row["name"] for row in meeting_note_info]
-        if "meeting_id" not in meeting_note_columns:
-            conn.execute("ALTER TABLE meeting_note ADD COLUMN meeting_id INTEGER")
-        if "meeting_date" not in meeting_note_columns:
-            conn.execute("ALTER TABLE meeting_note ADD COLUMN meeting_date TEXT")
-        if "topic" not in meeting_note_columns:
-            conn.execute("ALTER TABLE meeting_note ADD COLUMN topic TEXT")
-        if "note" not in meeting_note_columns:
-            conn.execute("ALTER TABLE meeting_note ADD COLUMN note TEXT NOT NULL DEFAULT ''")
-        if "note_type" not in meeting_note_columns:
-            conn.execute("ALTER TABLE meeting_note ADD COLUMN note_type TEXT NOT NULL DEFAULT ''")
-        if "status" not in meeting_note_columns:
-            conn.execute("ALTER TABLE meeting_note ADD COLUMN status TEXT NOT NULL DEFAULT 'open'")
-        conn.execute(
-            """
-            INSERT OR IGNORE INTO theme (name)
-            SELECT DISTINCT theme FROM backlog
-            WHERE theme IS NOT NULL AND TRIM(theme) != ''
-            """
-        )
-        conn.execute(
-            """
-            INSERT OR IGNORE INTO evaluation (name)
-            SELECT DISTINCT evaluation FROM backlog
-            WHERE evaluation IS NOT NULL AND TRIM(evaluation) != ''
-            """
-        )
-        conn.execute("PRAGMA foreign_keys = ON")
-
-
-def fetch_themes():
-    with get_conn() as conn:
-        rows = conn.execute("SELECT name FROM theme ORDER BY name").fetchall()
-    return [row["name"] for row in rows]
-
-def fetch_evaluations():
-    with get_conn() as conn:
-        rows = conn.execute("SELECT name FROM evaluation ORDER BY name").fetchall()
-    return [row["name"] for row in rows]
-
-
-def fetch_theme_rows():
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT
-                t.id,
-                t.name,
-                COUNT(b.id) AS backlog_count
-            FROM theme t
-            LEFT JOIN backlog b ON b.theme = t.name
-            GROUP BY t.id, t.name
-            ORDER BY t.name
-            """
-        ).fetchall()
-    return rows
-
-def fetch_evaluation_rows():
-    with get_conn() as conn:
-        rows = conn.execute("SELECT * FROM evaluation ORDER BY name").fetchall()
-    return rows
-
-
-def fetch_meeting_notes():
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT id, meeting_id, meeting_date, topic, note_type, note, status
-            FROM meeting_note
-            ORDER BY
-                CASE WHEN meeting_date IS NULL OR TRIM(meeting_date) = '' THEN 1 ELSE 0 END,
-                meeting_date DESC,
-                id DESC
-            """
-        ).fetchall()
-    return rows
-
-
-def fetch_todo_meeting_notes(include_completed=False):
-    status_filter = ""
-    if include_completed:
-        status_filter = "AND LOWER(status) IN ('open', 'in-progress', 'completed')"
-    else:
-        status_filter = "AND LOWER(status) IN ('open', 'in-progress')"
-    with get_conn() as conn:
-        rows = conn.execute(
-            f"""
-            SELECT id, meeting_id, meeting_date, topic, note_type, note, status
-            FROM meeting_note
-            WHERE LOWER(note_type) = 'todo'
-                {status_filter}
-            ORDER BY
-                CASE WHEN meeting_date IS NULL OR TRIM(meeting_date) = '' THEN 1 ELSE 0 END,
-                meeting_date DESC,
-                id DESC
-            """
-        ).fetchall()
-    return rows
-
-
-def fetch_meeting_notes_for_backlog(backlog_id):
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT mn.id, mn.meeting_id, mn.meeting_date, mn.topic, mn.note_type, mn.note, mn.status
-            FROM meeting_note mn
-            INNER JOIN meeting_note_backlog mnb ON mnb.meeting_note_id = mn.id
-            WHERE mnb.backlog_id = ?
-            ORDER BY mn.meeting_date DESC, mn.id DESC
-            """,
-            (backlog_id,),
-        ).fetchall()
-    return rows
-
-
-def fetch_meeting_notes_for_dependency(dependency_id):
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT mn.id, mn.meeting_id, mn.meeting_date, mn.topic, mn.note_type, mn.note, mn.status
-            FROM meeting_note mn
-            INNER JOIN meeting_note_dependency mnd ON mnd.meeting_note_id = mn.id
-            WHERE mnd.dependency_id = ?
-            ORDER BY mn.meeting_date DESC, mn.id DESC
-            """,
-            (dependency_id,),
-        ).fetchall()
-    return rows
-
-
-def fetch_meeting_notes_for_theme(theme_id):
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT mn.id, mn.meeting_id, mn.meeting_date, mn.topic, mn.note_type, mn.note, mn.status
-            FROM meeting_note mn
-            INNER JOIN meeting_note_theme mnt ON mnt.meeting_note_id = mn.id
-            WHERE mnt.theme_id = ?
-            ORDER BY mn.meeting_date DESC, mn.id DESC
-            """,
-            (theme_id,),
-        ).fetchall()
-    return rows
-
-
-def fetch_meeting_notes_for_evaluation(evaluation_id):
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT mn.id, mn.meeting_id, mn.meeting_date, mn.topic, mn.note_type, mn.note, mn.status
-            FROM meeting_note mn
-            INNER JOIN meeting_note_evaluation mne ON mne.meeting_note_id = mn.id
-            WHERE mne.evaluation_id = ?
-            ORDER BY mn.meeting_date DESC, mn.id DESC
-            """,
-            (evaluation_id,),
-        ).fetchall()
-    return rows
-
-
-def fetch_meeting_notes_for_sub_backlog(sub_backlog_id):
-    backlog_ids = fetch_backlog_ids_for_sub_backlog(sub_backlog_id)
-    if not backlog_ids:
-        return []
-    placeholders = ",".join(["?"] * len(backlog_ids))
-    with get_conn() as conn:
-        rows = conn.execute(
-            f"""
-            SELECT DISTINCT mn.id, mn.meeting_id, mn.meeting_date, mn.topic, mn.note_type, mn.note, mn.status
-            FROM meeting_note mn
-            INNER JOIN meeting_note_backlog mnb ON mnb.meeting_note_id = mn.id
-            WHERE mnb.backlog_id IN ({placeholders})
-            ORDER BY mn.meeting_date DESC, mn.id DESC
-            """,
-            tuple(backlog_ids),
-        ).fetchall()
-    return rows
+BACKLOG_PAGE_SIZES = [25, 50, 100, 250]
+PASTE_IMAGE_MAX_DIMENSION = 1600
+PASTE_IMAGE_MIME_TYPE = "image/webp"
+PASTE_IMAGE_QUALITY = 0.82
+PROFILE_PANEL_STATEMENTS = 20
+LABEL_SEARCH_THRESHOLD = 500
+MEETING_NOTE_FEED_PAGE_SIZE = 100
+MEETING_NOTE_STATUSES = ["open", "in-progress", "completed"]
 
 
 def render_meeting_notes_table(rows):
@@ -539,513 +112,305 @@ def render_meeting_notes_table(rows):
         st.info("No associated meeting notes yet.")
 
 
-def fetch_meetings():
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT id, title, meeting_datetime
-            FROM meeting
-            ORDER BY meeting_datetime DESC, id DESC
-            """
-        ).fetchall()
-    return rows
-
-
-
-
-def parse_meeting_date(value):
-    if not value:
-        return datetime.now().date()
-    try:
-        return datetime.fromisoformat(value).date()
-    except ValueError:
-        pass
-    try:
-        return datetime.strptime(value.split()[0], "%Y-%m-%d").date()
-    except ValueError:
-        return datetime.now().date()
-
-
-def fetch_dependencies():
-    with get_conn() as conn:
-        rows = conn.execute(
-            "SELECT * FROM dependency ORDER BY id"
-        ).fetchall()
-    return rows
-
-
-def fetch_backlogs():
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT
-                b.id,
-                b.task,
-                b.task_details,
-                b.lob,
-                b.image_blob,
-                b.theme,
-                b.evaluation,
-                b.estimation,
-                b.team,
-                b.sprint,
-                COUNT(d.id) AS dependency_count
-            FROM backlog b
-            LEFT JOIN backlog_dependency bd ON b.id = bd.backlog_id
-            LEFT JOIN dependency d ON d.id = bd.dependency_id
-            GROUP BY b.id
-            ORDER BY b.id
-            """
-        ).fetchall()
-    return rows
-
-
-def fetch_backlog_dependency_ids(backlog_id):
-    with get_conn() as conn:
-        rows = conn.execute(
-            "SELECT dependency_id FROM backlog_dependency WHERE backlog_id = ?",
-            (backlog_id,),
-        ).fetchall()
-    return [row["dependency_id"] for row in rows]
-
-
-def fetch_backlogs_for_dependency(dependency_id):
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT
-                b.id,
-                b.task,
-                b.task_details,
-                b.theme,
-                b.evaluation,
-                b.estimation,
-                b.team,
-                b.sprint
-            FROM backlog b
-            INNER JOIN backlog_dependency bd ON b.id = bd.backlog_id
-            WHERE bd.dependency_id = ?
-            ORDER BY b.id
-            """,
-            (dependency_id,),
-        ).fetchall()
-    return rows
-
-
-def fetch_sub_backlogs():
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT
-                st.id,
-                st.title,
-                st.note,
-                GROUP_CONCAT(b.task, ' | ') AS backlog_tasks
-            FROM sub_backlog st
-            LEFT JOIN sub_backlog_backlog sbb ON sbb.sub_backlog_id = st.id
-            LEFT JOIN backlog b ON b.id = sbb.backlog_id
-            GROUP BY st.id, st.title, st.note
-            ORDER BY st.id
-            """
-        ).fetchall()
-    return rows
-
-
-def fetch_backlog_dependency_rows():
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT
-                b.id AS backlog_id,
-                b.task AS backlog_task,
-                b.task_details AS backlog_task_details,
-                b.theme AS backlog_theme,
-                b.evaluation AS backlog_evaluation,
-                b.team AS backlog_team,
-                b.sprint AS backlog_sprint,
-                d.id AS dependency_id,
-                d.task AS dependency_task,
-                d.sub_task AS dependency_sub_task,
-                d.team AS dependency_team
-            FROM backlog b
-            LEFT JOIN backlog_dependency bd ON b.id = bd.backlog_id
-            LEFT JOIN dependency d ON d.id = bd.dependency_id
-            ORDER BY b.id, d.id
-            """
-        ).fetchall()
-    return rows
-
-
-def fetch_backlog_sub_backlog_rows():
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT
-                b.id AS backlog_id,
-                b.task AS backlog_task,
-                b.task_details AS backlog_task_details,
-                b.theme AS backlog_theme,
-                b.evaluation AS backlog_evaluation,
-                b.team AS backlog_team,
-                b.sprint AS backlog_sprint,
-                sb.id AS sub_backlog_id,
-                sb.title AS sub_backlog_title,
-                sb.note AS sub_backlog_note
-            FROM backlog b
-            LEFT JOIN sub_backlog_backlog sbb ON b.id = sbb.backlog_id
-            LEFT JOIN sub_backlog sb ON sb.id = sbb.sub_backlog_id
-            ORDER BY b.id, sb.id
-            """
-        ).fetchall()
-    return rows
-
-
-def fetch_backlog_sub_backlog_dependency_rows():
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT
-                b.id AS backlog_id,
-                b.task AS backlog_task,
-                b.task_details AS backlog_task_details,
-                b.theme AS backlog_theme,
-                b.evaluation AS backlog_evaluation,
-                b.team AS backlog_team,
-                b.sprint AS backlog_sprint,
-                sb.id AS sub_backlog_id,
-                sb.title AS sub_backlog_title,
-                sb.note AS sub_backlog_note,
-                d.id AS dependency_id,
-                d.task AS dependency_task,
-                d.sub_task AS dependency_sub_task,
-                d.team AS dependency_team
-            FROM backlog b
-            LEFT JOIN sub_backlog_backlog sbb ON b.id = sbb.backlog_id
-            LEFT JOIN sub_backlog sb ON sb.id = sbb.sub_backlog_id
-            LEFT JOIN backlog_dependency bd ON b.id = bd.backlog_id
-            LEFT JOIN dependency d ON d.id = bd.dependency_id
-            ORDER BY b.id, sb.id, d.id
-            """
-        ).fetchall()
-    return rows
-
-
-def fetch_backlogs_for_sub_backlog(sub_backlog_id):
-    with get_conn() as conn:
-        rows = conn.execute(
-            """
-            SELECT
-                b.id,
-                b.task,
-                b.task_details,
-                b.lob,
-                b.theme,
-                b.evaluation,
-                b.estimation,
-                b.team,
-                b.sprint
-            FROM backlog b
-            INNER JOIN sub_backlog_backlog sbb ON b.id = sbb.backlog_id
-            WHERE sbb.sub_backlog_id = ?
-            ORDER BY b.id
-            """,
-            (sub_backlog_id,),
-        ).fetchall()
-    return rows
-
-
-def fetch_sub_backlog_ids_for_backlog(backlog_id):
-    with get_conn() as conn:
-        rows = conn.execute(
-            "SELECT sub_backlog_id FROM sub_backlog_backlog WHERE backlog_id = ?",
-            (backlog_id,),
-        ).fetchall()
-    return [row["sub_backlog_id"] for row in rows]
-
-
-def fetch_backlog_ids_for_sub_backlog(sub_backlog_id):
-    with get_conn() as conn:
-        rows = conn.execute(
-            "SELECT backlog_id FROM sub_backlog_backlog WHERE sub_backlog_id = ?",
-            (sub_backlog_id,),
-        ).fetchall()
-    return [row["backlog_id"] for row in rows]
-
-
-def fetch_meeting_note_backlog_ids(meeting_note_id):
-    with get_conn() as conn:
-        rows = conn.execute(
-            "SELECT backlog_id FROM meeting_note_backlog WHERE meeting_note_id = ?",
-            (meeting_note_id,),
-        ).fetchall()
-    return [row["backlog_id"] for row in rows]
-
-
-def fetch_meeting_note_dependency_ids(meeting_note_id):
-    with get_conn() as conn:
-        rows = conn.execute(
-            "SELECT dependency_id FROM meeting_note_dependency WHERE meeting_note_id = ?",
-            (meeting_note_id,),
-        ).fetchall()
-    return [row["dependency_id"] for row in rows]
-
-
-def fetch_meeting_note_theme_ids(meeting_note_id):
-    with get_conn() as conn:
-        rows = conn.execute(
-            "SELECT theme_id FROM meeting_note_theme WHERE meeting_note_id = ?",
-            (meeting_note_id,),
-        ).fetchall()
-    return [row["theme_id"] for row in rows]
-
-
-def fetch_meeting_note_evaluation_ids(meeting_note_id):
-    with get_conn() as conn:
-        rows = conn.execute(
-            "SELECT evaluation_id FROM meeting_note_evaluation WHERE meeting_note_id = ?",
-            (meeting_note_id,),
-        ).fetchall()
-    return [row["evaluation_id"] for row in rows]
-
-
-def insert_dependency(conn, task, sub_task, team):
-    cursor = conn.execute(
-        "INSERT INTO dependency (task, sub_task, team) VALUES (?, ?, ?)",
-        (task, sub_task, team),
+def label_search_box(index, noun, key):
+    # Large option sets are searched on the server and only the matches are
+    # sent to the browser. The box sits outside the form so typing reruns.
+    if len(index) <= LABEL_SEARCH_THRESHOLD:
+        return None
+    return st.text_input(
+        f"Search {noun}",
+        key=f"{key}_search",
+        placeholder=f"Type to narrow {len(index)} {noun}",
     )
-    return cursor.lastrowid
 
 
-def insert_theme(conn, name):
-    cursor = conn.execute(
-        "INSERT OR IGNORE INTO theme (name) VALUES (?)",
-        (name,),
-    )
-    return cursor.lastrowid
-
-def insert_evaluation(conn, name, note=None):
-    cursor = conn.execute(
-        "INSERT OR IGNORE INTO evaluation (name, note) VALUES (?, ?)",
-        (name, note),
-    )
-    return cursor.lastrowid
-
-
-def insert_meeting_note(conn, meeting_id, meeting_date, topic, note_type, note, status="open"):
-    cursor = conn.execute(
-        """
-        INSERT INTO meeting_note (meeting_id, meeting_date, topic, note_type, note, status)
-        VALUES (?, ?, ?, ?, ?, ?)
-        """,
-        (meeting_id, meeting_date, topic, note_type, note, status),
+def label_multiselect(label, index, key, search=None, default_ids=()):
+    default = index.labels_for(default_ids)
+    if search is None:
+        options = index.labels
+    else:
+        selected = st.session_state.get(key, default)
+        options = list(dict.fromkeys([*default, *selected, *index.search(search)]))
+    selected_labels = st.multiselect(
+        label,
+        options=options,
+        default=default,
+        placeholder=PLACEHOLDER_OPTION,
+        key=key,
     )
-    return cursor.lastrowid
+    return index.ids_for(selected_labels)
 
 
-def insert_meeting(conn, title, meeting_datetime):
-    cursor = conn.execute(
-        "INSERT INTO meeting (title, meeting_datetime) VALUES (?, ?)",
-        (title, meeting_datetime),
-    )
-    return cursor.lastrowid
+_PASTE_COMPONENT = components.declare_component(
+    "paste_image",
+    path=str(Path(__file__).parent / "components" / "paste_image"),
+)
 
 
-def insert_sub_backlog(conn, title, note):
-    cursor = conn.execute(
-        "INSERT INTO sub_backlog (title, note) VALUES (?, ?)",
-        (title, note),
+def paste_image_component(
+    label,
+    key,
+    max_dimension=PASTE_IMAGE_MAX_DIMENSION,
+    mime_type=PASTE_IMAGE_MIME_TYPE,
+    quality=PASTE_IMAGE_QUALITY,
+):
+    st.caption(label)
+    value = _PASTE_COMPONENT(
+        key=key,
+        default=None,
+        max_dimension=max_dimension,
+        mime_type=mime_type,
+        quality=quality,
     )
-    return cursor.lastrowid
+    if isinstance(value, dict):
+        previous_meta = st.session_state.get(f"{key}_meta") or {}
+        if value.get("pastedAt") is None or value.get("pastedAt") != previous_meta.get(
+            "pasted_at"
+        ):
+            image_bytes, image_meta, error = decode_pasted_image(value, max_dimension)
+            if error:
+                st.warning(error)
+            else:
+                st.session_state[f"{key}_data"] = image_bytes
+                st.session_state[f"{key}_meta"] = image_meta
+    return st.session_state.get(f"{key}_data")
 
 
-def upsert_sub_backlog_backlogs(conn, sub_backlog_id, backlog_ids):
-    conn.execute(
-        "DELETE FROM sub_backlog_backlog WHERE sub_backlog_id = ?",
-        (sub_backlog_id,),
-    )
-    for backlog_id in backlog_ids:
-        conn.execute(
-            """
-            INSERT OR IGNORE INTO sub_backlog_backlog (sub_backlog_id, backlog_id)
-            VALUES (?, ?)
-            """,
-            (sub_backlog_id, backlog_id),
+def pasted_image_meta(key):
+    return st.session_state.get(f"{key}_meta")
+
+
+def uploaded_file_hash(uploaded_file):
+    hashes = st.session_state.setdefault("uploaded_file_hashes", {})
+    if uploaded_file.file_id not in hashes:
+        digest = hashlib.sha256()
+        uploaded_file.seek(0)
+        for block in iter(lambda: uploaded_file.read(1 << 20), b""):
+            digest.update(block)
+        hashes[uploaded_file.file_id] = digest.hexdigest()
+    return hashes[uploaded_file.file_id]
+
+
+def render_csv_import_resume(uploaded_file, target, mapping, options=None):
+    # Returns whether importing with the current settings is allowed.
+    file_hash = uploaded_file_hash(uploaded_file)
+    progress = fetch_csv_import_progress(file_hash, target)
+    if progress is None:
+        return True
+    settings_match = progress["settings"] == csv_import_settings(mapping, options)
+    if settings_match:
+        st.warning(
+            f"A previous import of this file stopped after {progress['rows_done']} rows "
+            f"({progress['imported']} imported). Importing again resumes from there."
         )
-
-
-def upsert_backlog_sub_backlogs(conn, backlog_id, sub_backlog_ids):
-    conn.execute(
-        "DELETE FROM sub_backlog_backlog WHERE backlog_id = ?",
-        (backlog_id,),
-    )
-    for sub_backlog_id in sub_backlog_ids:
-        conn.execute(
-            """
-            INSERT OR IGNORE INTO sub_backlog_backlog (sub_backlog_id, backlog_id)
-            VALUES (?, ?)
-            """,
-            (sub_backlog_id, backlog_id),
+    else:
+        st.warning(
+            f"A previous import of this file stopped after {progress['rows_done']} rows "
+            f"({progress['imported']} imported) with a different mapping or options. "
+            "Those rows are already saved, so it cannot continue with the current "
+            "settings. Restore the earlier settings to resume, or start over."
         )
-
-
-def upsert_meeting_note_backlogs(conn, meeting_note_id, backlog_ids):
-    conn.execute(
-        "DELETE FROM meeting_note_backlog WHERE meeting_note_id = ?",
-        (meeting_note_id,),
-    )
-    for backlog_id in backlog_ids:
-        conn.execute(
-            "INSERT OR IGNORE INTO meeting_note_backlog (meeting_note_id, backlog_id) VALUES (?, ?)",
-            (meeting_note_id, backlog_id),
+    if st.button("Start over", key=f"restart_{target}_import_btn"):
+        clear_csv_import_progress(file_hash, target)
+        st.session_state[f"{target}_csv_import_report"] = (
+            "Cleared the saved import progress.",
+            f"The {progress['imported']} rows imported by the earlier attempt are "
+            "still in the database; importing again processes the whole file.",
         )
+        st.rerun()
+    return settings_match
 
 
-def upsert_meeting_note_dependencies(conn, meeting_note_id, dependency_ids):
-    conn.execute(
-        "DELETE FROM meeting_note_dependency WHERE meeting_note_id = ?",
-        (meeting_note_id,),
-    )
-    for dependency_id in dependency_ids:
-        conn.execute(
-            "INSERT OR IGNORE INTO meeting_note_dependency (meeting_note_id, dependency_id) VALUES (?, ?)",
-            (meeting_note_id, dependency_id),
-        )
+def render_csv_import_report(target):
+    # Import results are shown after the rerun that refreshes the lists.
+    report = st.session_state.pop(f"{target}_csv_import_report", None)
+    if report is not None:
+        message, skipped_detail = report
+        st.success(message)
+        if skipped_detail:
+            st.info(skipped_detail)
 
 
-def upsert_meeting_note_themes(conn, meeting_note_id, theme_ids):
-    conn.execute(
-        "DELETE FROM meeting_note_theme WHERE meeting_note_id = ?",
-        (meeting_note_id,),
-    )
-    for theme_id in theme_ids:
-        conn.execute(
-            "INSERT OR IGNORE INTO meeting_note_theme (meeting_note_id, theme_id) VALUES (?, ?)",
-            (meeting_note_id, theme_id),
+def run_csv_import(uploaded_file, target, mapping, import_chunk, options=None):
+    progress_bar = st.progress(0.0, text="Importing...")
+    try:
+        result = stream_csv_import(
+            uploaded_file,
+            uploaded_file_hash(uploaded_file),
+            target,
+            mapping,
+            import_chunk,
+            lambda rows, fraction: progress_bar.progress(
+                fraction, text=f"Processed {rows:,} rows"
+            ),
+            options=options,
         )
-
-
-def upsert_meeting_note_evaluations(conn, meeting_note_id, evaluation_ids):
-    conn.execute(
-        "DELETE FROM meeting_note_evaluation WHERE meeting_note_id = ?",
-        (meeting_note_id,),
-    )
-    for evaluation_id in evaluation_ids:
-        conn.execute(
-            "INSERT OR IGNORE INTO meeting_note_evaluation (meeting_note_id, evaluation_id) VALUES (?, ?)",
-            (meeting_note_id, evaluation_id),
-        )
-
-
-def insert_backlog(
-    conn,
-    task,
-    task_details,
-    lob,
-    image_blob,
-    theme,
-    evaluation,
-    estimation,
-    team,
-    sprint,
-):
-    cursor = conn.execute(
-        """
-        INSERT INTO backlog (task, task_details, lob, image_blob, theme, evaluation, estimation, team, sprint)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """,
-        (
-            task,
-            task_details,
-            lob,
-            image_blob,
-            theme,
-            evaluation,
-            estimation,
-            team,
-            sprint,
-        ),
-    )
-    return cursor.lastrowid
-
-
-def upsert_backlog_dependencies(conn, backlog_id, dependency_ids):
-    conn.execute(
-        "DELETE FROM backlog_dependency WHERE backlog_id = ?",
-        (backlog_id,),
-    )
-    for dep_id in dependency_ids:
-        conn.execute(
-            "INSERT OR IGNORE INTO backlog_dependency (backlog_id, dependency_id) VALUES (?, ?)",
-            (backlog_id, dep_id),
+    except Exception as exc:
+        st.error(
+            f"Import stopped: {exc}. Rows from completed chunks were saved; "
+            "import the same file again to resume."
         )
+        return None, None
+    progress_bar.empty()
+    return result
 
 
-def upsert_dependency_backlogs(conn, dependency_id, backlog_ids):
-    conn.execute(
-        "DELETE FROM backlog_dependency WHERE dependency_id = ?",
-        (dependency_id,),
+def render_cross_view(links, key):
+    filter_cols = st.columns(4, gap="small")
+    with filter_cols[0]:
+        theme_filter = st.selectbox(
+            "Theme (filter)",
+            with_placeholder(fetch_themes()),
+            index=0,
+            key=f"{key}_theme_filter",
+        )
+    with filter_cols[1]:
+        team_filter = st.selectbox(
+            "Team (filter)",
+            with_placeholder(BACKLOG_TEAMS),
+            index=0,
+            key=f"{key}_team_filter",
+        )
+    with filter_cols[2]:
+        sprint_filter = st.selectbox(
+            "Sprint (filter)",
+            with_placeholder(SPRINTS),
+            index=0,
+            key=f"{key}_sprint_filter",
+        )
+    with filter_cols[3]:
+        search = st.text_input(
+            "Search",
+            key=f"{key}_search",
+            help="Substring search over task/task details/lob/theme/evaluation",
+        )
+    option_cols = st.columns(4, gap="small", vertical_alignment="bottom")
+    with option_cols[0]:
+        sort_key = st.selectbox(
+            "Sort by",
+            list(CROSS_VIEW_SORTS),
+            key=f"{key}_sort",
+        )
+    with option_cols[1]:
+        descending = st.toggle("Descending", key=f"{key}_descending")
+    with option_cols[2]:
+        aggregate = st.toggle(
+            "One row per backlog",
+            value=True,
+            key=f"{key}_aggregate",
+            help="Collapse linked items into lists instead of one row per combination",
+        )
+    with option_cols[3]:
+        linked_only = st.toggle("Linked backlogs only", key=f"{key}_linked_only")
+    filters = tuple(
+        {
+            "theme": normalize_choice(theme_filter),
+            "team": normalize_choice(team_filter),
+            "sprint": normalize_choice(sprint_filter),
+            "search": search,
+        }.items()
     )
-    for backlog_id in backlog_ids:
-        conn.execute(
-            "INSERT OR IGNORE INTO backlog_dependency (backlog_id, dependency_id) VALUES (?, ?)",
-            (backlog_id, dependency_id),
+    page_cols = st.columns([1, 1, 4], gap="small", vertical_alignment="bottom")
+    with page_cols[0]:
+        page_size = st.selectbox(
+            "Page size",
+            BACKLOG_PAGE_SIZES,
+            index=BACKLOG_PAGE_SIZES.index(100),
+            key=f"{key}_page_size",
         )
-
-
-def dependency_label(dep_row):
-    return f"{dep_row['task']} / {dep_row['sub_task'] or ''} [{dep_row['team']}]"
-
-
-_PASTE_COMPONENT = components.declare_component(
-    "paste_image",
-    path=str(Path(__file__).parent / "components" / "paste_image"),
-)
-
-
-def paste_image_component(label, key):
-    st.caption(label)
-    data_url = _PASTE_COMPONENT(key=key, default=None)
-    if isinstance(data_url, str) and data_url.startswith("data:image/"):
-        try:
-            image_bytes = base64.b64decode(data_url.split(",", 1)[1])
-        except (ValueError, IndexError):
-            image_bytes = None
-        if image_bytes:
-            st.session_state[f"{key}_data"] = image_bytes
-    return st.session_state.get(f"{key}_data")
-
-
-def backlog_label(backlog_row):
-    estimation_value = backlog_row["estimation"]
-    estimation_display = "-" if estimation_value is None else estimation_value
-    team_display = backlog_row["team"] or "-"
-    sprint_display = backlog_row["sprint"] or "-"
-    return (
-        f"{backlog_row['id']}: {backlog_row['task']} / {backlog_row['task_details'] or ''} "
-        f"(est {estimation_display}, {team_display}, {sprint_display})"
+    total = count_cross_view_backlogs(links, filters, linked_only)
+    page_count = max(1, -(-total // page_size))
+    page_state = (filters, page_size, sort_key, descending, linked_only)
+    if st.session_state.get(f"{key}_page_state") != page_state:
+        st.session_state[f"{key}_page_state"] = page_state
+        st.session_state[f"{key}_page"] = 1
+    with page_cols[1]:
+        page = st.number_input(
+            "Page",
+            min_value=1,
+            max_value=page_count,
+            step=1,
+            key=f"{key}_page",
+        )
+    rows = fetch_cross_view_page(
+        links,
+        filters,
+        sort_key,
+        descending,
+        min(int(page), page_count),
+        page_size,
+        aggregate,
+        linked_only,
     )
+    with page_cols[2]:
+        st.caption(f"Page {page} of {page_count} ({total} matching backlog items)")
+    if rows:
+        st.dataframe(pd.DataFrame([dict(row) for row in rows]), width="stretch")
+    elif total == 0 and (linked_only or any(value for _, value in filters)):
+        st.info("No backlog items match the filters.")
+    else:
+        st.info("No backlog items yet.")
 
 
-def parse_estimation(value):
-    if value is None or (isinstance(value, float) and pd.isna(value)):
-        return None, None
-    if isinstance(value, numbers.Number):
-        if float(value).is_integer():
-            return int(value), None
-        return None, "invalid_estimation"
-    text = str(value).strip()
-    if text == "":
-        return None, None
-    text = text.replace(",", "")
-    try:
-        numeric = float(text)
-    except ValueError:
-        return None, "invalid_estimation"
-    if not numeric.is_integer():
-        return None, "invalid_estimation"
-    return int(numeric), None
+def start_rerun_profile():
+    # A run that ends through st.rerun()/st.stop() never reaches
+    # finish_rerun_profile, so drop whatever it left on this thread first.
+    profile_state = get_profile_state()
+    profile_state.profile = None
+    if not PROFILE_ENABLED:
+        return None
+    context = get_script_run_ctx()
+    profile = RerunProfile(context.session_id if context else None)
+    profile_state.profile = profile
+    return profile
+
+
+@st.cache_resource
+def get_profile_log_lock():
+    return threading.Lock()
+
+
+def finish_rerun_profile(profile, tab):
+    profile.mark(f"tab: {tab}")
+    get_profile_state().profile = None
+    summary = profile.summary()
+    summary["tab"] = tab
+    with get_profile_log_lock():
+        with open(PROFILE_LOG_PATH, "a", encoding="utf-8") as log_file:
+            log_file.write(json.dumps(summary) + "\n")
+    with st.sidebar.expander("Debug: rerun timings", expanded=True):
+        metric_cols = st.columns(2)
+        metric_cols[0].metric("Rerun", f"{summary['total_seconds'] * 1000:.0f} ms")
+        metric_cols[1].metric(
+            "SQL",
+            f"{summary['sql_seconds'] * 1000:.0f} ms",
+            f"{summary['statement_count']} statements",
+            delta_color="off",
+        )
+        st.dataframe(
+            pd.DataFrame(
+                [
+                    {"section": section["name"], "ms": section["seconds"] * 1000}
+                    for section in summary["sections"]
+                ]
+            ),
+            hide_index=True,
+            width="stretch",
+        )
+        if summary["statements"]:
+            statements_df = pd.DataFrame(summary["statements"])
+            statements_df["ms"] = statements_df.pop("seconds") * 1000
+            st.caption(f"Slowest {PROFILE_PANEL_STATEMENTS} statements")
+            st.dataframe(
+                statements_df.sort_values("ms", ascending=False)
+                .head(PROFILE_PANEL_STATEMENTS)[["ms", "rows", "sql"]],
+                hide_index=True,
+                width="stretch",
+            )
+        st.caption(f"Appended to {PROFILE_LOG_PATH}")
 
 
+rerun_profile = start_rerun_profile()
 init_db()
 
 st.set_page_config(page_title="Backlog Manager", layout="wide")
@@ -1083,24 +448,12 @@ tab_choice = st.radio(
     key="active_tab",
     label_visibility="collapsed",
 )
+if rerun_profile is not None:
+    rerun_profile.mark("setup")
 
 if tab_choice == "Backlog":
     themes = fetch_themes()
     evaluations = fetch_evaluations()
-    dependency_rows = fetch_dependencies()
-    dependency_choices = {dependency_label(row): row["id"] for row in dependency_rows}
-    existing_dependency_labels = list(dependency_choices.keys())
-    sub_backlog_rows = fetch_sub_backlogs()
-    sub_backlog_choices = {
-        f"{row['title']} (#{row['id']})": row["id"] for row in sub_backlog_rows
-    }
-    existing_sub_backlog_labels = list(sub_backlog_choices.keys())
-    backlog_rows = fetch_backlogs()
-    dependency_df = (
-        pd.DataFrame([dict(row) for row in dependency_rows])
-        if dependency_rows
-        else pd.DataFrame(columns=["id", "task", "sub_task", "team"])
-    )
 
     @st.dialog("Add backlog")
     def add_backlog_dialog():
@@ -1120,6 +473,14 @@ if tab_choice == "Backlog":
             step=1,
             key="add_sub_backlog_count",
         )
+        dependency_index = fetch_dependency_label_index()
+        dependency_search = label_search_box(
+            dependency_index, "dependencies", "add_existing_deps"
+        )
+        sub_backlog_index = fetch_sub_backlog_label_index()
+        sub_backlog_search = label_search_box(
+            sub_backlog_index, "sub-backlogs", "add_existing_sub_backlogs"
+        )
         with st.form("add_backlog_form"):
             image_col, middle_col, right_col = st.columns(3, gap="large")
             with image_col:
@@ -1128,7 +489,7 @@ if tab_choice == "Backlog":
                     key="add_backlog_image_paste",
                 )
                 if pasted_image:
-                    st.image(pasted_image, caption="Pasted image")
+                    st.image(preview_image(pasted_image), caption="Pasted image")
             with middle_col:
                 task = st.text_input("Task")
                 theme_options = with_placeholder(themes)
@@ -1153,19 +514,17 @@ if tab_choice == "Backlog":
                     key="add_estimation_right",
                 )
                 sprint = st.selectbox("Sprint", with_placeholder(SPRINTS), index=0)
-            selected_dependency_labels = st.multiselect(
+            selected_dependency_ids = label_multiselect(
                 "Existing dependencies",
-                options=existing_dependency_labels,
-                default=[],
-                placeholder=PLACEHOLDER_OPTION,
-                key="add_existing_deps",
+                dependency_index,
+                "add_existing_deps",
+                dependency_search,
             )
-            selected_sub_backlog_labels = st.multiselect(
+            selected_sub_backlog_ids = label_multiselect(
                 "Assign existing sub-backlogs",
-                options=existing_sub_backlog_labels,
-                default=[],
-                placeholder=PLACEHOLDER_OPTION,
-                key="add_existing_sub_backlogs",
+                sub_backlog_index,
+                "add_existing_sub_backlogs",
+                sub_backlog_search,
             )
 
             new_dependencies = []
@@ -1229,18 +588,20 @@ if tab_choice == "Backlog":
                     evaluation_value = normalize_choice(evaluation_choice)
                     team_value = normalize_choice(team)
                     sprint_value = normalize_choice(sprint)
-                    image_bytes = pasted_image
                     estimation_value = int(estimation_input_right)
                     task_details_value = task_details.strip() or None
                     lob_value = lob.strip() or None
-                    with get_conn() as conn:
+                    prepared_image = prepare_image(
+                        pasted_image, pasted_image_meta("add_backlog_image_paste")
+                    )
+                    with write_conn() as conn:
                         insert_theme(conn, theme.strip())
                         backlog_id = insert_backlog(
                             conn,
                             task.strip(),
                             task_details_value,
                             lob_value,
-                            image_bytes,
+                            store_image(conn, prepared_image),
                             theme.strip(),
                             evaluation_value,
                             estimation_value,
@@ -1248,9 +609,7 @@ if tab_choice == "Backlog":
                             sprint_value,
                         )
 
-                        dependency_ids = []
-                        for label in selected_dependency_labels:
-                            dependency_ids.append(dependency_choices[label])
+                        dependency_ids = list(selected_dependency_ids)
 
                         for dep_task, dep_sub_task, dep_team in new_dependencies:
                             if dep_task.strip():
@@ -1264,13 +623,9 @@ if tab_choice == "Backlog":
 
                         upsert_backlog_dependencies(conn, backlog_id, dependency_ids)
 
-                        if selected_sub_backlog_labels:
-                            sub_backlog_ids = [
-                                sub_backlog_choices[label]
-                                for label in selected_sub_backlog_labels
-                            ]
+                        if selected_sub_backlog_ids:
                             upsert_backlog_sub_backlogs(
-                                conn, backlog_id, sub_backlog_ids
+                                conn, backlog_id, selected_sub_backlog_ids
                             )
 
                         for title, note in new_sub_backlogs:
@@ -1307,26 +662,39 @@ if tab_choice == "Backlog":
             step=1,
             key="edit_sub_backlog_count",
         )
+        show_original_image = bool(backlog_row["image_hash"]) and st.toggle(
+            "Show full-size image",
+            key="edit_show_original_image",
+        )
         selected_dep_ids = fetch_backlog_dependency_ids(backlog_row["id"])
-        selected_dep_labels = [
-            dependency_label(row)
-            for row in dependency_rows
-            if row["id"] in selected_dep_ids
-        ]
+        dependency_index = fetch_dependency_label_index()
+        dependency_search = label_search_box(
+            dependency_index, "dependencies", "edit_existing_deps"
+        )
+        sub_backlog_index = fetch_sub_backlog_label_index()
+        sub_backlog_search = label_search_box(
+            sub_backlog_index, "sub-backlogs", "edit_existing_sub_backlogs"
+        )
         with st.form("edit_backlog_form"):
             image_col, middle_col, right_col = st.columns(3, gap="large")
             with image_col:
-                current_image = backlog_row["image_blob"]
+                if show_original_image:
+                    current_image = fetch_image(backlog_row["image_hash"])
+                else:
+                    current_image = fetch_image_thumbnail(backlog_row["image_hash"])
                 if current_image:
-                    if isinstance(current_image, memoryview):
-                        current_image = current_image.tobytes()
                     st.image(current_image, caption="Current image")
+                elif backlog_row["image_hash"]:
+                    st.caption("No thumbnail for this image; show the full-size image.")
                 pasted_replace_image = paste_image_component(
                     "Paste image to replace (optional)",
                     key="edit_backlog_image_paste",
                 )
                 if pasted_replace_image:
-                    st.image(pasted_replace_image, caption="New image preview")
+                    st.image(
+                        preview_image(pasted_replace_image),
+                        caption="New image preview",
+                    )
                 remove_image = st.checkbox("Remove image", key="remove_backlog_image")
             with middle_col:
                 edit_task = st.text_input("Task", value=backlog_row["task"])
@@ -1392,30 +760,19 @@ if tab_choice == "Backlog":
                     sprint_options,
                     index=sprint_options.index(sprint_value) if sprint_value in sprint_options else 0,
                 )
-            default_dependency_labels = [
-                label
-                for label in selected_dep_labels
-                if label in existing_dependency_labels
-            ]
-            edit_selected_dependency_labels = st.multiselect(
+            edit_selected_dependency_ids = label_multiselect(
                 "Existing dependencies",
-                options=existing_dependency_labels,
-                default=default_dependency_labels,
-                placeholder=PLACEHOLDER_OPTION,
-                key="edit_existing_deps",
+                dependency_index,
+                "edit_existing_deps",
+                dependency_search,
+                selected_dep_ids,
             )
-            linked_sub_backlog_ids = fetch_sub_backlog_ids_for_backlog(backlog_row["id"])
-            default_sub_backlog_labels = [
-                label
-                for label, sub_id in sub_backlog_choices.items()
-                if sub_id in linked_sub_backlog_ids
-            ]
-            edit_selected_sub_backlog_labels = st.multiselect(
+            edit_selected_sub_backlog_ids = label_multiselect(
                 "Assign existing sub-backlogs",
-                options=existing_sub_backlog_labels,
-                default=default_sub_backlog_labels,
-                placeholder=PLACEHOLDER_OPTION,
-                key="edit_existing_sub_backlogs",
+                sub_backlog_index,
+                "edit_existing_sub_backlogs",
+                sub_backlog_search,
+                fetch_sub_backlog_ids_for_backlog(backlog_row["id"]),
             )
 
             edit_new_dependencies = []
@@ -1457,9 +814,7 @@ if tab_choice == "Backlog":
                     )
                 edit_new_sub_backlogs.append((title, note))
 
-            linked_dependencies = [
-                row for row in dependency_rows if row["id"] in selected_dep_ids
-            ]
+            linked_dependencies = fetch_dependencies_for_backlog(backlog_row["id"])
             if linked_dependencies:
                 linked_dependency_df = pd.DataFrame(
                     [dict(row) for row in linked_dependencies]
@@ -1497,30 +852,34 @@ if tab_choice == "Backlog":
                     edit_evaluation_value = normalize_choice(edit_evaluation_choice)
                     edit_team_value = normalize_choice(edit_team)
                     edit_sprint_value = normalize_choice(edit_sprint)
-                    if remove_image:
-                        image_bytes = None
-                    elif pasted_replace_image:
-                        image_bytes = pasted_replace_image
-                    else:
-                        image_bytes = backlog_row["image_blob"]
-                        if isinstance(image_bytes, memoryview):
-                            image_bytes = image_bytes.tobytes()
                     edit_estimation_value = int(edit_estimation_input)
                     edit_task_details_value = edit_task_details.strip() or None
                     edit_lob_value = edit_lob.strip() or None
-                    with get_conn() as conn:
+                    prepared_image = None
+                    if pasted_replace_image and not remove_image:
+                        prepared_image = prepare_image(
+                            pasted_replace_image,
+                            pasted_image_meta("edit_backlog_image_paste"),
+                        )
+                    with write_conn() as conn:
                         insert_theme(conn, edit_theme.strip())
+                        if remove_image:
+                            image_hash = None
+                        elif prepared_image:
+                            image_hash = store_image(conn, prepared_image)
+                        else:
+                            image_hash = backlog_row["image_hash"]
                         conn.execute(
                             """
                             UPDATE backlog
-                            SET task = ?, task_details = ?, lob = ?, image_blob = ?, theme = ?, evaluation = ?, estimation = ?, team = ?, sprint = ?
+                            SET task = ?, task_details = ?, lob = ?, image_hash = ?, theme = ?, evaluation = ?, estimation = ?, team = ?, sprint = ?
                             WHERE id = ?
                             """,
                             (
                                 edit_task.strip(),
                                 edit_task_details_value,
                                 edit_lob_value,
-                                image_bytes,
+                                image_hash,
                                 edit_theme.strip(),
                                 edit_evaluation_value,
                                 edit_estimation_value,
@@ -1530,9 +889,7 @@ if tab_choice == "Backlog":
                             ),
                         )
 
-                        dependency_ids = []
-                        for label in edit_selected_dependency_labels:
-                            dependency_ids.append(dependency_choices[label])
+                        dependency_ids = list(edit_selected_dependency_ids)
 
                         for dep_task, dep_sub_task, dep_team in edit_new_dependencies:
                             if dep_task.strip():
@@ -1546,12 +903,8 @@ if tab_choice == "Backlog":
 
                         upsert_backlog_dependencies(conn, backlog_row["id"], dependency_ids)
 
-                        sub_backlog_ids = [
-                            sub_backlog_choices[label]
-                            for label in edit_selected_sub_backlog_labels
-                        ]
                         upsert_backlog_sub_backlogs(
-                            conn, backlog_row["id"], sub_backlog_ids
+                            conn, backlog_row["id"], edit_selected_sub_backlog_ids
                         )
 
                         for title, note in edit_new_sub_backlogs:
@@ -1581,7 +934,7 @@ if tab_choice == "Backlog":
             st.write(items)
         if st.button("Confirm delete", type="primary"):
             placeholders = ",".join(["?"] * len(selected_ids))
-            with get_conn() as conn:
+            with write_conn() as conn:
                 conn.execute(
                     f"DELETE FROM backlog WHERE id IN ({placeholders})",
                     tuple(selected_ids),
@@ -1622,23 +975,21 @@ if tab_choice == "Backlog":
         if len(theme_values) > 1:
             st.caption("Themes differ across selected items. Choose the merged theme.")
 
-        combined_dep_ids = set()
-        for row in selected_rows:
-            combined_dep_ids.update(fetch_backlog_dependency_ids(row["id"]))
-        default_dep_labels = [
-            dependency_label(row)
-            for row in dependency_rows
-            if row["id"] in combined_dep_ids
-        ]
-        default_dep_labels = [
-            label for label in default_dep_labels if label in existing_dependency_labels
-        ]
+        combined_dep_ids = set().union(
+            *fetch_backlog_dependency_id_sets(
+                tuple(row["id"] for row in selected_rows)
+            ).values()
+        )
 
         estimation_sum = sum(
             int(row["estimation"]) if row["estimation"] is not None else 0
             for row in selected_rows
         )
 
+        dependency_index = fetch_dependency_label_index()
+        dependency_search = label_search_box(
+            dependency_index, "dependencies", f"merge_existing_deps_{primary_id}"
+        )
         with st.form(f"merge_backlog_form_{primary_id}"):
             merge_col_left, merge_col_mid, merge_col_right = st.columns(3, gap="large")
             with merge_col_left:
@@ -1710,12 +1061,12 @@ if tab_choice == "Backlog":
                     key=f"merge_sprint_{primary_id}",
                 )
             with merge_col_right:
-                merge_selected_dependency_labels = st.multiselect(
+                dependency_ids = label_multiselect(
                     "Existing dependencies",
-                    options=existing_dependency_labels,
-                    default=default_dep_labels,
-                    placeholder=PLACEHOLDER_OPTION,
-                    key=f"merge_existing_deps_{primary_id}",
+                    dependency_index,
+                    f"merge_existing_deps_{primary_id}",
+                    dependency_search,
+                    sorted(combined_dep_ids),
                 )
 
             merge_submit = st.form_submit_button("Merge backlogs")
@@ -1734,48 +1085,23 @@ if tab_choice == "Backlog":
                 merge_task_details_value = merge_task_details.strip() or None
                 merge_lob_value = merge_lob.strip() or None
                 merge_estimation_value = int(merge_estimation)
-                image_bytes = primary_row["image_blob"]
-                if isinstance(image_bytes, memoryview):
-                    image_bytes = image_bytes.tobytes()
 
-                with get_conn() as conn:
-                    insert_theme(conn, merge_theme.strip())
-                    conn.execute(
-                        """
-                        UPDATE backlog
-                        SET task = ?, task_details = ?, lob = ?, image_blob = ?, theme = ?, evaluation = ?, estimation = ?, team = ?, sprint = ?
-                        WHERE id = ?
-                        """,
-                        (
-                            merge_task.strip(),
-                            merge_task_details_value,
-                            merge_lob_value,
-                            image_bytes,
-                            merge_theme.strip(),
-                            merge_evaluation_value,
-                            merge_estimation_value,
-                            merge_team_value,
-                            merge_sprint_value,
-                            primary_row["id"],
-                        ),
+                with write_conn() as conn:
+                    merge_backlogs(
+                        conn,
+                        primary_row["id"],
+                        [row["id"] for row in selected_rows],
+                        merge_task.strip(),
+                        merge_task_details_value,
+                        merge_lob_value,
+                        merge_theme.strip(),
+                        merge_evaluation_value,
+                        merge_estimation_value,
+                        merge_team_value,
+                        merge_sprint_value,
+                        dependency_ids,
                     )
 
-                    dependency_ids = [
-                        dependency_choices[label]
-                        for label in merge_selected_dependency_labels
-                    ]
-                    upsert_backlog_dependencies(conn, primary_row["id"], dependency_ids)
-
-                    delete_ids = [
-                        row["id"] for row in selected_rows if row["id"] != primary_row["id"]
-                    ]
-                    if delete_ids:
-                        placeholders = ",".join(["?"] * len(delete_ids))
-                        conn.execute(
-                            f"DELETE FROM backlog WHERE id IN ({placeholders})",
-                            tuple(delete_ids),
-                        )
-
                 st.success("Backlogs merged.")
                 st.session_state.pop("selected_backlog_ids", None)
                 st.rerun()
@@ -1783,11 +1109,7 @@ if tab_choice == "Backlog":
     @st.dialog("Split backlog")
     def split_backlog_dialog(backlog_row):
         current_dep_ids = fetch_backlog_dependency_ids(backlog_row["id"])
-        current_dep_labels = [
-            dependency_label(row)
-            for row in fetch_dependencies()
-            if row["id"] in current_dep_ids
-        ]
+        current_dep_labels = fetch_dependency_label_index().labels_for(sorted(current_dep_ids))
         if current_dep_labels:
             st.caption("Dependencies will be copied to all split items.")
             st.write(", ".join(current_dep_labels))
@@ -1855,47 +1177,15 @@ if tab_choice == "Backlog":
                         )
                         return
 
-                    with get_conn() as conn:
-                        new_ids = []
-                        image_bytes = backlog_row["image_blob"]
-                        if isinstance(image_bytes, memoryview):
-                            image_bytes = image_bytes.tobytes()
-                        for item_task, item_task_details, item_estimation in split_items:
-                            new_id = insert_backlog(
-                                conn,
-                                item_task.strip(),
-                                item_task_details.strip(),
-                                backlog_row["lob"],
-                                image_bytes,
-                                backlog_row["theme"],
-                                backlog_row["evaluation"],
-                                item_estimation,
-                                backlog_row["team"],
-                                backlog_row["sprint"],
-                            )
-                            new_ids.append(new_id)
-
-                        for new_id in new_ids:
-                            for dep_id in current_dep_ids:
-                                conn.execute(
-                                    """
-                                    INSERT OR IGNORE INTO backlog_dependency
-                                    (backlog_id, dependency_id)
-                                    VALUES (?, ?)
-                                    """,
-                                    (new_id, dep_id),
-                                )
-
-                        conn.execute(
-                            "DELETE FROM backlog WHERE id = ?",
-                            (backlog_row["id"],),
-                        )
+                    with write_conn() as conn:
+                        split_backlog(conn, backlog_row, split_items, current_dep_ids)
 
                     st.success("Backlog split completed.")
                     st.session_state.pop("selected_backlog_ids", None)
                     st.rerun()
 
     with st.expander("Import CSV"):
+        render_csv_import_report("backlog")
         backlog_file = st.file_uploader(
             "CSV file (Backlog)",
             type=["csv"],
@@ -1903,11 +1193,12 @@ if tab_choice == "Backlog":
         )
         if backlog_file:
             try:
-                backlog_csv = pd.read_csv(backlog_file)
+                backlog_csv = read_csv_preview(backlog_file)
             except Exception as exc:
                 st.error(f"Failed to read CSV: {exc}")
             else:
-                st.dataframe(backlog_csv.head(), width="stretch")
+                st.caption(f"Preview of the first {len(backlog_csv)} rows.")
+                st.dataframe(backlog_csv, width="stretch")
                 columns = with_placeholder(backlog_csv.columns)
                 map_task = st.selectbox(
                     "Map: task (required)",
@@ -1949,7 +1240,22 @@ if tab_choice == "Backlog":
                     columns,
                     key="map_backlog_sprint",
                 )
-                if st.button("Import backlog", key="import_backlog_btn"):
+                backlog_mapping = {
+                    "task": map_task,
+                    "task_details": map_task_details,
+                    "lob": map_lob,
+                    "theme": map_theme,
+                    "evaluation": map_evaluation,
+                    "estimation": map_estimation,
+                    "team": map_team,
+                    "sprint": map_sprint,
+                }
+                can_import = render_csv_import_resume(
+                    backlog_file, "backlog", backlog_mapping
+                )
+                if st.button(
+                    "Import backlog", key="import_backlog_btn", disabled=not can_import
+                ):
                     missing = []
                     if map_task == PLACEHOLDER_OPTION:
                         missing.append("task")
@@ -1958,76 +1264,25 @@ if tab_choice == "Backlog":
                     if missing:
                         st.error(f"Required mappings missing: {', '.join(missing)}")
                     else:
-                        imported = 0
-                        skipped = 0
-                        skip_reasons = {
-                            "missing_task": 0,
-                            "missing_theme": 0,
-                            "invalid_estimation": 0,
-                        }
-
-                        def get_cell(row, column):
-                            if not column or column == PLACEHOLDER_OPTION:
-                                return None
-                            value = row[column]
-                            if pd.isna(value):
-                                return None
-                            text = str(value).strip()
-                            return text if text != "" else None
-
-                        with get_conn() as conn:
-                            for _, row in backlog_csv.iterrows():
-                                task_value = get_cell(row, map_task)
-                                if not task_value:
-                                    skipped += 1
-                                    skip_reasons["missing_task"] += 1
-                                    continue
-                                theme_value = get_cell(row, map_theme)
-                                if not theme_value:
-                                    skipped += 1
-                                    skip_reasons["missing_theme"] += 1
-                                    continue
-                                task_details_value = get_cell(row, map_task_details)
-                                lob_value = get_cell(row, map_lob)
-                                evaluation_value = get_cell(row, map_evaluation)
-                                team_value = get_cell(row, map_team)
-                                sprint_value = get_cell(row, map_sprint)
-                                estimation_value = None
-                                estimation_cell = (
-                                    row[map_estimation]
-                                    if map_estimation != PLACEHOLDER_OPTION
-                                    else None
-                                )
-                                estimation_value, err = parse_estimation(estimation_cell)
-                                if err:
-                                    skipped += 1
-                                    skip_reasons["invalid_estimation"] += 1
-                                    continue
-                                insert_theme(conn, theme_value)
-                                if evaluation_value:
-                                    insert_evaluation(conn, evaluation_value)
-                                insert_backlog(
-                                    conn,
-                                    task_value,
-                                    task_details_value,
-                                    lob_value,
-                                    None,
-                                    theme_value,
-                                    evaluation_value,
-                                    estimation_value,
-                                    team_value,
-                                    sprint_value,
-                                )
-                                imported += 1
-                        st.success(f"Imported {imported} rows. Skipped {skipped} rows.")
-                        if skipped:
-                            st.info(
+                        counts, skip_reasons = run_csv_import(
+                            backlog_file,
+                            "backlog",
+                            backlog_mapping,
+                            import_backlog_csv,
+                        )
+                        if counts is not None:
+                            skipped = sum(skip_reasons.values())
+                            st.session_state["backlog_csv_import_report"] = (
+                                f"Imported {counts.get('inserted', 0)} rows. "
+                                f"Skipped {skipped} rows.",
                                 "Skipped: "
                                 f"missing task={skip_reasons['missing_task']}, "
                                 f"missing theme={skip_reasons['missing_theme']}, "
                                 f"invalid estimation={skip_reasons['invalid_estimation']}"
+                                if skipped
+                                else None,
                             )
-                        st.rerun()
+                            st.rerun()
 
     st.subheader("Backlog list")
     backlog_filter_row1 = st.columns(4, gap="small")
@@ -2079,63 +1334,76 @@ if tab_choice == "Backlog":
         backlog_search = st.text_input(
             "Search",
             key="backlog_search",
-            help="Filter by task/task details/lob/theme/evaluation",
+            help="Substring search over task/task details/lob/theme/evaluation",
+        )
+    backlog_filters = tuple(
+        {
+            "task": backlog_task_filter,
+            "task_details": backlog_task_details_filter,
+            "lob": backlog_lob_filter,
+            "theme": normalize_choice(backlog_theme_filter),
+            "team": normalize_choice(backlog_team_filter),
+            "sprint": normalize_choice(backlog_sprint_filter),
+            "evaluation": normalize_choice(backlog_evaluation_filter),
+            "search": backlog_search,
+        }.items()
+    )
+    page_cols = st.columns([1, 1, 1, 3], gap="small", vertical_alignment="bottom")
+    with page_cols[0]:
+        backlog_page_size = st.selectbox(
+            "Page size",
+            BACKLOG_PAGE_SIZES,
+            index=BACKLOG_PAGE_SIZES.index(100),
+            key="backlog_page_size",
+        )
+    page_state = (backlog_filters, backlog_page_size)
+    if st.session_state.get("backlog_page_state") != page_state:
+        st.session_state["backlog_page_state"] = page_state
+        st.session_state["backlog_page_anchor"] = None
+    backlog_total = count_backlogs(backlog_filters)
+    backlog_rows, has_prev_page, has_next_page = fetch_backlog_page(
+        backlog_filters,
+        backlog_page_size,
+        st.session_state.get("backlog_page_anchor"),
+    )
+    with page_cols[1]:
+        st.button(
+            "Previous page",
+            key="backlog_prev_page",
+            disabled=not has_prev_page,
+            on_click=st.session_state.__setitem__,
+            args=(
+                "backlog_page_anchor",
+                ("prev", backlog_rows[0]["id"]) if backlog_rows else None,
+            ),
+        )
+    with page_cols[2]:
+        st.button(
+            "Next page",
+            key="backlog_next_page",
+            disabled=not has_next_page,
+            on_click=st.session_state.__setitem__,
+            args=(
+                "backlog_page_anchor",
+                ("next", backlog_rows[-1]["id"]) if backlog_rows else None,
+            ),
         )
+    with page_cols[3]:
+        st.caption(f"Showing {len(backlog_rows)} of {backlog_total} matching backlog items")
     if backlog_rows:
-        backlog_df = pd.DataFrame([dict(row) for row in backlog_rows])
-        filtered_backlog_df = backlog_df.copy()
-        if backlog_task_filter.strip():
-            query = backlog_task_filter.strip()
-            filtered_backlog_df = filtered_backlog_df[
-                filtered_backlog_df["task"]
-                .fillna("")
-                .str.contains(query, case=False, na=False)
-            ]
-        if backlog_task_details_filter.strip():
-            query = backlog_task_details_filter.strip()
-            filtered_backlog_df = filtered_backlog_df[
-                filtered_backlog_df["task_details"]
-                .fillna("")
-                .str.contains(query, case=False, na=False)
-            ]
-        if backlog_lob_filter.strip():
-            query = backlog_lob_filter.strip()
-            filtered_backlog_df = filtered_backlog_df[
-                filtered_backlog_df["lob"]
-                .fillna("")
-                .str.contains(query, case=False, na=False)
-            ]
-        if backlog_team_filter != PLACEHOLDER_OPTION:
-            filtered_backlog_df = filtered_backlog_df[
-                filtered_backlog_df["team"] == backlog_team_filter
-            ]
-        if backlog_sprint_filter != PLACEHOLDER_OPTION:
-            filtered_backlog_df = filtered_backlog_df[
-                filtered_backlog_df["sprint"] == backlog_sprint_filter
-            ]
-        if backlog_theme_filter != PLACEHOLDER_OPTION:
-            filtered_backlog_df = filtered_backlog_df[
-                filtered_backlog_df["theme"] == backlog_theme_filter
-            ]
-        if backlog_evaluation_filter != PLACEHOLDER_OPTION:
-            filtered_backlog_df = filtered_backlog_df[
-                filtered_backlog_df["evaluation"] == backlog_evaluation_filter
-            ]
-        if backlog_search.strip():
-            query = backlog_search.strip().lower()
-            searchable = (
-                filtered_backlog_df[["task", "task_details", "lob", "theme", "evaluation"]]
-                .fillna("")
-                .agg(" ".join, axis=1)
-                .str.lower()
-            )
-            filtered_backlog_df = filtered_backlog_df[searchable.str.contains(query)]
-        display_df = filtered_backlog_df.drop(columns=["image_blob"], errors="ignore")
+        display_df = pd.DataFrame([dict(row) for row in backlog_rows]).drop(
+            columns=["image_hash"], errors="ignore"
+        )
+        # Selections are row positions, so they reset whenever the page shows
+        # a different set of rows.
+        page_ids = ",".join(str(row["id"]) for row in backlog_rows)
+        page_key = hashlib.sha256(page_ids.encode()).hexdigest()[:16]
         selection = st.dataframe(
             display_df,
             width="stretch",
             on_select="rerun",
             selection_mode="multi-row",
+            key=f"backlog_list_{page_key}",
         )
         if selection and selection.selection.rows:
             selected_ids = [
@@ -2146,7 +1414,11 @@ if tab_choice == "Backlog":
         else:
             st.session_state.pop("selected_backlog_ids", None)
     else:
-        st.info("No backlog items yet.")
+        st.session_state.pop("selected_backlog_ids", None)
+        if backlog_total == 0 and any(value for _, value in backlog_filters):
+            st.info("No backlog items match the filters.")
+        else:
+            st.info("No backlog items yet.")
 
     backlog_by_id = {row["id"]: row for row in backlog_rows}
     selected_ids = st.session_state.get("selected_backlog_ids", [])
@@ -2161,41 +1433,55 @@ if tab_choice == "Backlog":
         st.caption("Selected: none")
 
     if len(selected_ids) > 1:
+        dependency_index = fetch_dependency_label_index()
+        dependency_search = label_search_box(
+            dependency_index, "dependencies", "bulk_backlog_dependencies"
+        )
         with st.form("bulk_assign_backlog_dependencies_form"):
             st.caption("Bulk assign dependencies (replaces existing assignments).")
-            bulk_dependencies = st.multiselect(
+            dependency_ids = label_multiselect(
                 "Assign dependencies",
-                existing_dependency_labels,
-                key="bulk_backlog_dependencies",
-                placeholder=PLACEHOLDER_OPTION,
+                dependency_index,
+                "bulk_backlog_dependencies",
+                dependency_search,
             )
             bulk_submit = st.form_submit_button("Apply dependencies")
             if bulk_submit:
-                dependency_ids = [
-                    dependency_choices[label] for label in bulk_dependencies
-                ]
-                with get_conn() as conn:
-                    for backlog_id in selected_ids:
-                        upsert_backlog_dependencies(conn, backlog_id, dependency_ids)
+                with write_conn() as conn:
+                    sync_links(
+                        conn,
+                        "backlog_dependency",
+                        "backlog_id",
+                        "dependency_id",
+                        selected_ids,
+                        dependency_ids,
+                    )
                 st.success("Dependencies updated.")
                 st.rerun()
 
+        sub_backlog_index = fetch_sub_backlog_label_index()
+        sub_backlog_search = label_search_box(
+            sub_backlog_index, "sub-backlogs", "bulk_backlog_sub_backlogs"
+        )
         with st.form("bulk_assign_backlog_sub_backlogs_form"):
             st.caption("Bulk assign sub-backlogs (replaces existing assignments).")
-            bulk_sub_backlogs = st.multiselect(
+            sub_backlog_ids = label_multiselect(
                 "Assign sub-backlogs",
-                existing_sub_backlog_labels,
-                key="bulk_backlog_sub_backlogs",
-                placeholder=PLACEHOLDER_OPTION,
+                sub_backlog_index,
+                "bulk_backlog_sub_backlogs",
+                sub_backlog_search,
             )
             bulk_sub_submit = st.form_submit_button("Apply sub-backlogs")
             if bulk_sub_submit:
-                sub_backlog_ids = [
-                    sub_backlog_choices[label] for label in bulk_sub_backlogs
-                ]
-                with get_conn() as conn:
-                    for backlog_id in selected_ids:
-                        upsert_backlog_sub_backlogs(conn, backlog_id, sub_backlog_ids)
+                with write_conn() as conn:
+                    sync_links(
+                        conn,
+                        "sub_backlog_backlog",
+                        "backlog_id",
+                        "sub_backlog_id",
+                        selected_ids,
+                        sub_backlog_ids,
+                    )
                 st.success("Sub-backlogs updated.")
                 st.rerun()
 
@@ -2209,7 +1495,7 @@ if tab_choice == "Backlog":
             eval_submit = st.form_submit_button("Apply evaluation")
             if eval_submit:
                 evaluation_value = normalize_choice(bulk_evaluation)
-                with get_conn() as conn:
+                with write_conn() as conn:
                     placeholders = ",".join(["?"] * len(selected_ids))
                     conn.execute(
                         f"UPDATE backlog SET evaluation = ? WHERE id IN ({placeholders})",
@@ -2222,13 +1508,16 @@ if tab_choice == "Backlog":
     with action_cols[0]:
         if st.button("Add backlog"):
             st.session_state.pop("add_backlog_image_paste_data", None)
+            st.session_state.pop("add_backlog_image_paste_meta", None)
             add_backlog_dialog()
     with action_cols[1]:
         edit_disabled = selected_backlog is None
         if st.button("Edit selected backlog", disabled=edit_disabled):
             st.session_state.pop("edit_backlog_image_paste", None)
             st.session_state.pop("edit_backlog_image_paste_data", None)
+            st.session_state.pop("edit_backlog_image_paste_meta", None)
             st.session_state.pop("remove_backlog_image", None)
+            st.session_state.pop("edit_show_original_image", None)
             edit_backlog_dialog(selected_backlog)
     with action_cols[2]:
         split_disabled = selected_backlog is None
@@ -2250,9 +1539,6 @@ if tab_choice == "Backlog":
 
 if tab_choice == "Dependencies":
     dependency_rows = fetch_dependencies()
-    backlog_rows = fetch_backlogs()
-    backlog_choices = {backlog_label(row): row["id"] for row in backlog_rows}
-    backlog_labels = list(backlog_choices.keys())
 
     @st.dialog("Add dependency")
     def add_dependency_dialog():
@@ -2278,7 +1564,7 @@ if tab_choice == "Dependencies":
                 elif dep_team == PLACEHOLDER_OPTION:
                     st.error("Dependency team is required.")
                 else:
-                    with get_conn() as conn:
+                    with write_conn() as conn:
                         insert_dependency(
                             conn,
                             dep_task.strip(),
@@ -2319,7 +1605,7 @@ if tab_choice == "Dependencies":
                 elif edit_dep_team == PLACEHOLDER_OPTION:
                     st.error("Dependency team is required.")
                 else:
-                    with get_conn() as conn:
+                    with write_conn() as conn:
                         conn.execute(
                             """
                             UPDATE dependency
@@ -2348,7 +1634,7 @@ if tab_choice == "Dependencies":
             st.write(items)
         if st.button("Confirm delete", type="primary"):
             placeholders = ",".join(["?"] * len(selected_ids))
-            with get_conn() as conn:
+            with write_conn() as conn:
                 conn.execute(
                     f"DELETE FROM dependency WHERE id IN ({placeholders})",
                     tuple(selected_ids),
@@ -2375,6 +1661,7 @@ if tab_choice == "Dependencies":
             st.rerun()
 
     with st.expander("Import CSV"):
+        render_csv_import_report("dependency")
         dep_file = st.file_uploader(
             "CSV file (Dependency)",
             type=["csv"],
@@ -2382,11 +1669,12 @@ if tab_choice == "Dependencies":
         )
         if dep_file:
             try:
-                dep_csv = pd.read_csv(dep_file)
+                dep_csv = read_csv_preview(dep_file)
             except Exception as exc:
                 st.error(f"Failed to read CSV: {exc}")
             else:
-                st.dataframe(dep_csv.head(), width="stretch")
+                st.caption(f"Preview of the first {len(dep_csv)} rows.")
+                st.dataframe(dep_csv, width="stretch")
                 columns = with_placeholder(dep_csv.columns)
                 map_task = st.selectbox(
                     "Map: task (required)",
@@ -2403,7 +1691,26 @@ if tab_choice == "Dependencies":
                     columns,
                     key="map_dependency_team",
                 )
-                if st.button("Import dependency", key="import_dependency_btn"):
+                update_existing = st.checkbox(
+                    "Update existing dependencies whose spelling differs",
+                    key="dependency_csv_update_existing",
+                    help=(
+                        "Rows are matched to existing dependencies by team, task and "
+                        "sub-task, ignoring case and spacing. Matches are never duplicated."
+                    ),
+                )
+                dependency_mapping = {
+                    "task": map_task,
+                    "sub_task": map_sub_task,
+                    "team": map_team,
+                }
+                dependency_options = {"update_existing": update_existing}
+                can_import = render_csv_import_resume(
+                    dep_file, "dependency", dependency_mapping, dependency_options
+                )
+                if st.button(
+                    "Import dependency", key="import_dependency_btn", disabled=not can_import
+                ):
                     missing = []
                     if map_task == PLACEHOLDER_OPTION:
                         missing.append("task")
@@ -2412,47 +1719,30 @@ if tab_choice == "Dependencies":
                     if missing:
                         st.error(f"Required mappings missing: {', '.join(missing)}")
                     else:
-                        imported = 0
-                        skipped = 0
-                        skip_reasons = {"missing_task": 0, "missing_team": 0}
-
-                        def get_cell(row, column):
-                            if not column or column == PLACEHOLDER_OPTION:
-                                return None
-                            value = row[column]
-                            if pd.isna(value):
-                                return None
-                            text = str(value).strip()
-                            return text if text != "" else None
-
-                        with get_conn() as conn:
-                            for _, row in dep_csv.iterrows():
-                                task_value = get_cell(row, map_task)
-                                if not task_value:
-                                    skipped += 1
-                                    skip_reasons["missing_task"] += 1
-                                    continue
-                                team_value = get_cell(row, map_team)
-                                if not team_value:
-                                    skipped += 1
-                                    skip_reasons["missing_team"] += 1
-                                    continue
-                                sub_task_value = get_cell(row, map_sub_task)
-                                insert_dependency(
-                                    conn,
-                                    task_value,
-                                    sub_task_value,
-                                    team_value,
-                                )
-                                imported += 1
-                        st.success(f"Imported {imported} rows. Skipped {skipped} rows.")
-                        if skipped:
-                            st.info(
+                        counts, skip_reasons = run_csv_import(
+                            dep_file,
+                            "dependency",
+                            dependency_mapping,
+                            import_dependency_csv,
+                            dependency_options,
+                        )
+                        if counts is not None:
+                            skipped = sum(skip_reasons.values())
+                            st.session_state["dependency_csv_import_report"] = (
+                                f"Inserted {counts.get('inserted', 0)}, "
+                                f"updated {counts.get('updated', 0)}, "
+                                "matched but not updated "
+                                f"{counts.get('changed_not_updated', 0)}, "
+                                f"unchanged {counts.get('unchanged', 0)} rows. "
+                                f"Skipped {skipped} rows.",
                                 "Skipped: "
                                 f"missing task={skip_reasons['missing_task']}, "
-                                f"missing team={skip_reasons['missing_team']}"
+                                f"missing team={skip_reasons['missing_team']}, "
+                                f"duplicate in file={skip_reasons.get('duplicate', 0)}"
+                                if skipped
+                                else None,
                             )
-                        st.rerun()
+                            st.rerun()
 
     st.subheader("Dependency list")
     dependency_filter_cols = st.columns(4, gap="small")
@@ -2477,7 +1767,7 @@ if tab_choice == "Dependencies":
         dependency_search = st.text_input(
             "Search",
             key="dependency_search",
-            help="Filter by task/sub-task/team",
+            help="Substring search over task/sub-task/team",
         )
     if dependency_rows:
         dependency_df = pd.DataFrame([dict(row) for row in dependency_rows])
@@ -2501,15 +1791,9 @@ if tab_choice == "Dependencies":
                 filtered_dependency_df["team"] == dependency_team_filter
             ]
         if dependency_search.strip():
-            query = dependency_search.strip().lower()
-            searchable = (
-                filtered_dependency_df[["task", "sub_task", "team"]]
-                .fillna("")
-                .agg(" ".join, axis=1)
-                .str.lower()
-            )
+            matching_ids = search_item_ids("dependency", dependency_search)
             filtered_dependency_df = filtered_dependency_df[
-                searchable.str.contains(query)
+                filtered_dependency_df["id"].isin(matching_ids)
             ]
         selection = st.dataframe(
             filtered_dependency_df,
@@ -2544,20 +1828,29 @@ if tab_choice == "Dependencies":
         st.caption("Selected: none")
 
     if len(selected_ids) > 1:
+        backlog_index = fetch_backlog_label_index()
+        backlog_search = label_search_box(
+            backlog_index, "backlogs", "bulk_dependency_backlogs"
+        )
         with st.form("bulk_assign_dependency_backlogs_form"):
             st.caption("Bulk assign backlogs (replaces existing assignments).")
-            bulk_backlogs = st.multiselect(
+            backlog_ids = label_multiselect(
                 "Assign backlogs",
-                backlog_labels,
-                key="bulk_dependency_backlogs",
-                placeholder=PLACEHOLDER_OPTION,
+                backlog_index,
+                "bulk_dependency_backlogs",
+                backlog_search,
             )
             bulk_submit = st.form_submit_button("Apply backlogs")
             if bulk_submit:
-                backlog_ids = [backlog_choices[label] for label in bulk_backlogs]
-                with get_conn() as conn:
-                    for dependency_id in selected_ids:
-                        upsert_dependency_backlogs(conn, dependency_id, backlog_ids)
+                with write_conn() as conn:
+                    sync_links(
+                        conn,
+                        "backlog_dependency",
+                        "dependency_id",
+                        "backlog_id",
+                        selected_ids,
+                        backlog_ids,
+                    )
                 st.success("Backlogs updated.")
                 st.rerun()
 
@@ -2581,36 +1874,18 @@ if tab_choice == "Dependencies":
 
 if tab_choice == "Backlog x Dependencies":
     st.subheader("Backlog x Dependencies")
-    join_rows = fetch_backlog_dependency_rows()
-    if join_rows:
-        join_df = pd.DataFrame([dict(row) for row in join_rows])
-        st.dataframe(join_df, width="stretch")
-    else:
-        st.info("No backlog/dependency links yet.")
+    render_cross_view(("dependency",), "backlog_x_dependencies")
 
 if tab_choice == "Backlog x Sub-backlogs":
     st.subheader("Backlog x Sub-backlogs")
-    join_rows = fetch_backlog_sub_backlog_rows()
-    if join_rows:
-        join_df = pd.DataFrame([dict(row) for row in join_rows])
-        st.dataframe(join_df, width="stretch")
-    else:
-        st.info("No backlog/sub-backlog links yet.")
+    render_cross_view(("sub_backlog",), "backlog_x_sub_backlogs")
 
 if tab_choice == "Backlog x Sub-backlogs x Dependencies":
     st.subheader("Backlog x Sub-backlogs x Dependencies")
-    join_rows = fetch_backlog_sub_backlog_dependency_rows()
-    if join_rows:
-        join_df = pd.DataFrame([dict(row) for row in join_rows])
-        st.dataframe(join_df, width="stretch")
-    else:
-        st.info("No backlog/sub-backlog/dependency links yet.")
+    render_cross_view(("sub_backlog", "dependency"), "backlog_x_sub_backlogs_x_dependencies")
 
 if tab_choice == "Sub-backlogs":
-    backlog_rows = fetch_backlogs()
     sub_backlog_rows = fetch_sub_backlogs()
-    backlog_choices = {backlog_label(row): row["id"] for row in backlog_rows}
-    backlog_labels = list(backlog_choices.keys())
 
     @st.dialog("Add sub-backlog")
     def add_sub_backlog_dialog():
@@ -2625,7 +1900,7 @@ if tab_choice == "Sub-backlogs":
                 if not title.strip():
                     st.error("Sub-backlog title is required.")
                 else:
-                    with get_conn() as conn:
+                    with write_conn() as conn:
                         sub_backlog_id = insert_sub_backlog(
                             conn,
                             title.strip(),
@@ -2658,7 +1933,7 @@ if tab_choice == "Sub-backlogs":
                 if not title.strip():
                     st.error("Sub-backlog title is required.")
                 else:
-                    with get_conn() as conn:
+                    with write_conn() as conn:
                         conn.execute(
                             """
                             UPDATE sub_backlog
@@ -2686,7 +1961,7 @@ if tab_choice == "Sub-backlogs":
             st.write(items)
         if st.button("Confirm delete", type="primary"):
             placeholders = ",".join(["?"] * len(selected_ids))
-            with get_conn() as conn:
+            with write_conn() as conn:
                 conn.execute(
                     f"DELETE FROM sub_backlog WHERE id IN ({placeholders})",
                     tuple(selected_ids),
@@ -2759,7 +2034,7 @@ if tab_choice == "Themes":
                 if not theme_name.strip():
                     st.error("Theme name is required.")
                 else:
-                    with get_conn() as conn:
+                    with write_conn() as conn:
                         insert_theme(conn, theme_name.strip())
                     st.success("Theme added.")
                     st.rerun()
@@ -2778,7 +2053,7 @@ if tab_choice == "Themes":
                 else:
                     old_name = theme_row["name"]
                     try:
-                        with get_conn() as conn:
+                        with write_conn() as conn:
                             conn.execute(
                                 "UPDATE theme SET name = ? WHERE id = ?",
                                 (new_name.strip(), theme_row["id"]),
@@ -2804,7 +2079,7 @@ if tab_choice == "Themes":
             st.write(items)
         if st.button("Confirm delete", type="primary"):
             placeholders = ",".join(["?"] * len(selected_ids))
-            with get_conn() as conn:
+            with write_conn() as conn:
                 conn.execute(
                     f"DELETE FROM theme WHERE id IN ({placeholders})",
                     tuple(selected_ids),
@@ -2881,7 +2156,7 @@ if tab_choice == "Evaluations":
                 if not evaluation_name.strip():
                     st.error("Evaluation name is required.")
                 else:
-                    with get_conn() as conn:
+                    with write_conn() as conn:
                         insert_evaluation(
                             conn,
                             evaluation_name.strip(),
@@ -2909,7 +2184,7 @@ if tab_choice == "Evaluations":
                 else:
                     old_name = evaluation_row["name"]
                     try:
-                        with get_conn() as conn:
+                        with write_conn() as conn:
                             conn.execute(
                                 "UPDATE evaluation SET name = ?, note = ? WHERE id = ?",
                                 (new_name.strip(), new_note.strip() or None, evaluation_row["id"]),
@@ -2935,7 +2210,7 @@ if tab_choice == "Evaluations":
             st.write(items)
         if st.button("Confirm delete", type="primary"):
             placeholders = ",".join(["?"] * len(selected_ids))
-            with get_conn() as conn:
+            with write_conn() as conn:
                 conn.execute(
                     f"DELETE FROM evaluation WHERE id IN ({placeholders})",
                     tuple(selected_ids),
@@ -3011,7 +2286,7 @@ if tab_choice == "Meetings":
                 if not meeting_title.strip():
                     st.error("Meeting title is required.")
                 else:
-                    with get_conn() as conn:
+                    with write_conn() as conn:
                         insert_meeting(
                             conn,
                             meeting_title.strip(),
@@ -3033,7 +2308,7 @@ if tab_choice == "Meetings":
                 if not new_title.strip():
                     st.error("Meeting title is required.")
                 else:
-                    with get_conn() as conn:
+                    with write_conn() as conn:
                         conn.execute(
                             """
                             UPDATE meeting
@@ -3061,7 +2336,7 @@ if tab_choice == "Meetings":
             st.write(items)
         if st.button("Confirm delete", type="primary"):
             placeholders = ",".join(["?"] * len(selected_ids))
-            with get_conn() as conn:
+            with write_conn() as conn:
                 conn.execute(
                     f"DELETE FROM meeting WHERE id IN ({placeholders})",
                     tuple(selected_ids),
@@ -3122,58 +2397,33 @@ if tab_choice == "Meetings":
 
 
 if tab_choice == "Meeting Notes":
-    meeting_rows = fetch_meeting_notes()
     note_type_options = ["Todo", "Decision"]
-    backlog_rows = fetch_backlogs()
-    dependency_rows = fetch_dependencies()
-    theme_rows = fetch_theme_rows()
-    evaluation_rows = fetch_evaluation_rows()
     meeting_list = fetch_meetings()
 
-    backlog_choices = {
-        backlog_label(row): row["id"] for row in backlog_rows
-    }
-    dependency_choices = {
-        dependency_label(row): row["id"] for row in dependency_rows
-    }
-    theme_choices = {row["name"]: row["id"] for row in theme_rows}
-    evaluation_choices = {row["name"]: row["id"] for row in evaluation_rows}
     meeting_choices = {
         f"{row['meeting_datetime']} | {row['title']}": row["id"]
         for row in meeting_list
     }
 
-    backlog_labels = list(backlog_choices.keys())
-    dependency_labels = list(dependency_choices.keys())
-    theme_labels = list(theme_choices.keys())
-    evaluation_labels = list(evaluation_choices.keys())
     meeting_labels = list(meeting_choices.keys())
 
     @st.dialog("Edit meeting note")
     def edit_meeting_note_dialog(note_row):
-        selected_backlog_ids = fetch_meeting_note_backlog_ids(note_row["id"])
-        selected_dependency_ids = fetch_meeting_note_dependency_ids(note_row["id"])
-        selected_theme_ids = fetch_meeting_note_theme_ids(note_row["id"])
-        selected_evaluation_ids = fetch_meeting_note_evaluation_ids(note_row["id"])
-
-        backlog_selected_labels = [
-            label
-            for label, item_id in backlog_choices.items()
-            if item_id in selected_backlog_ids
-        ]
-        dependency_selected_labels = [
-            label
-            for label, item_id in dependency_choices.items()
-            if item_id in selected_dependency_ids
-        ]
-        theme_selected_labels = [
-            label for label, item_id in theme_choices.items() if item_id in selected_theme_ids
-        ]
-        evaluation_selected_labels = [
-            label
-            for label, item_id in evaluation_choices.items()
-            if item_id in selected_evaluation_ids
-        ]
+        key_suffix = note_row["id"]
+        note_links = {
+            kind: links[note_row["id"]]
+            for kind, links in fetch_meeting_note_link_id_sets((note_row["id"],)).items()
+        }
+        backlog_index = fetch_backlog_label_index()
+        backlog_search = label_search_box(
+            backlog_index, "backlogs", f"edit_meeting_note_backlogs_{key_suffix}"
+        )
+        dependency_index = fetch_dependency_label_index()
+        dependency_search = label_search_box(
+            dependency_index,
+            "dependencies",
+            f"edit_meeting_note_dependencies_{key_suffix}",
+        )
 
         with st.form("edit_meeting_note_form"):
             meeting_selected_label = next(
@@ -3194,17 +2444,19 @@ if tab_choice == "Meeting Notes":
                     "Topic (optional)",
                     value=note_row["topic"] or "",
                 )
-                selected_backlogs = st.multiselect(
+                backlog_ids = label_multiselect(
                     "Assign to backlogs",
-                    backlog_labels,
-                    default=backlog_selected_labels,
-                    placeholder=PLACEHOLDER_OPTION,
+                    backlog_index,
+                    f"edit_meeting_note_backlogs_{key_suffix}",
+                    backlog_search,
+                    sorted(note_links["backlog"]),
                 )
-                selected_dependencies = st.multiselect(
+                dependency_ids = label_multiselect(
                     "Assign to dependencies",
-                    dependency_labels,
-                    default=dependency_selected_labels,
-                    placeholder=PLACEHOLDER_OPTION,
+                    dependency_index,
+                    f"edit_meeting_note_dependencies_{key_suffix}",
+                    dependency_search,
+                    sorted(note_links["dependency"]),
                 )
             with right_col:
                 meeting_label = st.selectbox(
@@ -3233,17 +2485,17 @@ if tab_choice == "Meeting Notes":
                     note_type_options_with_placeholder,
                     index=note_type_index,
                 )
-                selected_themes = st.multiselect(
+                theme_ids = label_multiselect(
                     "Assign to themes",
-                    theme_labels,
-                    default=theme_selected_labels,
-                    placeholder=PLACEHOLDER_OPTION,
+                    fetch_theme_label_index(),
+                    f"edit_meeting_note_themes_{key_suffix}",
+                    default_ids=sorted(note_links["theme"]),
                 )
-                selected_evaluations = st.multiselect(
+                evaluation_ids = label_multiselect(
                     "Assign to evaluations",
-                    evaluation_labels,
-                    default=evaluation_selected_labels,
-                    placeholder=PLACEHOLDER_OPTION,
+                    fetch_evaluation_label_index(),
+                    f"edit_meeting_note_evaluations_{key_suffix}",
+                    default_ids=sorted(note_links["evaluation"]),
                 )
             note = st.text_area(
                 "Note (bullet)",
@@ -3255,15 +2507,7 @@ if tab_choice == "Meeting Notes":
                 if not note.strip():
                     st.error("Note is required.")
                 else:
-                    backlog_ids = [backlog_choices[label] for label in selected_backlogs]
-                    dependency_ids = [
-                        dependency_choices[label] for label in selected_dependencies
-                    ]
-                    theme_ids = [theme_choices[label] for label in selected_themes]
-                    evaluation_ids = [
-                        evaluation_choices[label] for label in selected_evaluations
-                    ]
-                    with get_conn() as conn:
+                    with write_conn() as conn:
                         meeting_id = meeting_choices.get(meeting_label)
                         if note_type == PLACEHOLDER_OPTION:
                             st.error("Note type is required.")
@@ -3309,7 +2553,7 @@ if tab_choice == "Meeting Notes":
             st.write(items)
         if st.button("Confirm delete", type="primary"):
             placeholders = ",".join(["?"] * len(selected_ids))
-            with get_conn() as conn:
+            with write_conn() as conn:
                 conn.execute(
                     f"DELETE FROM meeting_note WHERE id IN ({placeholders})",
                     tuple(selected_ids),
@@ -3342,7 +2586,7 @@ if tab_choice == "Meeting Notes":
             if not note_text.strip():
                 st.error("Note is required.")
             else:
-                with get_conn() as conn:
+                with write_conn() as conn:
                     meeting_id = meeting_choices.get(meeting_label)
                     note_id = insert_meeting_note(
                         conn,
@@ -3356,8 +2600,71 @@ if tab_choice == "Meeting Notes":
                 st.rerun()
 
     with st.expander("Meeting notes table", expanded=True):
+        note_filter_cols = st.columns(3, gap="small")
+        with note_filter_cols[0]:
+            note_meeting_filter = st.selectbox(
+                "Meeting (filter)",
+                with_placeholder(meeting_labels),
+                index=0,
+                key="meeting_note_meeting_filter",
+            )
+        with note_filter_cols[1]:
+            note_type_filter = st.selectbox(
+                "Type (filter)",
+                with_placeholder(note_type_options),
+                index=0,
+                key="meeting_note_type_filter",
+            )
+        with note_filter_cols[2]:
+            note_status_filter = st.selectbox(
+                "Status (filter)",
+                with_placeholder(MEETING_NOTE_STATUSES),
+                index=0,
+                key="meeting_note_status_filter",
+            )
+        note_filter_row2 = st.columns(3, gap="small")
+        with note_filter_row2[0]:
+            note_date_from = st.date_input(
+                "From date", value=None, key="meeting_note_date_from"
+            )
+        with note_filter_row2[1]:
+            note_date_to = st.date_input("To date", value=None, key="meeting_note_date_to")
+        with note_filter_row2[2]:
+            meeting_note_search = st.text_input(
+                "Search",
+                key="meeting_note_search",
+                help="Substring search over topic/note",
+            )
+        note_type_choice = normalize_choice(note_type_filter)
+        note_filters = tuple(
+            {
+                "meeting_id": meeting_choices.get(note_meeting_filter),
+                "note_type": note_type_choice.lower() if note_type_choice else None,
+                "status": normalize_choice(note_status_filter),
+                "date_from": note_date_from.isoformat() if note_date_from else None,
+                "date_to": note_date_to.isoformat() if note_date_to else None,
+                "search": meeting_note_search,
+            }.items()
+        )
+        # The feed keeps the cursor of every page loaded so far; each page is a
+        # cached keyset read, so "Load more" only queries the new page.
+        if st.session_state.get("meeting_note_feed_filters") != note_filters:
+            st.session_state["meeting_note_feed_filters"] = note_filters
+            st.session_state["meeting_note_feed_cursors"] = [None]
+        meeting_rows = []
+        has_more_notes = False
+        for cursor in st.session_state["meeting_note_feed_cursors"]:
+            page_rows, has_more_notes = fetch_meeting_note_feed(
+                note_filters, MEETING_NOTE_FEED_PAGE_SIZE, cursor
+            )
+            meeting_rows.extend(page_rows)
+            if not has_more_notes:
+                break
+        note_total = count_meeting_notes(note_filters)
         if meeting_rows:
-            meeting_df = pd.DataFrame([dict(row) for row in meeting_rows])
+            meeting_df = pd.DataFrame([dict(row) for row in meeting_rows]).drop(
+                columns=["meeting_date_key"]
+            )
             selection = st.dataframe(
                 meeting_df,
                 width="stretch",
@@ -3371,8 +2678,27 @@ if tab_choice == "Meeting Notes":
                 st.session_state["selected_meeting_note_ids"] = selected_ids
             else:
                 st.session_state.pop("selected_meeting_note_ids", None)
+        elif any(value for _, value in note_filters):
+            st.info("No meeting notes match the filters.")
         else:
             st.info("No meeting notes yet.")
+        feed_cols = st.columns([1, 3], gap="small", vertical_alignment="center")
+        with feed_cols[0]:
+            st.button(
+                "Load more",
+                key="meeting_note_load_more",
+                disabled=not has_more_notes,
+                on_click=st.session_state["meeting_note_feed_cursors"].append,
+                args=(
+                    (
+                        (meeting_rows[-1]["meeting_date_key"], meeting_rows[-1]["id"])
+                        if meeting_rows
+                        else None
+                    ),
+                ),
+            )
+        with feed_cols[1]:
+            st.caption(f"Showing {len(meeting_rows)} of {note_total} matching meeting notes")
 
         note_by_id = {row["id"]: row for row in meeting_rows}
         selected_ids = st.session_state.get("selected_meeting_note_ids", [])
@@ -3387,54 +2713,57 @@ if tab_choice == "Meeting Notes":
             st.caption("Selected: none")
 
         if len(selected_ids) > 1:
+            backlog_index = fetch_backlog_label_index()
+            backlog_search = label_search_box(
+                backlog_index, "backlogs", "bulk_meeting_note_backlogs"
+            )
+            dependency_index = fetch_dependency_label_index()
+            dependency_search = label_search_box(
+                dependency_index, "dependencies", "bulk_meeting_note_dependencies"
+            )
             with st.form("bulk_assign_meeting_notes_form"):
                 st.caption("Bulk assign (replaces existing assignments).")
                 left_col, right_col = st.columns(2, gap="large")
                 with left_col:
-                    bulk_backlogs = st.multiselect(
+                    backlog_ids = label_multiselect(
                         "Assign to backlogs",
-                        backlog_labels,
-                        key="bulk_meeting_note_backlogs",
-                        placeholder=PLACEHOLDER_OPTION,
+                        backlog_index,
+                        "bulk_meeting_note_backlogs",
+                        backlog_search,
                     )
-                    bulk_dependencies = st.multiselect(
+                    dependency_ids = label_multiselect(
                         "Assign to dependencies",
-                        dependency_labels,
-                        key="bulk_meeting_note_dependencies",
-                        placeholder=PLACEHOLDER_OPTION,
+                        dependency_index,
+                        "bulk_meeting_note_dependencies",
+                        dependency_search,
                     )
                 with right_col:
-                    bulk_themes = st.multiselect(
+                    theme_ids = label_multiselect(
                         "Assign to themes",
-                        theme_labels,
-                        key="bulk_meeting_note_themes",
-                        placeholder=PLACEHOLDER_OPTION,
+                        fetch_theme_label_index(),
+                        "bulk_meeting_note_themes",
                     )
-                    bulk_evaluations = st.multiselect(
+                    evaluation_ids = label_multiselect(
                         "Assign to evaluations",
-                        evaluation_labels,
-                        key="bulk_meeting_note_evaluations",
-                        placeholder=PLACEHOLDER_OPTION,
+                        fetch_evaluation_label_index(),
+                        "bulk_meeting_note_evaluations",
                     )
                 bulk_submit = st.form_submit_button("Apply assignments")
                 if bulk_submit:
-                    backlog_ids = [backlog_choices[label] for label in bulk_backlogs]
-                    dependency_ids = [
-                        dependency_choices[label] for label in bulk_dependencies
-                    ]
-                    theme_ids = [theme_choices[label] for label in bulk_themes]
-                    evaluation_ids = [
-                        evaluation_choices[label] for label in bulk_evaluations
-                    ]
-                    with get_conn() as conn:
-                        for note_id in selected_ids:
-                            upsert_meeting_note_backlogs(conn, note_id, backlog_ids)
-                            upsert_meeting_note_dependencies(
-                                conn, note_id, dependency_ids
-                            )
-                            upsert_meeting_note_themes(conn, note_id, theme_ids)
-                            upsert_meeting_note_evaluations(
-                                conn, note_id, evaluation_ids
+                    with write_conn() as conn:
+                        for table, target_column, target_ids in (
+                            ("meeting_note_backlog", "backlog_id", backlog_ids),
+                            ("meeting_note_dependency", "dependency_id", dependency_ids),
+                            ("meeting_note_theme", "theme_id", theme_ids),
+                            ("meeting_note_evaluation", "evaluation_id", evaluation_ids),
+                        ):
+                            sync_links(
+                                conn,
+                                table,
+                                "meeting_note_id",
+                                target_column,
+                                selected_ids,
+                                target_ids,
                             )
                     st.success("Assignments updated.")
                     st.rerun()
@@ -3457,7 +2786,44 @@ if tab_choice == "Meeting Notes":
 if tab_choice == "Todo Notes":
     st.subheader("Todo meeting notes")
     show_completed = st.checkbox("Show completed", value=False)
-    todo_rows = fetch_todo_meeting_notes(include_completed=show_completed)
+    save_report = st.session_state.pop("todo_save_report", None)
+    if save_report is not None:
+        updated, conflicts = save_report
+        st.success(f"Updated {updated} statuses.")
+        if not conflicts.empty:
+            st.warning(
+                f"{len(conflicts)} notes were changed by someone else since you "
+                "started editing, so your status for them was not saved. "
+                "The board below shows their current status."
+            )
+            st.dataframe(
+                conflicts.rename(
+                    columns={
+                        "expected_status": "status you started from",
+                        "current_status": "current status",
+                        "status": "your status",
+                    }
+                ),
+                width="stretch",
+                hide_index=True,
+            )
+    # The editor keeps the snapshot it started from while edits are pending,
+    # so a save can tell which statuses changed underneath it.
+    editor_key = (
+        f"todo_editor_{st.session_state.get('todo_editor_version', 0)}_{show_completed}"
+    )
+    todo_snapshot = st.session_state.get("todo_snapshot")
+    if (
+        todo_snapshot is None
+        or todo_snapshot[0] != editor_key
+        or not st.session_state.get(editor_key, {}).get("edited_rows")
+    ):
+        todo_snapshot = (
+            editor_key,
+            fetch_todo_meeting_notes(include_completed=show_completed),
+        )
+        st.session_state["todo_snapshot"] = todo_snapshot
+    todo_rows = todo_snapshot[1]
     if todo_rows:
         todo_df = pd.DataFrame([dict(row) for row in todo_rows])
         editable_df = st.data_editor(
@@ -3467,7 +2833,8 @@ if tab_choice == "Todo Notes":
             column_config={
                 "status": st.column_config.SelectboxColumn(
                     "Status",
-                    options=["open", "in-progress", "completed"],
+                    options=MEETING_NOTE_STATUSES,
+                    required=True,
                 )
             },
             disabled=[
@@ -3478,20 +2845,27 @@ if tab_choice == "Todo Notes":
                 "note_type",
                 "note",
             ],
+            key=editor_key,
         )
         if st.button("Save statuses", type="primary"):
-            updates = []
-            for _, row in editable_df.iterrows():
-                original = todo_df.loc[todo_df["id"] == row["id"], "status"].iloc[0]
-                if row["status"] != original:
-                    updates.append((row["status"], int(row["id"])))
-            if updates:
-                with get_conn() as conn:
-                    conn.executemany(
-                        "UPDATE meeting_note SET status = ? WHERE id = ?",
-                        updates,
-                    )
-                st.success("Statuses updated.")
+            status_diff = todo_df[["id", "status"]].merge(
+                editable_df[["id", "status"]],
+                on="id",
+                suffixes=("_seen", "_edited"),
+            )
+            # status is NOT NULL; a cleared cell is not a change to save.
+            changes = status_diff.loc[
+                status_diff["status_edited"].notna()
+                & (status_diff["status_seen"].fillna("") != status_diff["status_edited"])
+            ].rename(columns={"status_seen": "expected_status", "status_edited": "status"})
+            if not changes.empty:
+                with write_conn() as conn:
+                    updated, conflicts = update_meeting_note_statuses(conn, changes)
+                st.session_state["todo_save_report"] = (updated, conflicts)
+                st.session_state["todo_editor_version"] = (
+                    st.session_state.get("todo_editor_version", 0) + 1
+                )
+                st.session_state.pop("todo_snapshot", None)
                 st.rerun()
             else:
                 st.info("No status changes detected.")
@@ -3500,24 +2874,80 @@ if tab_choice == "Todo Notes":
 
 if tab_choice == "Sprint x Team":
     st.subheader("Sprint x Team points")
-    backlog_rows = fetch_backlogs()
-    if backlog_rows:
-        backlog_df = pd.DataFrame([dict(row) for row in backlog_rows])
-        metric_df = backlog_df.dropna(subset=["team", "sprint"]).copy()
-        metric_df["estimation"] = metric_df["estimation"].fillna(0)
-        pivot = (
-            metric_df.pivot_table(
+    rollup_rows = fetch_sprint_team_rollup()
+    team_capacities = fetch_team_capacities()
+    if rollup_rows:
+        rollup_df = pd.DataFrame([dict(row) for row in rollup_rows])
+        measure = st.radio(
+            "Measure",
+            ["Points", "Items"],
+            horizontal=True,
+            key="sprint_team_measure",
+        )
+        value_column = "total_estimation" if measure == "Points" else "item_count"
+        pivot = rollup_df.pivot_table(
+            index="sprint",
+            columns="team",
+            values=value_column,
+            aggfunc="sum",
+            fill_value=0,
+        ).sort_index()
+        totals = pivot.copy()
+        totals["Total"] = totals.sum(axis=1)
+        totals.loc["Total"] = totals.sum(axis=0)
+        st.dataframe(totals, width="stretch")
+
+        capacity_teams = [team for team in pivot.columns if team in team_capacities]
+        st.subheader("Capacity")
+        if capacity_teams:
+            points = rollup_df.pivot_table(
                 index="sprint",
                 columns="team",
-                values="estimation",
+                values="total_estimation",
                 aggfunc="sum",
                 fill_value=0,
+            ).sort_index()[capacity_teams]
+            remaining = pd.DataFrame(
+                {team: team_capacities[team] - points[team] for team in capacity_teams}
             )
-            .sort_index()
-        )
-        if pivot.empty:
-            st.info("No points available for Sprint x Team yet.")
+            st.caption(
+                "Remaining points per sprint (capacity minus planned); "
+                "negative values are over capacity."
+            )
+            st.dataframe(remaining, width="stretch")
+            over_capacity = (remaining < 0).sum().sum()
+            if over_capacity:
+                st.warning(f"{over_capacity} sprint/team cell(s) are over capacity.")
         else:
-            st.dataframe(pivot, width="stretch")
+            st.info("Set team capacities below to compare planned points.")
     else:
-        st.info("No backlog items yet.")
+        st.info("No points available for Sprint x Team yet.")
+
+    with st.expander("Team capacity (points per sprint)"):
+        capacity_team_names = sorted(
+            set(BACKLOG_TEAMS)
+            | set(team_capacities)
+            | {row["team"] for row in rollup_rows}
+        )
+        with st.form("team_capacity_form"):
+            capacity_inputs = {
+                team: st.number_input(
+                    team,
+                    min_value=0,
+                    step=1,
+                    value=team_capacities.get(team),
+                    key=f"team_capacity_{team}",
+                )
+                for team in capacity_team_names
+            }
+            if st.form_submit_button("Save capacities"):
+                with write_conn() as conn:
+                    for team, capacity in capacity_inputs.items():
+                        upsert_team_capacity(
+                            conn, team, None if capacity is None else int(capacity)
+                        )
+                st.success("Capacities saved.")
+                st.rerun()
+
+if rerun_profile is not None:
+    finish_rerun_profile(rerun_profile, tab_choice)
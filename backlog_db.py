@@ -0,0 +1,3343 @@
+import atexit
+import base64
+import functools
+import hashlib
+import io
+import json
+import logging
+import numbers
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime
+from types import MappingProxyType
+import pandas as pd
+import streamlit as st
+from PIL import Image
+
+
+DB_PATH = "backlog.db"
+BACKLOG_TEAMS = ["Team 1", "Team 2"]
+DEPENDENCY_TEAMS = ["PC", "BC", "CC", "Integration", "Auth", "Digital"]
+SPRINTS = [f"Sprint {i}" for i in range(1, 12)]
+PLACEHOLDER_OPTION = "Choose options"
+BACKLOG_TEXT_FILTERS = {
+    "task": "b.task",
+    "task_details": "b.task_details",
+    "lob": "b.lob",
+}
+BACKLOG_CHOICE_FILTERS = {
+    "theme": "b.theme",
+    "team": "b.team",
+    "sprint": "b.sprint",
+    "evaluation": "b.evaluation",
+}
+BACKLOG_SEARCH_COLUMNS = ["b.task", "b.task_details", "b.lob", "b.theme", "b.evaluation"]
+MEETING_NOTE_CHOICE_FILTERS = {
+    "meeting_id": "mn.meeting_id",
+    "note_type": "mn.note_type",
+    "status": "mn.status",
+}
+MEETING_NOTE_SEARCH_COLUMNS = ["mn.topic", "mn.note"]
+SEARCH_SOURCES = {
+    "backlog": {
+        "code": 1,
+        "title": "task",
+        "detail": "task_details",
+        "extra": ("lob", "theme", "evaluation"),
+    },
+    "dependency": {
+        "code": 2,
+        "title": "task",
+        "detail": "sub_task",
+        "extra": ("team",),
+    },
+    "meeting_note": {
+        "code": 3,
+        "title": "topic",
+        "detail": "note",
+        "extra": (),
+    },
+}
+SEARCH_ROWID_STRIDE = 4
+DB_POOL_SIZE = int(os.environ.get("BACKLOG_DB_POOL_SIZE", "8"))
+DB_POOL_TIMEOUT = float(os.environ.get("BACKLOG_DB_POOL_TIMEOUT", "10"))
+DB_HEALTH_CHECK_INTERVAL = float(
+    os.environ.get("BACKLOG_DB_HEALTH_CHECK_INTERVAL", "30")
+)
+DB_BUSY_TIMEOUT = float(os.environ.get("BACKLOG_DB_BUSY_TIMEOUT", "5"))
+DB_WRITE_RETRIES = int(os.environ.get("BACKLOG_DB_WRITE_RETRIES", "5"))
+DB_WRITE_RETRY_DELAY = 0.05
+PASTE_IMAGE_MAX_BYTES = 5 * 1024 * 1024
+IMAGE_THUMBNAIL_SIZE = 320
+IMAGE_THUMBNAIL_QUALITY = 75
+IMAGE_THUMBNAIL_BACKFILL_BATCH = 50
+QUERY_CACHE_MAX_ENTRIES = 256
+PROFILE_ENABLED = os.environ.get("BACKLOG_PROFILE", "") == "1"
+PROFILE_LOG_PATH = os.environ.get("BACKLOG_PROFILE_LOG", "profile.log")
+BULK_IMPORT_BATCH_SIZE = 5000
+CSV_PREVIEW_ROWS = 20
+CSV_IMPORT_CHUNK_ROWS = 50000
+LABEL_SEARCH_LIMIT = 50
+BACKLOG_LINK_COUNTS = {
+    "dependency_count": "backlog_dependency",
+    "sub_backlog_count": "sub_backlog_backlog",
+    "meeting_note_count": "meeting_note_backlog",
+}
+WRITE_STATEMENT_PATTERN = re.compile(
+    r"\b(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)"
+    r"\s+(?!(?:SET|OF)\b)[\"`\[]?(\w+)",
+    re.IGNORECASE,
+)
+
+
+def with_placeholder(options):
+    return [PLACEHOLDER_OPTION] + list(options)
+
+
+def normalize_choice(value):
+    return None if value == PLACEHOLDER_OPTION else value
+
+
+@functools.lru_cache(maxsize=1024)
+def written_tables_for(sql):
+    return frozenset(match.lower() for match in WRITE_STATEMENT_PATTERN.findall(sql))
+
+
+class RerunProfile:
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.started = time.perf_counter()
+        self.last_mark = self.started
+        self.sections = []
+        self.statements = []
+
+    def record_statement(self, sql, seconds, rows):
+        statement = {"sql": " ".join(sql.split()), "seconds": seconds, "rows": rows}
+        self.statements.append(statement)
+        return statement
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.sections.append({"name": name, "seconds": now - self.last_mark})
+        self.last_mark = now
+
+    def summary(self):
+        return {
+            "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+            "session_id": self.session_id,
+            "total_seconds": time.perf_counter() - self.started,
+            "sql_seconds": sum(statement["seconds"] for statement in self.statements),
+            "statement_count": len(self.statements),
+            "sections": self.sections,
+            "statements": self.statements,
+        }
+
+
+@st.cache_resource
+def get_profile_state():
+    return threading.local()
+
+
+def current_profile():
+    if not PROFILE_ENABLED:
+        return None
+    return getattr(get_profile_state(), "profile", None)
+
+
+class ProfilingCursor(sqlite3.Cursor):
+    statement = None
+
+    def _timed_fetch(self, fetch, *args):
+        started = time.perf_counter()
+        result = fetch(*args)
+        if self.statement is not None:
+            self.statement["seconds"] += time.perf_counter() - started
+            fetched = len(result) if isinstance(result, list) else int(result is not None)
+            self.statement["rows"] = max(self.statement["rows"], 0) + fetched
+        return result
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone)
+
+    def fetchmany(self, size=1):
+        return self._timed_fetch(super().fetchmany, size)
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall)
+
+    def __next__(self):
+        # `for row in conn.execute(...)` reads through here, not the fetch methods.
+        row = self._timed_fetch(super().fetchone)
+        if row is None:
+            raise StopIteration
+        return row
+
+
+class TrackingConnection(sqlite3.Connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.written_tables = set()
+
+    def execute(self, sql, parameters=()):
+        self.written_tables.update(written_tables_for(sql))
+        profile = current_profile()
+        if profile is None:
+            return super().execute(sql, parameters)
+        started = time.perf_counter()
+        cursor = self.cursor(ProfilingCursor)
+        cursor.execute(sql, parameters)
+        cursor.statement = profile.record_statement(
+            sql, time.perf_counter() - started, cursor.rowcount
+        )
+        return cursor
+
+    def executemany(self, sql, parameters):
+        self.written_tables.update(written_tables_for(sql))
+        profile = current_profile()
+        if profile is None:
+            return super().executemany(sql, parameters)
+        started = time.perf_counter()
+        cursor = super().executemany(sql, parameters)
+        profile.record_statement(sql, time.perf_counter() - started, cursor.rowcount)
+        return cursor
+
+    def executescript(self, sql_script):
+        self.written_tables.update(written_tables_for(sql_script))
+        return super().executescript(sql_script)
+
+    def pop_written_tables(self):
+        written_tables = self.written_tables
+        self.written_tables = set()
+        return written_tables
+
+
+def open_conn():
+    conn = sqlite3.connect(
+        DB_PATH,
+        timeout=DB_BUSY_TIMEOUT,
+        check_same_thread=False,
+        factory=TrackingConnection,
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    def __init__(self, factory, size, timeout, health_check_interval, on_commit=None):
+        self.factory = factory
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.on_commit = on_commit
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._created = 0
+        self._closed = False
+
+    def _create(self):
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+        try:
+            return self.factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _discard(self, conn):
+        with self._lock:
+            self._created -= 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def _is_healthy(self, conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            return False
+        return not conn.in_transaction
+
+    def acquire(self):
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed.")
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._create()
+                if conn is not None:
+                    return conn
+                try:
+                    conn, last_used = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError(
+                        f"No database connection available after {self.timeout}s "
+                        f"(pool size {self.size})."
+                    ) from None
+            idle_for = time.monotonic() - last_used
+            if idle_for < self.health_check_interval or self._is_healthy(conn):
+                return conn
+            self._discard(conn)
+
+    def release(self, conn):
+        if self._closed:
+            self._discard(conn)
+            return
+        if conn.in_transaction:
+            conn.rollback()
+        conn.pop_written_tables()
+        self._idle.put((conn, time.monotonic()))
+
+    def held_connection(self):
+        return getattr(self._local, "conn", None)
+
+    @contextmanager
+    def connection(self):
+        # Nested blocks on one thread share the outer connection and transaction.
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+        conn = self.acquire()
+        self._local.conn = conn
+        try:
+            with conn:
+                yield conn
+        except BaseException as exc:
+            self._local.conn = None
+            # The block's transaction is already rolled back. Constraint
+            # errors and st.rerun() leave the connection fine; only errors
+            # from SQLite itself may have left it unusable.
+            if isinstance(exc, sqlite3.OperationalError) or type(exc) is sqlite3.DatabaseError:
+                self._discard(conn)
+            else:
+                try:
+                    self.release(conn)
+                except sqlite3.Error:
+                    self._discard(conn)
+            raise
+        self._local.conn = None
+        written_tables = conn.pop_written_tables()
+        self.release(conn)
+        if written_tables and self.on_commit is not None:
+            self.on_commit(written_tables)
+
+    def stats(self):
+        with self._lock:
+            created = self._created
+        return {"size": self.size, "open": created, "idle": self._idle.qsize()}
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
+class QueryCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._dependents = {}
+
+    def set_dependents(self, dependents):
+        with self._lock:
+            self._dependents = dependents
+
+    def bump(self, tables):
+        with self._lock:
+            affected = set(tables)
+            for table in tables:
+                affected.update(self._dependents.get(table, ()))
+            for table in affected:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            # Drop stale results right away rather than leaving them to age out
+            # of the LRU; full-table reads can be large.
+            stale = [
+                key
+                for key, (entry_tables, _, _) in self._entries.items()
+                if not affected.isdisjoint(entry_tables)
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def get_or_compute(self, key, tables, compute):
+        with self._lock:
+            generation = tuple(self._generations.get(table, 0) for table in tables)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] == generation:
+                    self._entries.move_to_end(key)
+                    return entry[2]
+                del self._entries[key]
+        value = compute()
+        with self._lock:
+            # Stored under the generation read before computing, so a write that
+            # lands meanwhile makes the next lookup recompute.
+            self._entries[key] = (tables, generation, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+def copy_result(value):
+    # Cached results are shared by every session; hand each caller its own
+    # containers. Rows, strings, numbers and frozensets are immutable already.
+    if isinstance(value, list):
+        return [copy_result(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(copy_result(item) for item in value)
+    if isinstance(value, dict):
+        return {key: copy_result(item) for key, item in value.items()}
+    if isinstance(value, set):
+        return set(value)
+    return value
+
+
+@st.cache_resource
+def get_query_cache():
+    return QueryCache(QUERY_CACHE_MAX_ENTRIES)
+
+
+def cached_query(*tables):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            held = get_pool().held_connection()
+            if held is not None and held.in_transaction:
+                # Reads inside an open write transaction can see rows that are
+                # later rolled back, and a rollback does not bump the cache.
+                return func(*args, **kwargs)
+            query_cache = get_query_cache()
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            result = query_cache.get_or_compute(
+                key, tables, lambda: func(*args, **kwargs)
+            )
+            return copy_result(result)
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
+
+
+def fetch_table_dependents(conn):
+    tables = [
+        row["name"]
+        for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+        ).fetchall()
+    ]
+    direct = {table: set() for table in tables}
+    for table in tables:
+        for fk in conn.execute(f"PRAGMA foreign_key_list({table})").fetchall():
+            if fk["on_delete"] in ("CASCADE", "SET NULL") or fk["on_update"] in (
+                "CASCADE",
+                "SET NULL",
+            ):
+                direct.setdefault(fk["table"], set()).add(table)
+    for trigger in conn.execute(
+        "SELECT tbl_name, sql FROM sqlite_master WHERE type = 'trigger'"
+    ).fetchall():
+        direct.setdefault(trigger["tbl_name"], set()).update(
+            written_tables_for(trigger["sql"] or "")
+        )
+    dependents = {}
+    for table in direct:
+        seen = set()
+        stack = list(direct[table])
+        while stack:
+            child = stack.pop()
+            if child not in seen:
+                seen.add(child)
+                stack.extend(direct.get(child, ()))
+        seen.discard(table)
+        dependents[table] = seen
+    return dependents
+
+
+@st.cache_resource
+def get_pool():
+    pool = ConnectionPool(
+        open_conn,
+        DB_POOL_SIZE,
+        DB_POOL_TIMEOUT,
+        DB_HEALTH_CHECK_INTERVAL,
+        on_commit=get_query_cache().bump,
+    )
+    atexit.register(pool.close)
+    return pool
+
+
+def close_pool():
+    get_pool().close()
+    get_pool.clear()
+
+
+def get_conn():
+    return get_pool().connection()
+
+
+class WriteQueue:
+    # Writers take turns in arrival order; a thread that already holds the
+    # turn (nested write blocks) passes straight through.
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._waiting = deque()
+        self._owner = None
+        self._depth = 0
+
+    def is_owner(self):
+        with self._condition:
+            return self._owner == threading.get_ident()
+
+    @contextmanager
+    def turn(self):
+        thread_id = threading.get_ident()
+        with self._condition:
+            if self._owner == thread_id:
+                self._depth += 1
+            else:
+                ticket = object()
+                self._waiting.append(ticket)
+                while self._owner is not None or self._waiting[0] is not ticket:
+                    self._condition.wait()
+                self._waiting.popleft()
+                self._owner = thread_id
+                self._depth = 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._owner = None
+                    self._condition.notify_all()
+
+
+@st.cache_resource
+def get_write_queue():
+    return WriteQueue()
+
+
+def is_busy_error(exc):
+    message = str(exc).lower()
+    return "locked" in message or "busy" in message
+
+
+def begin_immediate(conn):
+    # Taking the write lock up front means a busy database fails here, where
+    # the statement can be retried, instead of midway through the block.
+    for attempt in range(DB_WRITE_RETRIES + 1):
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            return
+        except sqlite3.OperationalError as exc:
+            if not is_busy_error(exc) or attempt == DB_WRITE_RETRIES:
+                raise
+            logger.warning("Database busy, retrying write (attempt %s)", attempt + 1)
+            time.sleep(DB_WRITE_RETRY_DELAY * 2**attempt)
+
+
+@contextmanager
+def write_conn():
+    write_queue = get_write_queue()
+    # A write block nested in a plain get_conn() block would hand the turn back
+    # before the outer block commits, letting the next writer in early.
+    if get_pool().held_connection() is not None and not write_queue.is_owner():
+        raise RuntimeError("write_conn() cannot be opened inside a get_conn() block")
+    with write_queue.turn(), get_conn() as conn:
+        if not conn.in_transaction:
+            begin_immediate(conn)
+        yield conn
+
+
+def execute_script(conn, script):
+    # executescript() commits before it runs, which would split a migration
+    # step from its schema_version row; run the statements one at a time.
+    statement = ""
+    for part in script.split(";"):
+        statement += part + ";"
+        if sqlite3.complete_statement(statement):
+            if statement.strip().strip(";").strip():
+                conn.execute(statement)
+            statement = ""
+
+
+def migrate_legacy_schema(conn):
+    execute_script(
+        conn,
+        """
+        CREATE TABLE IF NOT EXISTS backlog (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task TEXT NOT NULL,
+            task_details TEXT,
+            lob TEXT,
+            image_blob BLOB,
+            theme TEXT NOT NULL,
+            evaluation TEXT,
+            estimation INTEGER,
+            team TEXT,
+            sprint TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS dependency (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task TEXT NOT NULL,
+            sub_task TEXT,
+            team TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS theme (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE
+        );
+
+        CREATE TABLE IF NOT EXISTS evaluation (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            note TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS backlog_dependency (
+            backlog_id INTEGER NOT NULL,
+            dependency_id INTEGER NOT NULL,
+            PRIMARY KEY (backlog_id, dependency_id),
+            FOREIGN KEY (backlog_id) REFERENCES backlog(id) ON DELETE CASCADE,
+            FOREIGN KEY (dependency_id) REFERENCES dependency(id) ON DELETE CASCADE
+        );
+
+        CREATE TABLE IF NOT EXISTS sub_backlog (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            backlog_id INTEGER,
+            title TEXT NOT NULL,
+            note TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS sub_backlog_backlog (
+            sub_backlog_id INTEGER NOT NULL,
+            backlog_id INTEGER NOT NULL,
+            PRIMARY KEY (sub_backlog_id, backlog_id),
+            FOREIGN KEY (sub_backlog_id) REFERENCES sub_backlog(id) ON DELETE CASCADE,
+            FOREIGN KEY (backlog_id) REFERENCES backlog(id) ON DELETE CASCADE
+        );
+
+        CREATE TABLE IF NOT EXISTS meeting (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            meeting_datetime TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS meeting_note (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            meeting_id INTEGER,
+            meeting_date TEXT,
+            topic TEXT,
+            note_type TEXT NOT NULL DEFAULT '',
+            note TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'open',
+            FOREIGN KEY (meeting_id) REFERENCES meeting(id) ON DELETE SET NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS meeting_note_backlog (
+            meeting_note_id INTEGER NOT NULL,
+            backlog_id INTEGER NOT NULL,
+            PRIMARY KEY (meeting_note_id, backlog_id),
+            FOREIGN KEY (meeting_note_id) REFERENCES meeting_note(id) ON DELETE CASCADE,
+            FOREIGN KEY (backlog_id) REFERENCES backlog(id) ON DELETE CASCADE
+        );
+
+        CREATE TABLE IF NOT EXISTS meeting_note_dependency (
+            meeting_note_id INTEGER NOT NULL,
+            dependency_id INTEGER NOT NULL,
+            PRIMARY KEY (meeting_note_id, dependency_id),
+            FOREIGN KEY (meeting_note_id) REFERENCES meeting_note(id) ON DELETE CASCADE,
+            FOREIGN KEY (dependency_id) REFERENCES dependency(id) ON DELETE CASCADE
+        );
+
+        CREATE TABLE IF NOT EXISTS meeting_note_theme (
+            meeting_note_id INTEGER NOT NULL,
+            theme_id INTEGER NOT NULL,
+            PRIMARY KEY (meeting_note_id, theme_id),
+            FOREIGN KEY (meeting_note_id) REFERENCES meeting_note(id) ON DELETE CASCADE,
+            FOREIGN KEY (theme_id) REFERENCES theme(id) ON DELETE CASCADE
+        );
+
+        CREATE TABLE IF NOT EXISTS meeting_note_evaluation (
+            meeting_note_id INTEGER NOT NULL,
+            evaluation_id INTEGER NOT NULL,
+            PRIMARY KEY (meeting_note_id, evaluation_id),
+            FOREIGN KEY (meeting_note_id) REFERENCES meeting_note(id) ON DELETE CASCADE,
+            FOREIGN KEY (evaluation_id) REFERENCES evaluation(id) ON DELETE CASCADE
+        );
+        """
+    )
+    backlog_info = conn.execute("PRAGMA table_info(backlog)").fetchall()
+    backlog_columns = [row["name"] for row in backlog_info]
+    sub_task_info = next(
+        (row for row in backlog_info if row["name"] == "task_details"),
+        None,
+    )
+    if "task" not in backlog_columns:
+        conn.execute("ALTER TABLE backlog ADD COLUMN task TEXT NOT NULL DEFAULT ''")
+    if "task_details" not in backlog_columns:
+        conn.execute("ALTER TABLE backlog ADD COLUMN task_details TEXT")
+        if "sub_task" in backlog_columns:
+            conn.execute(
+                """
+                UPDATE backlog
+                SET task_details = sub_task
+                WHERE (task_details IS NULL OR TRIM(task_details) = '')
+                    AND sub_task IS NOT NULL
+                    AND TRIM(sub_task) != ''
+                """
+            )
+    if "lob" not in backlog_columns:
+        conn.execute("ALTER TABLE backlog ADD COLUMN lob TEXT")
+    if "image_blob" not in backlog_columns:
+        conn.execute("ALTER TABLE backlog ADD COLUMN image_blob BLOB")
+    if "evaluation" not in backlog_columns:
+        conn.execute("ALTER TABLE backlog ADD COLUMN evaluation TEXT")
+    if sub_task_info and sub_task_info["notnull"]:
+        execute_script(
+            conn,
+            """
+            CREATE TABLE backlog_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task TEXT NOT NULL,
+                task_details TEXT,
+                lob TEXT,
+                image_blob BLOB,
+                theme TEXT NOT NULL,
+                evaluation TEXT,
+                estimation INTEGER,
+                team TEXT,
+                sprint TEXT
+            );
+            INSERT INTO backlog_new (id, task, task_details, lob, image_blob, theme, evaluation, estimation, team, sprint)
+            SELECT id, task, task_details, lob, image_blob, theme, evaluation, estimation, team, sprint FROM backlog;
+            DROP TABLE backlog;
+            ALTER TABLE backlog_new RENAME TO backlog;
+            """
+        )
+    if "name" in backlog_columns:
+        conn.execute(
+            "UPDATE backlog SET task = name WHERE task = '' AND name IS NOT NULL"
+        )
+    estimation_info = next(
+        (row for row in backlog_info if row["name"] == "estimation"), None
+    )
+    if estimation_info and (
+        estimation_info["type"].upper() != "INTEGER" or estimation_info["notnull"]
+    ):
+        execute_script(
+            conn,
+            """
+            CREATE TABLE backlog_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task TEXT NOT NULL,
+                task_details TEXT,
+                lob TEXT,
+                image_blob BLOB,
+                theme TEXT NOT NULL,
+                evaluation TEXT,
+                estimation INTEGER,
+                team TEXT,
+                sprint TEXT
+            );
+            INSERT INTO backlog_new (id, task, task_details, lob, image_blob, theme, evaluation, estimation, team, sprint)
+            SELECT id, task, task_details, lob, image_blob, theme, evaluation, CAST(estimation AS INTEGER), team, sprint FROM backlog;
+            DROP TABLE backlog;
+            ALTER TABLE backlog_new RENAME TO backlog;
+            """
+        )
+    backlog_info = conn.execute("PRAGMA table_info(backlog)").fetchall()
+    team_info = next((row for row in backlog_info if row["name"] == "team"), None)
+    sprint_info = next((row for row in backlog_info if row["name"] == "sprint"), None)
+    sub_task_info = next(
+        (row for row in backlog_info if row["name"] == "task_details"),
+        None,
+    )
+    estimation_info = next(
+        (row for row in backlog_info if row["name"] == "estimation"), None
+    )
+    if (
+        (team_info and team_info["notnull"])
+        or (sprint_info and sprint_info["notnull"])
+        or (sub_task_info and sub_task_info["notnull"])
+        or (estimation_info and estimation_info["type"].upper() != "INTEGER")
+        or (estimation_info and estimation_info["notnull"])
+    ):
+        execute_script(
+            conn,
+            """
+            CREATE TABLE backlog_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task TEXT NOT NULL,
+                task_details TEXT,
+                lob TEXT,
+                image_blob BLOB,
+                theme TEXT NOT NULL,
+                evaluation TEXT,
+                estimation INTEGER,
+                team TEXT,
+                sprint TEXT
+            );
+            INSERT INTO backlog_new (id, task, task_details, lob, image_blob, theme, evaluation, estimation, team, sprint)
+            SELECT id, task, task_details, lob, image_blob, theme, evaluation, CAST(estimation AS INTEGER), team, sprint FROM backlog;
+            DROP TABLE backlog;
+            ALTER TABLE backlog_new RENAME TO backlog;
+            """
+        )
+
+    dependency_info = conn.execute("PRAGMA table_info(dependency)").fetchall()
+    dependency_columns = [row["name"] for row in dependency_info]
+    if "task" not in dependency_columns:
+        conn.execute("ALTER TABLE dependency ADD COLUMN task TEXT NOT NULL DEFAULT ''")
+    if "sub_task" not in dependency_columns:
+        conn.execute("ALTER TABLE dependency ADD COLUMN sub_task TEXT")
+    if "name" in dependency_columns and "task" in dependency_columns:
+        conn.execute(
+            "UPDATE dependency SET task = name WHERE task = '' AND name IS NOT NULL"
+        )
+    if "name" in dependency_columns or "sprint" in dependency_columns:
+        execute_script(
+            conn,
+            """
+            CREATE TABLE dependency_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task TEXT NOT NULL,
+                sub_task TEXT,
+                team TEXT NOT NULL
+            );
+            INSERT INTO dependency_new (id, task, sub_task, team)
+            SELECT id, task, sub_task, team FROM dependency;
+            DROP TABLE dependency;
+            ALTER TABLE dependency_new RENAME TO dependency;
+            """
+        )
+    evaluation_info = conn.execute("PRAGMA table_info(evaluation)").fetchall()
+    evaluation_columns = [row["name"] for row in evaluation_info]
+    if "note" not in evaluation_columns:
+        conn.execute("ALTER TABLE evaluation ADD COLUMN note TEXT")
+
+    legacy_sub_task = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name='sub_task'"
+    ).fetchone()
+    sub_backlog_exists = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name='sub_backlog'"
+    ).fetchone()
+    if legacy_sub_task and not sub_backlog_exists:
+        conn.execute("ALTER TABLE sub_task RENAME TO sub_backlog")
+
+    sub_backlog_info = conn.execute("PRAGMA table_info(sub_backlog)").fetchall()
+    sub_backlog_columns = [row["name"] for row in sub_backlog_info]
+    backlog_id_info = next(
+        (row for row in sub_backlog_info if row["name"] == "backlog_id"),
+        None,
+    )
+    if backlog_id_info and backlog_id_info["notnull"]:
+        execute_script(
+            conn,
+            """
+            CREATE TABLE sub_backlog_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                backlog_id INTEGER,
+                title TEXT NOT NULL,
+                note TEXT
+            );
+            INSERT INTO sub_backlog_new (id, backlog_id, title, note)
+            SELECT id, backlog_id, COALESCE(title, ''), note FROM sub_backlog;
+            DROP TABLE sub_backlog;
+            ALTER TABLE sub_backlog_new RENAME TO sub_backlog;
+            """
+        )
+        sub_backlog_info = conn.execute("PRAGMA table_info(sub_backlog)").fetchall()
+        sub_backlog_columns = [row["name"] for row in sub_backlog_info]
+    if "backlog_id" not in sub_backlog_columns:
+        conn.execute("ALTER TABLE sub_backlog ADD COLUMN backlog_id INTEGER")
+    if "title" not in sub_backlog_columns:
+        conn.execute(
+            "ALTER TABLE sub_backlog ADD COLUMN title TEXT NOT NULL DEFAULT ''"
+        )
+    if "note" not in sub_backlog_columns:
+        conn.execute("ALTER TABLE sub_backlog ADD COLUMN note TEXT")
+
+    sub_backlog_backlog_info = conn.execute(
+        "PRAGMA table_info(sub_backlog_backlog)"
+    ).fetchall()
+    if not sub_backlog_backlog_info:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sub_backlog_backlog (
+                sub_backlog_id INTEGER NOT NULL,
+                backlog_id INTEGER NOT NULL,
+                PRIMARY KEY (sub_backlog_id, backlog_id),
+                FOREIGN KEY (sub_backlog_id) REFERENCES sub_backlog(id) ON DELETE CASCADE,
+                FOREIGN KEY (backlog_id) REFERENCES backlog(id) ON DELETE CASCADE
+            )
+            """
+        )
+    if "backlog_id" in sub_backlog_columns:
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO sub_backlog_backlog (sub_backlog_id, backlog_id)
+            SELECT id, backlog_id
+            FROM sub_backlog
+            WHERE backlog_id IS NOT NULL
+            """
+        )
+
+    meeting_note_info = conn.execute("PRAGMA table_info(meeting_note)").fetchall()
+    meeting_note_columns = [row["name"] for row in meeting_note_info]
+    if "meeting_id" not in meeting_note_columns:
+        conn.execute("ALTER TABLE meeting_note ADD COLUMN meeting_id INTEGER")
+    if "meeting_date" not in meeting_note_columns:
+        conn.execute("ALTER TABLE meeting_note ADD COLUMN meeting_date TEXT")
+    if "topic" not in meeting_note_columns:
+        conn.execute("ALTER TABLE meeting_note ADD COLUMN topic TEXT")
+    if "note" not in meeting_note_columns:
+        conn.execute("ALTER TABLE meeting_note ADD COLUMN note TEXT NOT NULL DEFAULT ''")
+    if "note_type" not in meeting_note_columns:
+        conn.execute("ALTER TABLE meeting_note ADD COLUMN note_type TEXT NOT NULL DEFAULT ''")
+    if "status" not in meeting_note_columns:
+        conn.execute("ALTER TABLE meeting_note ADD COLUMN status TEXT NOT NULL DEFAULT 'open'")
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO theme (name)
+        SELECT DISTINCT theme FROM backlog
+        WHERE theme IS NOT NULL AND TRIM(theme) != ''
+        """
+    )
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO evaluation (name)
+        SELECT DISTINCT evaluation FROM backlog
+        WHERE evaluation IS NOT NULL AND TRIM(evaluation) != ''
+        """
+    )
+
+
+SCHEMA_INDEXES = [
+    ("idx_backlog_theme", "backlog", ("theme",)),
+    ("idx_backlog_evaluation", "backlog", ("evaluation",)),
+    ("idx_backlog_image_hash", "backlog", ("image_hash",)),
+    ("idx_backlog_dependency_dependency", "backlog_dependency", ("dependency_id", "backlog_id")),
+    ("idx_sub_backlog_backlog_backlog", "sub_backlog_backlog", ("backlog_id", "sub_backlog_id")),
+    ("idx_meeting_note_meeting", "meeting_note", ("meeting_id",)),
+    ("idx_meeting_note_date_key", "meeting_note", ("meeting_date_key", "id")),
+    (
+        "idx_meeting_note_todo",
+        "meeting_note",
+        ("note_type", "meeting_date_key", "id", "status"),
+    ),
+    ("idx_meeting_note_backlog_backlog", "meeting_note_backlog", ("backlog_id", "meeting_note_id")),
+    (
+        "idx_meeting_note_dependency_dependency",
+        "meeting_note_dependency",
+        ("dependency_id", "meeting_note_id"),
+    ),
+    ("idx_meeting_note_theme_theme", "meeting_note_theme", ("theme_id", "meeting_note_id")),
+    (
+        "idx_meeting_note_evaluation_evaluation",
+        "meeting_note_evaluation",
+        ("evaluation_id", "meeting_note_id"),
+    ),
+]
+
+QUERY_PLAN_CHECKS = [
+    ("backlogs for dependency", "SELECT backlog_id FROM backlog_dependency WHERE dependency_id = ?"),
+    ("dependencies for backlog", "SELECT dependency_id FROM backlog_dependency WHERE backlog_id = ?"),
+    ("backlogs for sub-backlog", "SELECT backlog_id FROM sub_backlog_backlog WHERE sub_backlog_id = ?"),
+    ("sub-backlogs for backlog", "SELECT sub_backlog_id FROM sub_backlog_backlog WHERE backlog_id = ?"),
+    ("meeting notes for backlog", "SELECT meeting_note_id FROM meeting_note_backlog WHERE backlog_id = ?"),
+    (
+        "meeting notes for dependency",
+        "SELECT meeting_note_id FROM meeting_note_dependency WHERE dependency_id = ?",
+    ),
+    ("meeting notes for theme", "SELECT meeting_note_id FROM meeting_note_theme WHERE theme_id = ?"),
+    (
+        "meeting notes for evaluation",
+        "SELECT meeting_note_id FROM meeting_note_evaluation WHERE evaluation_id = ?",
+    ),
+    ("meeting notes for meeting", "SELECT id FROM meeting_note WHERE meeting_id = ?"),
+    (
+        "todo meeting notes",
+        "SELECT id FROM meeting_note WHERE note_type = 'todo' AND status IN ('open', 'in-progress') "
+        "ORDER BY meeting_date_key DESC, id DESC",
+    ),
+    ("theme rename", "UPDATE backlog SET theme = ? WHERE theme = ?"),
+    ("evaluation rename", "UPDATE backlog SET evaluation = ? WHERE evaluation = ?"),
+]
+
+
+def ensure_indexes(conn):
+    table_columns = {}
+    for name, table, columns in SCHEMA_INDEXES:
+        if table not in table_columns:
+            table_columns[table] = {
+                row["name"]
+                for row in conn.execute(f"PRAGMA table_info({table})").fetchall()
+            }
+        if set(columns) <= table_columns[table]:
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+            )
+
+
+def find_unindexed_queries(conn, checks=None):
+    unindexed = []
+    for label, sql in checks or QUERY_PLAN_CHECKS:
+        params = (None,) * sql.count("?")
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        scans = [row["detail"] for row in plan if row["detail"].startswith("SCAN ")]
+        if scans:
+            unindexed.append((label, scans))
+    return unindexed
+
+
+def image_hash_for(image_bytes):
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def migrate_backlog_images(conn):
+    execute_script(
+        conn,
+        """
+        CREATE TABLE IF NOT EXISTS image (
+            hash TEXT PRIMARY KEY,
+            data BLOB NOT NULL,
+            byte_size INTEGER NOT NULL
+        );
+        """
+    )
+    backlog_columns = [
+        row["name"] for row in conn.execute("PRAGMA table_info(backlog)").fetchall()
+    ]
+    if "image_hash" not in backlog_columns:
+        conn.execute("ALTER TABLE backlog ADD COLUMN image_hash TEXT")
+    if "image_blob" in backlog_columns:
+        image_ids = [
+            row["id"]
+            for row in conn.execute(
+                "SELECT id FROM backlog WHERE image_blob IS NOT NULL"
+            ).fetchall()
+        ]
+        for backlog_id in image_ids:
+            image_blob = conn.execute(
+                "SELECT image_blob FROM backlog WHERE id = ?",
+                (backlog_id,),
+            ).fetchone()["image_blob"]
+            image_hash = image_hash_for(bytes(image_blob))
+            conn.execute(
+                "INSERT OR IGNORE INTO image (hash, data, byte_size) VALUES (?, ?, ?)",
+                (image_hash, bytes(image_blob), len(image_blob)),
+            )
+            conn.execute(
+                "UPDATE backlog SET image_hash = ?, image_blob = NULL WHERE id = ?",
+                (image_hash, backlog_id),
+            )
+    execute_script(
+        conn,
+        """
+        CREATE TRIGGER IF NOT EXISTS backlog_image_release_on_delete
+        AFTER DELETE ON backlog
+        WHEN OLD.image_hash IS NOT NULL
+        BEGIN
+            DELETE FROM image
+            WHERE hash = OLD.image_hash
+                AND NOT EXISTS (SELECT 1 FROM backlog WHERE image_hash = OLD.image_hash);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS backlog_image_release_on_update
+        AFTER UPDATE OF image_hash ON backlog
+        WHEN OLD.image_hash IS NOT NULL AND OLD.image_hash IS NOT NEW.image_hash
+        BEGIN
+            DELETE FROM image
+            WHERE hash = OLD.image_hash
+                AND NOT EXISTS (SELECT 1 FROM backlog WHERE image_hash = OLD.image_hash);
+        END;
+        """
+    )
+
+
+def migrate_image_metadata(conn):
+    image_columns = [
+        row["name"] for row in conn.execute("PRAGMA table_info(image)").fetchall()
+    ]
+    if "mime_type" not in image_columns:
+        conn.execute("ALTER TABLE image ADD COLUMN mime_type TEXT")
+    if "width" not in image_columns:
+        conn.execute("ALTER TABLE image ADD COLUMN width INTEGER")
+    if "height" not in image_columns:
+        conn.execute("ALTER TABLE image ADD COLUMN height INTEGER")
+
+
+def migrate_image_thumbnails(conn):
+    image_columns = [
+        row["name"] for row in conn.execute("PRAGMA table_info(image)").fetchall()
+    ]
+    if "thumbnail" not in image_columns:
+        conn.execute("ALTER TABLE image ADD COLUMN thumbnail BLOB")
+
+
+def search_source_values(kind, row):
+    source = SEARCH_SOURCES[kind]
+    extra = " || ' ' || ".join(
+        f"COALESCE({row}.{column}, '')" for column in source["extra"]
+    )
+    return (
+        f"{row}.id * {SEARCH_ROWID_STRIDE} + {source['code']}",
+        f"'{kind}'",
+        f"{row}.id",
+        f"{row}.{source['title']}",
+        f"{row}.{source['detail']}",
+        extra or "''",
+    )
+
+
+def fts5_enabled(conn):
+    enabled = conn.execute(
+        "SELECT sqlite_compileoption_used('ENABLE_FTS5') AS enabled"
+    ).fetchone()["enabled"]
+    if not enabled:
+        logger.warning("SQLite was built without FTS5; search falls back to LIKE scans.")
+    return enabled
+
+
+def migrate_search_index(conn):
+    # Trigram tokens keep the substring matches the LIKE search used to find,
+    # which word-prefix tokens would lose.
+    if not fts5_enabled(conn):
+        return
+    if sqlite3.sqlite_version_info < (3, 34, 0):
+        logger.warning(
+            "SQLite is too old for the trigram tokenizer; search falls back to LIKE scans."
+        )
+        return
+    create_search_index(conn, "tokenize = 'trigram'")
+
+
+def create_search_index(conn, options):
+    conn.execute(
+        f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            kind UNINDEXED,
+            item_id UNINDEXED,
+            title,
+            detail,
+            extra,
+            {options}
+        )
+        """
+    )
+    conn.execute("DELETE FROM search_index")
+    for kind, source in SEARCH_SOURCES.items():
+        conn.execute(
+            f"""
+            INSERT INTO search_index (rowid, kind, item_id, title, detail, extra)
+            SELECT {", ".join(search_source_values(kind, "src"))}
+            FROM {kind} src
+            """
+        )
+        new_values = ", ".join(search_source_values(kind, "NEW"))
+        old_rowid = search_source_values(kind, "OLD")[0]
+        watched = ", ".join((source["title"], source["detail"], *source["extra"]))
+        execute_script(
+            conn,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {kind}_search_insert
+            AFTER INSERT ON {kind}
+            BEGIN
+                INSERT INTO search_index (rowid, kind, item_id, title, detail, extra)
+                VALUES ({new_values});
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS {kind}_search_update
+            AFTER UPDATE OF {watched} ON {kind}
+            BEGIN
+                DELETE FROM search_index WHERE rowid = {old_rowid};
+                INSERT INTO search_index (rowid, kind, item_id, title, detail, extra)
+                VALUES ({new_values});
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS {kind}_search_delete
+            AFTER DELETE ON {kind}
+            BEGIN
+                DELETE FROM search_index WHERE rowid = {old_rowid};
+            END;
+            """
+        )
+
+
+@contextmanager
+def deferred_search_index(conn, kind):
+    # Bulk loads index new rows in one statement instead of firing the trigger
+    # per row. The deferral row mutes the insert trigger through its WHEN
+    # clause, so no DDL runs and the row goes away with the load's transaction.
+    if not search_index_available():
+        yield
+        return
+    last_id = conn.execute(f"SELECT COALESCE(MAX(id), 0) FROM {kind}").fetchone()[0]
+    conn.execute("INSERT INTO search_index_deferral (kind) VALUES (?)", (kind,))
+    try:
+        yield
+    finally:
+        conn.execute("DELETE FROM search_index_deferral WHERE kind = ?", (kind,))
+        conn.execute(
+            f"""
+            INSERT INTO search_index (rowid, kind, item_id, title, detail, extra)
+            SELECT {", ".join(search_source_values(kind, "src"))}
+            FROM {kind} src
+            WHERE src.id > ?
+            """,
+            (last_id,),
+        )
+
+
+def migrate_csv_import_progress(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS csv_import_progress (
+            file_hash TEXT NOT NULL,
+            target TEXT NOT NULL,
+            rows_done INTEGER NOT NULL DEFAULT 0,
+            imported INTEGER NOT NULL DEFAULT 0,
+            skip_reasons TEXT NOT NULL DEFAULT '{}',
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (file_hash, target)
+        )
+        """
+    )
+
+
+def migrate_sprint_team_rollup(conn):
+    execute_script(
+        conn,
+        """
+        CREATE TABLE IF NOT EXISTS sprint_team_rollup (
+            sprint TEXT NOT NULL,
+            team TEXT NOT NULL,
+            total_estimation INTEGER NOT NULL DEFAULT 0,
+            item_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (sprint, team)
+        );
+
+        CREATE TABLE IF NOT EXISTS team_capacity (
+            team TEXT PRIMARY KEY,
+            capacity INTEGER NOT NULL
+        );
+
+        CREATE TRIGGER IF NOT EXISTS backlog_rollup_insert
+        AFTER INSERT ON backlog
+        WHEN NEW.sprint IS NOT NULL AND NEW.team IS NOT NULL
+        BEGIN
+            INSERT INTO sprint_team_rollup (sprint, team, total_estimation, item_count)
+            VALUES (NEW.sprint, NEW.team, COALESCE(NEW.estimation, 0), 1)
+            ON CONFLICT (sprint, team) DO UPDATE SET
+                total_estimation = total_estimation + excluded.total_estimation,
+                item_count = item_count + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS backlog_rollup_update
+        AFTER UPDATE OF sprint, team, estimation ON backlog
+        BEGIN
+            UPDATE sprint_team_rollup
+            SET
+                total_estimation = total_estimation - COALESCE(OLD.estimation, 0),
+                item_count = item_count - 1
+            WHERE sprint = OLD.sprint AND team = OLD.team;
+            DELETE FROM sprint_team_rollup
+            WHERE sprint = OLD.sprint AND team = OLD.team AND item_count <= 0;
+            INSERT INTO sprint_team_rollup (sprint, team, total_estimation, item_count)
+            SELECT NEW.sprint, NEW.team, COALESCE(NEW.estimation, 0), 1
+            WHERE NEW.sprint IS NOT NULL AND NEW.team IS NOT NULL
+            ON CONFLICT (sprint, team) DO UPDATE SET
+                total_estimation = total_estimation + excluded.total_estimation,
+                item_count = item_count + 1;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS backlog_rollup_delete
+        AFTER DELETE ON backlog
+        WHEN OLD.sprint IS NOT NULL AND OLD.team IS NOT NULL
+        BEGIN
+            UPDATE sprint_team_rollup
+            SET
+                total_estimation = total_estimation - COALESCE(OLD.estimation, 0),
+                item_count = item_count - 1
+            WHERE sprint = OLD.sprint AND team = OLD.team;
+            DELETE FROM sprint_team_rollup
+            WHERE sprint = OLD.sprint AND team = OLD.team AND item_count <= 0;
+        END;
+        """
+    )
+    conn.execute("DELETE FROM sprint_team_rollup")
+    conn.execute(
+        """
+        INSERT INTO sprint_team_rollup (sprint, team, total_estimation, item_count)
+        SELECT sprint, team, COALESCE(SUM(estimation), 0), COUNT(*)
+        FROM backlog
+        WHERE sprint IS NOT NULL AND team IS NOT NULL
+        GROUP BY sprint, team
+        """
+    )
+
+
+def migrate_backlog_link_counts(conn):
+    count_columns = ",\n".join(
+        f"{column} INTEGER NOT NULL DEFAULT 0" for column in BACKLOG_LINK_COUNTS
+    )
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS backlog_link_count (
+            backlog_id INTEGER PRIMARY KEY,
+            {count_columns},
+            FOREIGN KEY (backlog_id) REFERENCES backlog(id) ON DELETE CASCADE
+        )
+        """
+    )
+    for column, link_table in BACKLOG_LINK_COUNTS.items():
+        increment = f"""
+            INSERT INTO backlog_link_count (backlog_id, {column})
+            VALUES (NEW.backlog_id, 1)
+            ON CONFLICT (backlog_id) DO UPDATE SET {column} = {column} + 1;
+        """
+        decrement = f"""
+            UPDATE backlog_link_count
+            SET {column} = {column} - 1
+            WHERE backlog_id = OLD.backlog_id;
+        """
+        execute_script(
+            conn,
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {link_table}_count_insert
+            AFTER INSERT ON {link_table}
+            BEGIN
+                {increment}
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS {link_table}_count_update
+            AFTER UPDATE OF backlog_id ON {link_table}
+            BEGIN
+                {decrement}
+                {increment}
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS {link_table}_count_delete
+            AFTER DELETE ON {link_table}
+            BEGIN
+                {decrement}
+            END;
+            """
+        )
+    conn.execute("DELETE FROM backlog_link_count")
+    count_selects = ",\n".join(
+        f"(SELECT COUNT(*) FROM {link_table} l WHERE l.backlog_id = b.id)"
+        for link_table in BACKLOG_LINK_COUNTS.values()
+    )
+    conn.execute(
+        f"""
+        INSERT INTO backlog_link_count (backlog_id, {", ".join(BACKLOG_LINK_COUNTS)})
+        SELECT b.id, {count_selects}
+        FROM backlog b
+        """
+    )
+
+
+def migrate_csv_import_counts(conn):
+    progress_columns = [
+        row["name"]
+        for row in conn.execute("PRAGMA table_info(csv_import_progress)").fetchall()
+    ]
+    if "counts" not in progress_columns:
+        conn.execute(
+            "ALTER TABLE csv_import_progress ADD COLUMN counts TEXT NOT NULL DEFAULT '{}'"
+        )
+
+
+def meeting_date_key_sql(value):
+    # ISO timestamp for parseable dates, the trimmed text otherwise; blanks become
+    # NULL so they sort last under DESC.
+    return f"COALESCE(datetime(TRIM({value})), NULLIF(TRIM({value}), ''))"
+
+
+def migrate_meeting_note_normalization(conn):
+    note_columns = [
+        row["name"] for row in conn.execute("PRAGMA table_info(meeting_note)").fetchall()
+    ]
+    if "meeting_date_key" not in note_columns:
+        conn.execute("ALTER TABLE meeting_note ADD COLUMN meeting_date_key TEXT")
+    normalize = f"""
+        UPDATE meeting_note
+        SET
+            note_type = LOWER(TRIM(note_type)),
+            status = LOWER(TRIM(status)),
+            meeting_date_key = {meeting_date_key_sql("meeting_date")}
+    """
+    denormalized = f"""
+        NEW.note_type IS NOT LOWER(TRIM(NEW.note_type))
+        OR NEW.status IS NOT LOWER(TRIM(NEW.status))
+        OR NEW.meeting_date_key IS NOT {meeting_date_key_sql("NEW.meeting_date")}
+    """
+    execute_script(
+        conn,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS meeting_note_normalize_insert
+        AFTER INSERT ON meeting_note
+        WHEN {denormalized}
+        BEGIN
+            {normalize} WHERE id = NEW.id;
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS meeting_note_normalize_update
+        AFTER UPDATE OF note_type, status, meeting_date, meeting_date_key ON meeting_note
+        WHEN {denormalized}
+        BEGIN
+            {normalize} WHERE id = NEW.id;
+        END;
+        """
+    )
+    conn.execute(normalize)
+
+
+def migrate_csv_import_settings(conn):
+    progress_columns = [
+        row["name"]
+        for row in conn.execute("PRAGMA table_info(csv_import_progress)").fetchall()
+    ]
+    if "settings" not in progress_columns:
+        conn.execute(
+            "ALTER TABLE csv_import_progress ADD COLUMN settings TEXT NOT NULL DEFAULT ''"
+        )
+
+
+def migrate_search_index_deferral(conn):
+    # Lets deferred_search_index mute the insert triggers with a row instead
+    # of dropping and recreating them for every CSV chunk.
+    conn.execute("CREATE TABLE IF NOT EXISTS search_index_deferral (kind TEXT PRIMARY KEY)")
+    search_index = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+    ).fetchone()
+    if search_index is None:
+        return
+    for kind in SEARCH_SOURCES:
+        new_values = ", ".join(search_source_values(kind, "NEW"))
+        conn.execute(f"DROP TRIGGER IF EXISTS {kind}_search_insert")
+        conn.execute(
+            f"""
+            CREATE TRIGGER {kind}_search_insert
+            AFTER INSERT ON {kind}
+            WHEN NOT EXISTS (SELECT 1 FROM search_index_deferral WHERE kind = '{kind}')
+            BEGIN
+                INSERT INTO search_index (rowid, kind, item_id, title, detail, extra)
+                VALUES ({new_values});
+            END
+            """
+        )
+
+
+SCHEMA_MIGRATIONS = [
+    (1, "base schema and legacy column upgrades", migrate_legacy_schema),
+    (2, "secondary indexes for reverse lookups", ensure_indexes),
+    (3, "content-addressed backlog image store", migrate_backlog_images),
+    (4, "image mime type and dimensions", migrate_image_metadata),
+    (5, "image thumbnails", migrate_image_thumbnails),
+    (6, "full-text search index", migrate_search_index),
+    (7, "resumable CSV import progress", migrate_csv_import_progress),
+    (8, "sprint x team rollup and team capacity", migrate_sprint_team_rollup),
+    (9, "backlog link counters", migrate_backlog_link_counts),
+    (10, "CSV import outcome counts", migrate_csv_import_counts),
+    (11, "normalized meeting note type, status and date key", migrate_meeting_note_normalization),
+    (12, "CSV import mapping and options", migrate_csv_import_settings),
+    (13, "search trigger deferral flag", migrate_search_index_deferral),
+]
+
+
+def fetch_schema_version(conn):
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TEXT NOT NULL
+        )
+        """
+    )
+    row = conn.execute("SELECT MAX(version) AS version FROM schema_version").fetchone()
+    return row["version"] or 0
+
+
+def migrate_db(conn):
+    current_version = fetch_schema_version(conn)
+    pending = [
+        migration for migration in SCHEMA_MIGRATIONS if migration[0] > current_version
+    ]
+    if not pending:
+        return current_version
+    conn.commit()
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        for version, name, step in pending:
+            # A step lands together with its schema_version row or not at all.
+            begin_immediate(conn)
+            try:
+                step(conn)
+                conn.execute(
+                    "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+                    (version, name, datetime.now().isoformat(timespec="seconds")),
+                )
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+        begin_immediate(conn)
+        ensure_indexes(conn)
+        conn.commit()
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
+    return pending[-1][0]
+
+
+@st.cache_resource
+def init_db():
+    # migrate_db commits each step itself, so hold the write turn without the
+    # transaction write_conn() would open around it.
+    with get_write_queue().turn(), get_conn() as conn:
+        version = migrate_db(conn)
+        for label, scans in find_unindexed_queries(conn):
+            logger.warning("Query without index support (%s): %s", label, "; ".join(scans))
+        query_cache = get_query_cache()
+        query_cache.set_dependents(fetch_table_dependents(conn))
+        query_cache.clear()
+    backfill_image_thumbnails()
+    return version
+
+
+@cached_query("theme")
+def fetch_themes():
+    with get_conn() as conn:
+        rows = conn.execute("SELECT name FROM theme ORDER BY name").fetchall()
+    return [row["name"] for row in rows]
+
+@cached_query("evaluation")
+def fetch_evaluations():
+    with get_conn() as conn:
+        rows = conn.execute("SELECT name FROM evaluation ORDER BY name").fetchall()
+    return [row["name"] for row in rows]
+
+
+@cached_query("theme", "backlog")
+def fetch_theme_rows():
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT
+                t.id,
+                t.name,
+                COUNT(b.id) AS backlog_count
+            FROM theme t
+            LEFT JOIN backlog b ON b.theme = t.name
+            GROUP BY t.id, t.name
+            ORDER BY t.name
+            """
+        ).fetchall()
+    return rows
+
+@cached_query("evaluation")
+def fetch_evaluation_rows():
+    with get_conn() as conn:
+        rows = conn.execute("SELECT * FROM evaluation ORDER BY name").fetchall()
+    return rows
+
+
+@cached_query("meeting_note")
+def fetch_meeting_notes():
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT id, meeting_id, meeting_date, topic, note_type, note, status
+            FROM meeting_note
+            ORDER BY meeting_date_key DESC, id DESC
+            """
+        ).fetchall()
+    return rows
+
+
+def build_meeting_note_where(filters):
+    filters = dict(filters)
+    clauses = []
+    params = []
+    for name, column in MEETING_NOTE_CHOICE_FILTERS.items():
+        value = filters.get(name)
+        if value:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    date_from = filters.get("date_from")
+    date_to = filters.get("date_to")
+    if date_from or date_to:
+        # Keys that are not timestamps hold the raw text and would compare
+        # lexically against the bounds, so a date range leaves them out.
+        clauses.append("datetime(mn.meeting_date_key) IS NOT NULL")
+    if date_from:
+        clauses.append("mn.meeting_date_key >= datetime(?)")
+        params.append(date_from)
+    if date_to:
+        clauses.append("mn.meeting_date_key < datetime(?, '+1 day')")
+        params.append(date_to)
+    search = (filters.get("search") or "").strip()
+    if search:
+        clause, search_params = build_search_clause(
+            "meeting_note", "mn.id", MEETING_NOTE_SEARCH_COLUMNS, search
+        )
+        clauses.append(clause)
+        params.extend(search_params)
+    return clauses, params
+
+
+@cached_query("meeting_note")
+def count_meeting_notes(filters=()):
+    clauses, params = build_meeting_note_where(filters)
+    where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with get_conn() as conn:
+        row = conn.execute(
+            f"SELECT COUNT(*) AS total FROM meeting_note mn {where_sql}",
+            params,
+        ).fetchone()
+    return row["total"]
+
+
+@cached_query("meeting_note")
+def fetch_meeting_note_feed(filters, page_size, after=None):
+    # Newest first by (meeting_date_key, id). Dated and undated notes are read
+    # separately so each half stays a range scan on the date key index and the
+    # undated ones still come last.
+    clauses, params = build_meeting_note_where(filters)
+    after_key, after_id = after or (None, None)
+
+    def read(extra_clauses, extra_params, limit):
+        where_sql = " AND ".join([*clauses, *extra_clauses])
+        with get_conn() as conn:
+            return conn.execute(
+                f"""
+                SELECT
+                    mn.id,
+                    mn.meeting_id,
+                    mn.meeting_date,
+                    mn.topic,
+                    mn.note_type,
+                    mn.note,
+                    mn.status,
+                    mn.meeting_date_key
+                FROM meeting_note mn
+                WHERE {where_sql}
+                ORDER BY mn.meeting_date_key DESC, mn.id DESC
+                LIMIT ?
+                """,
+                (*params, *extra_params, limit),
+            ).fetchall()
+
+    rows = []
+    if after is None:
+        rows = read(["mn.meeting_date_key IS NOT NULL"], [], page_size + 1)
+    elif after_key is not None:
+        rows = read(
+            [
+                "mn.meeting_date_key <= ?",
+                "(mn.meeting_date_key < ? OR mn.id < ?)",
+            ],
+            [after_key, after_key, after_id],
+            page_size + 1,
+        )
+    if len(rows) <= page_size:
+        undated = ["mn.meeting_date_key IS NULL"]
+        undated_params = []
+        if after is not None and after_key is None:
+            undated.append("mn.id < ?")
+            undated_params.append(after_id)
+        rows += read(undated, undated_params, page_size + 1 - len(rows))
+    return rows[:page_size], len(rows) > page_size
+
+
+@cached_query("meeting_note")
+def fetch_todo_meeting_notes(include_completed=False):
+    status_filter = ""
+    if include_completed:
+        status_filter = "AND status IN ('open', 'in-progress', 'completed')"
+    else:
+        status_filter = "AND status IN ('open', 'in-progress')"
+    with get_conn() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT id, meeting_id, meeting_date, topic, note_type, note, status
+            FROM meeting_note
+            WHERE note_type = 'todo'
+                {status_filter}
+            ORDER BY meeting_date_key DESC, id DESC
+            """
+        ).fetchall()
+    return rows
+
+
+def update_meeting_note_statuses(conn, changes):
+    # Optimistic concurrency: a status is only written when the stored value
+    # still matches the one the editor started from. Run under write_conn so
+    # the check and the update see the same snapshot.
+    current = pd.DataFrame.from_records(
+        conn.execute(
+            """
+            SELECT id, status AS current_status
+            FROM meeting_note
+            WHERE id IN (SELECT value FROM json_each(?))
+            """,
+            (json.dumps(changes["id"].astype(int).tolist()),),
+        ).fetchall(),
+        columns=["id", "current_status"],
+    )
+    checked = changes.merge(current, on="id", how="left")
+    applies = checked["id"].isin(current["id"]) & (
+        checked["current_status"].fillna("") == checked["expected_status"].fillna("")
+    )
+    conn.executemany(
+        "UPDATE meeting_note SET status = ? WHERE id = ?",
+        zip(
+            checked["status"][applies].to_numpy(),
+            checked["id"][applies].astype(int).tolist(),
+        ),
+    )
+    conflicts = checked.loc[~applies, ["id", "expected_status", "current_status", "status"]]
+    return int(applies.sum()), conflicts
+
+
+@cached_query("meeting_note", "meeting_note_backlog")
+def fetch_meeting_notes_for_backlog(backlog_id):
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT mn.id, mn.meeting_id, mn.meeting_date, mn.topic, mn.note_type, mn.note, mn.status
+            FROM meeting_note mn
+            INNER JOIN meeting_note_backlog mnb ON mnb.meeting_note_id = mn.id
+            WHERE mnb.backlog_id = ?
+            ORDER BY mn.meeting_date_key DESC, mn.id DESC
+            """,
+            (backlog_id,),
+        ).fetchall()
+    return rows
+
+
+@cached_query("meeting_note", "meeting_note_dependency")
+def fetch_meeting_notes_for_dependency(dependency_id):
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT mn.id, mn.meeting_id, mn.meeting_date, mn.topic, mn.note_type, mn.note, mn.status
+            FROM meeting_note mn
+            INNER JOIN meeting_note_dependency mnd ON mnd.meeting_note_id = mn.id
+            WHERE mnd.dependency_id = ?
+            ORDER BY mn.meeting_date_key DESC, mn.id DESC
+            """,
+            (dependency_id,),
+        ).fetchall()
+    return rows
+
+
+@cached_query("meeting_note", "meeting_note_theme")
+def fetch_meeting_notes_for_theme(theme_id):
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT mn.id, mn.meeting_id, mn.meeting_date, mn.topic, mn.note_type, mn.note, mn.status
+            FROM meeting_note mn
+            INNER JOIN meeting_note_theme mnt ON mnt.meeting_note_id = mn.id
+            WHERE mnt.theme_id = ?
+            ORDER BY mn.meeting_date_key DESC, mn.id DESC
+            """,
+            (theme_id,),
+        ).fetchall()
+    return rows
+
+
+@cached_query("meeting_note", "meeting_note_evaluation")
+def fetch_meeting_notes_for_evaluation(evaluation_id):
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT mn.id, mn.meeting_id, mn.meeting_date, mn.topic, mn.note_type, mn.note, mn.status
+            FROM meeting_note mn
+            INNER JOIN meeting_note_evaluation mne ON mne.meeting_note_id = mn.id
+            WHERE mne.evaluation_id = ?
+            ORDER BY mn.meeting_date_key DESC, mn.id DESC
+            """,
+            (evaluation_id,),
+        ).fetchall()
+    return rows
+
+
+@cached_query("meeting_note", "meeting_note_backlog", "sub_backlog_backlog")
+def fetch_meeting_notes_for_sub_backlog(sub_backlog_id):
+    backlog_ids = fetch_backlog_ids_for_sub_backlog(sub_backlog_id)
+    if not backlog_ids:
+        return []
+    placeholders = ",".join(["?"] * len(backlog_ids))
+    with get_conn() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT DISTINCT mn.id, mn.meeting_id, mn.meeting_date, mn.topic, mn.note_type, mn.note, mn.status
+            FROM meeting_note mn
+            INNER JOIN meeting_note_backlog mnb ON mnb.meeting_note_id = mn.id
+            WHERE mnb.backlog_id IN ({placeholders})
+            ORDER BY mn.meeting_date_key DESC, mn.id DESC
+            """,
+            tuple(backlog_ids),
+        ).fetchall()
+    return rows
+
+
+@cached_query("meeting")
+def fetch_meetings():
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT id, title, meeting_datetime
+            FROM meeting
+            ORDER BY meeting_datetime DESC, id DESC
+            """
+        ).fetchall()
+    return rows
+
+
+
+
+def parse_meeting_date(value):
+    if not value:
+        return datetime.now().date()
+    try:
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(value.split()[0], "%Y-%m-%d").date()
+    except ValueError:
+        return datetime.now().date()
+
+
+@cached_query("dependency")
+def fetch_dependencies():
+    with get_conn() as conn:
+        rows = conn.execute(
+            "SELECT * FROM dependency ORDER BY id"
+        ).fetchall()
+    return rows
+
+
+@cached_query("sprint_team_rollup")
+def fetch_sprint_team_rollup():
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT sprint, team, total_estimation, item_count
+            FROM sprint_team_rollup
+            ORDER BY sprint, team
+            """
+        ).fetchall()
+    return rows
+
+
+@cached_query("team_capacity")
+def fetch_team_capacities():
+    with get_conn() as conn:
+        rows = conn.execute("SELECT team, capacity FROM team_capacity").fetchall()
+    return {row["team"]: row["capacity"] for row in rows}
+
+
+def upsert_team_capacity(conn, team, capacity):
+    if capacity is None:
+        conn.execute("DELETE FROM team_capacity WHERE team = ?", (team,))
+        return
+    conn.execute(
+        """
+        INSERT INTO team_capacity (team, capacity) VALUES (?, ?)
+        ON CONFLICT (team) DO UPDATE SET capacity = excluded.capacity
+        """,
+        (team, capacity),
+    )
+
+
+BACKLOG_LIST_COLUMNS = """
+    b.id,
+    b.task,
+    b.task_details,
+    b.lob,
+    b.image_hash,
+    b.theme,
+    b.evaluation,
+    b.estimation,
+    b.team,
+    b.sprint,
+    COALESCE(lc.dependency_count, 0) AS dependency_count,
+    COALESCE(lc.sub_backlog_count, 0) AS sub_backlog_count,
+    COALESCE(lc.meeting_note_count, 0) AS meeting_note_count
+"""
+
+
+@cached_query("backlog", "backlog_link_count")
+def fetch_backlogs():
+    with get_conn() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT {BACKLOG_LIST_COLUMNS}
+            FROM backlog b
+            LEFT JOIN backlog_link_count lc ON lc.backlog_id = b.id
+            ORDER BY b.id
+            """
+        ).fetchall()
+    return rows
+
+
+def like_pattern(text):
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def build_backlog_where(filters):
+    filters = dict(filters)
+    clauses = []
+    params = []
+    for name, column in BACKLOG_TEXT_FILTERS.items():
+        value = (filters.get(name) or "").strip()
+        if value:
+            clauses.append(f"{column} LIKE ? ESCAPE '\\'")
+            params.append(like_pattern(value))
+    for name, column in BACKLOG_CHOICE_FILTERS.items():
+        value = filters.get(name)
+        if value:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    search = (filters.get("search") or "").strip()
+    if search:
+        clause, search_params = build_search_clause(
+            "backlog", "b.id", BACKLOG_SEARCH_COLUMNS, search
+        )
+        clauses.append(clause)
+        params.extend(search_params)
+    return clauses, params
+
+
+def build_search_clause(kind, id_column, columns, search):
+    clauses = []
+    params = []
+    match_query = build_match_query(search) if search_index_available() else None
+    if match_query:
+        clauses.append(
+            f"{id_column} IN (SELECT item_id FROM search_index "
+            f"WHERE search_index MATCH ? AND kind = '{kind}')"
+        )
+        params.append(match_query)
+    like_clause, like_params = build_like_terms(
+        columns, search, short_only=match_query is not None
+    )
+    if like_clause:
+        clauses.append(like_clause)
+        params.extend(like_params)
+    return " AND ".join(clauses), params
+
+
+def build_match_query(text):
+    # Trigram phrases match anywhere inside a word (and inside unbroken CJK
+    # text) but need at least three characters; shorter terms are left to
+    # build_like_terms, so every term must appear in the row either way.
+    terms = [term for term in text.split() if len(term) >= 3]
+    if not terms:
+        return None
+    return " ".join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def build_like_terms(columns, text, short_only=False):
+    terms = [term for term in text.split() if not short_only or len(term) < 3]
+    searchable = " || ' ' || ".join(f"COALESCE({column}, '')" for column in columns)
+    clause = " AND ".join([f"({searchable}) LIKE ? ESCAPE '\\'"] * len(terms))
+    return clause, [like_pattern(term) for term in terms]
+
+
+@st.cache_resource
+def search_index_available():
+    with get_conn() as conn:
+        row = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+        ).fetchone()
+    return row is not None
+
+
+def search_items_by_like(text, kinds, limit):
+    selects = []
+    params = []
+    for kind in kinds:
+        source = SEARCH_SOURCES[kind]
+        like_clause, like_params = build_like_terms(
+            (source["title"], source["detail"], *source["extra"]), text
+        )
+        selects.append(
+            f"""
+            SELECT '{kind}' AS kind, id AS item_id, {source['title']} AS title,
+                {source['detail']} AS detail, 0 AS rank
+            FROM {kind}
+            WHERE {like_clause}
+            """
+        )
+        params.extend(like_params)
+    with get_conn() as conn:
+        rows = conn.execute(
+            f"{' UNION ALL '.join(selects)} LIMIT ?",
+            (*params, -1 if limit is None else limit),
+        ).fetchall()
+    return rows
+
+
+@cached_query("search_index", "backlog", "dependency", "meeting_note")
+def search_items(text, kinds=None, limit=50):
+    kinds = tuple(kinds or SEARCH_SOURCES)
+    if not text.strip():
+        return []
+    if not search_index_available():
+        return search_items_by_like(text, kinds, limit)
+    match_query = build_match_query(text)
+    if not match_query:
+        return search_items_by_like(text, kinds, limit)
+    placeholders = ",".join(["?"] * len(kinds))
+    like_clause, like_params = build_like_terms(
+        ("title", "detail", "extra"), text, short_only=True
+    )
+    with get_conn() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT
+                kind,
+                item_id,
+                title,
+                detail,
+                bm25(search_index, 0.0, 0.0, 10.0, 4.0, 1.0) AS rank
+            FROM search_index
+            WHERE search_index MATCH ? AND kind IN ({placeholders})
+                {f"AND {like_clause}" if like_clause else ""}
+            ORDER BY rank
+            LIMIT ?
+            """,
+            (match_query, *kinds, *like_params, -1 if limit is None else limit),
+        ).fetchall()
+    return rows
+
+
+def search_item_ids(kind, text):
+    return [row["item_id"] for row in search_items(text, (kind,), None)]
+
+
+@cached_query("backlog")
+def count_backlogs(filters=()):
+    clauses, params = build_backlog_where(filters)
+    where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with get_conn() as conn:
+        row = conn.execute(
+            f"SELECT COUNT(*) AS total FROM backlog b {where_sql}",
+            params,
+        ).fetchone()
+    return row["total"]
+
+
+@cached_query("backlog", "backlog_link_count")
+def fetch_backlog_keyset(filters, page_size, after_id=None, before_id=None):
+    clauses, params = build_backlog_where(filters)
+    order = "ASC"
+    if after_id is not None:
+        clauses.append("b.id > ?")
+        params.append(after_id)
+    elif before_id is not None:
+        clauses.append("b.id < ?")
+        params.append(before_id)
+        order = "DESC"
+    where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with get_conn() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT {BACKLOG_LIST_COLUMNS}
+            FROM backlog b
+            LEFT JOIN backlog_link_count lc ON lc.backlog_id = b.id
+            {where_sql}
+            ORDER BY b.id {order}
+            LIMIT ?
+            """,
+            (*params, page_size + 1),
+        ).fetchall()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if order == "DESC":
+        rows.reverse()
+    return rows, has_more
+
+
+def fetch_backlog_page(filters, page_size, anchor=None):
+    direction, cursor_id = anchor or (None, None)
+    if direction == "next":
+        rows, has_next = fetch_backlog_keyset(filters, page_size, after_id=cursor_id)
+        if rows:
+            return rows, True, has_next
+    elif direction == "prev":
+        rows, has_prev = fetch_backlog_keyset(filters, page_size, before_id=cursor_id)
+        if rows and has_prev:
+            return rows, True, True
+    rows, has_next = fetch_backlog_keyset(filters, page_size)
+    return rows, False, has_next
+
+
+@cached_query("backlog_dependency")
+def fetch_backlog_dependency_ids(backlog_id):
+    with get_conn() as conn:
+        rows = conn.execute(
+            "SELECT dependency_id FROM backlog_dependency WHERE backlog_id = ?",
+            (backlog_id,),
+        ).fetchall()
+    return [row["dependency_id"] for row in rows]
+
+
+@cached_query("dependency", "backlog_dependency")
+def fetch_dependencies_for_backlog(backlog_id):
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT d.id, d.task, d.sub_task, d.team
+            FROM dependency d
+            INNER JOIN backlog_dependency bd ON d.id = bd.dependency_id
+            WHERE bd.backlog_id = ?
+            ORDER BY d.id
+            """,
+            (backlog_id,),
+        ).fetchall()
+    return rows
+
+
+@cached_query("backlog", "backlog_dependency")
+def fetch_backlogs_for_dependency(dependency_id):
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT
+                b.id,
+                b.task,
+                b.task_details,
+                b.theme,
+                b.evaluation,
+                b.estimation,
+                b.team,
+                b.sprint
+            FROM backlog b
+            INNER JOIN backlog_dependency bd ON b.id = bd.backlog_id
+            WHERE bd.dependency_id = ?
+            ORDER BY b.id
+            """,
+            (dependency_id,),
+        ).fetchall()
+    return rows
+
+
+@cached_query("sub_backlog", "sub_backlog_backlog", "backlog")
+def fetch_sub_backlogs():
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT
+                st.id,
+                st.title,
+                st.note,
+                GROUP_CONCAT(b.task, ' | ') AS backlog_tasks
+            FROM sub_backlog st
+            LEFT JOIN sub_backlog_backlog sbb ON sbb.sub_backlog_id = st.id
+            LEFT JOIN backlog b ON b.id = sbb.backlog_id
+            GROUP BY st.id, st.title, st.note
+            ORDER BY st.id
+            """
+        ).fetchall()
+    return rows
+
+
+CROSS_VIEW_BACKLOG_COLUMNS = [
+    "b.id AS backlog_id",
+    "b.task AS backlog_task",
+    "b.task_details AS backlog_task_details",
+    "b.theme AS backlog_theme",
+    "b.evaluation AS backlog_evaluation",
+    "b.estimation AS backlog_estimation",
+    "b.team AS backlog_team",
+    "b.sprint AS backlog_sprint",
+]
+CROSS_VIEW_LINKS = {
+    "sub_backlog": {
+        "link_table": "sub_backlog_backlog",
+        "join": """
+            LEFT JOIN sub_backlog_backlog sbb ON b.id = sbb.backlog_id
+            LEFT JOIN sub_backlog sb ON sb.id = sbb.sub_backlog_id
+        """,
+        "columns": [
+            "sb.id AS sub_backlog_id",
+            "sb.title AS sub_backlog_title",
+            "sb.note AS sub_backlog_note",
+        ],
+        "order": "sb.id",
+        "aggregate_columns": [
+            """
+            (
+                SELECT COUNT(*) FROM sub_backlog_backlog sbb WHERE sbb.backlog_id = b.id
+            ) AS sub_backlog_count
+            """,
+            """
+            (
+                SELECT group_concat(label, ' | ')
+                FROM (
+                    SELECT sb.title || ' (#' || sb.id || ')' AS label
+                    FROM sub_backlog_backlog sbb
+                    JOIN sub_backlog sb ON sb.id = sbb.sub_backlog_id
+                    WHERE sbb.backlog_id = b.id
+                    ORDER BY sb.id
+                )
+            ) AS sub_backlogs
+            """,
+        ],
+    },
+    "dependency": {
+        "link_table": "backlog_dependency",
+        "join": """
+            LEFT JOIN backlog_dependency bd ON b.id = bd.backlog_id
+            LEFT JOIN dependency d ON d.id = bd.dependency_id
+        """,
+        "columns": [
+            "d.id AS dependency_id",
+            "d.task AS dependency_task",
+            "d.sub_task AS dependency_sub_task",
+            "d.team AS dependency_team",
+        ],
+        "order": "d.id",
+        "aggregate_columns": [
+            """
+            (
+                SELECT COUNT(*) FROM backlog_dependency bd WHERE bd.backlog_id = b.id
+            ) AS dependency_count
+            """,
+            """
+            (
+                SELECT group_concat(label, ' | ')
+                FROM (
+                    SELECT
+                        d.task || ' / ' || COALESCE(d.sub_task, '')
+                        || ' [' || d.team || ']' AS label
+                    FROM backlog_dependency bd
+                    JOIN dependency d ON d.id = bd.dependency_id
+                    WHERE bd.backlog_id = b.id
+                    ORDER BY d.id
+                )
+            ) AS dependencies
+            """,
+        ],
+    },
+}
+CROSS_VIEW_SORTS = {
+    "id": "b.id",
+    "task": "b.task",
+    "theme": "b.theme",
+    "evaluation": "b.evaluation",
+    "estimation": "b.estimation",
+    "team": "b.team",
+    "sprint": "b.sprint",
+}
+
+
+def build_cross_view_where(links, filters, linked_only):
+    clauses, params = build_backlog_where(filters)
+    if linked_only:
+        for link in links:
+            clauses.append(
+                f"EXISTS (SELECT 1 FROM {CROSS_VIEW_LINKS[link]['link_table']} "
+                "WHERE backlog_id = b.id)"
+            )
+    return clauses, params
+
+
+@cached_query(
+    "backlog",
+    "sub_backlog_backlog",
+    "backlog_dependency",
+)
+def count_cross_view_backlogs(links, filters=(), linked_only=False):
+    clauses, params = build_cross_view_where(links, filters, linked_only)
+    where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    with get_conn() as conn:
+        row = conn.execute(
+            f"SELECT COUNT(*) AS total FROM backlog b {where_sql}",
+            params,
+        ).fetchone()
+    return row["total"]
+
+
+@cached_query(
+    "backlog",
+    "sub_backlog_backlog",
+    "sub_backlog",
+    "backlog_dependency",
+    "dependency",
+)
+def fetch_cross_view_page(
+    links,
+    filters=(),
+    sort_key="id",
+    descending=False,
+    page=1,
+    page_size=100,
+    aggregate=False,
+    linked_only=False,
+):
+    # Only one page of backlogs is joined against its links, so the
+    # sub-backlog x dependency product never grows past the page.
+    clauses, params = build_cross_view_where(links, filters, linked_only)
+    where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    direction = "DESC" if descending else "ASC"
+    order_sql = f"{CROSS_VIEW_SORTS[sort_key]} {direction}, b.id {direction}"
+    columns = list(CROSS_VIEW_BACKLOG_COLUMNS)
+    joins = []
+    link_orders = []
+    for link in links:
+        spec = CROSS_VIEW_LINKS[link]
+        if aggregate:
+            columns.extend(spec["aggregate_columns"])
+        else:
+            columns.extend(spec["columns"])
+            joins.append(spec["join"])
+            link_orders.append(spec["order"])
+    with get_conn() as conn:
+        rows = conn.execute(
+            f"""
+            WITH page AS (
+                SELECT b.id
+                FROM backlog b
+                {where_sql}
+                ORDER BY {order_sql}
+                LIMIT ? OFFSET ?
+            )
+            SELECT {", ".join(columns)}
+            FROM page
+            JOIN backlog b ON b.id = page.id
+            {" ".join(joins)}
+            ORDER BY {", ".join([order_sql, *link_orders])}
+            """,
+            (*params, page_size, (page - 1) * page_size),
+        ).fetchall()
+    return rows
+
+
+@cached_query("backlog", "sub_backlog_backlog")
+def fetch_backlogs_for_sub_backlog(sub_backlog_id):
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT
+                b.id,
+                b.task,
+                b.task_details,
+                b.lob,
+                b.theme,
+                b.evaluation,
+                b.estimation,
+                b.team,
+                b.sprint
+            FROM backlog b
+            INNER JOIN sub_backlog_backlog sbb ON b.id = sbb.backlog_id
+            WHERE sbb.sub_backlog_id = ?
+            ORDER BY b.id
+            """,
+            (sub_backlog_id,),
+        ).fetchall()
+    return rows
+
+
+@cached_query("sub_backlog_backlog")
+def fetch_sub_backlog_ids_for_backlog(backlog_id):
+    with get_conn() as conn:
+        rows = conn.execute(
+            "SELECT sub_backlog_id FROM sub_backlog_backlog WHERE backlog_id = ?",
+            (backlog_id,),
+        ).fetchall()
+    return [row["sub_backlog_id"] for row in rows]
+
+
+@cached_query("sub_backlog_backlog")
+def fetch_backlog_ids_for_sub_backlog(sub_backlog_id):
+    with get_conn() as conn:
+        rows = conn.execute(
+            "SELECT backlog_id FROM sub_backlog_backlog WHERE sub_backlog_id = ?",
+            (sub_backlog_id,),
+        ).fetchall()
+    return [row["backlog_id"] for row in rows]
+
+
+@cached_query("meeting_note_backlog")
+def fetch_meeting_note_backlog_ids(meeting_note_id):
+    with get_conn() as conn:
+        rows = conn.execute(
+            "SELECT backlog_id FROM meeting_note_backlog WHERE meeting_note_id = ?",
+            (meeting_note_id,),
+        ).fetchall()
+    return [row["backlog_id"] for row in rows]
+
+
+@cached_query("meeting_note_dependency")
+def fetch_meeting_note_dependency_ids(meeting_note_id):
+    with get_conn() as conn:
+        rows = conn.execute(
+            "SELECT dependency_id FROM meeting_note_dependency WHERE meeting_note_id = ?",
+            (meeting_note_id,),
+        ).fetchall()
+    return [row["dependency_id"] for row in rows]
+
+
+@cached_query("meeting_note_theme")
+def fetch_meeting_note_theme_ids(meeting_note_id):
+    with get_conn() as conn:
+        rows = conn.execute(
+            "SELECT theme_id FROM meeting_note_theme WHERE meeting_note_id = ?",
+            (meeting_note_id,),
+        ).fetchall()
+    return [row["theme_id"] for row in rows]
+
+
+@cached_query("meeting_note_evaluation")
+def fetch_meeting_note_evaluation_ids(meeting_note_id):
+    with get_conn() as conn:
+        rows = conn.execute(
+            "SELECT evaluation_id FROM meeting_note_evaluation WHERE meeting_note_id = ?",
+            (meeting_note_id,),
+        ).fetchall()
+    return [row["evaluation_id"] for row in rows]
+
+
+MEETING_NOTE_LINKS = {
+    "backlog": ("meeting_note_backlog", "backlog_id"),
+    "dependency": ("meeting_note_dependency", "dependency_id"),
+    "theme": ("meeting_note_theme", "theme_id"),
+    "evaluation": ("meeting_note_evaluation", "evaluation_id"),
+}
+
+
+def load_link_id_sets(conn, table, owner_column, target_column, owner_ids):
+    links = {owner_id: set() for owner_id in owner_ids}
+    rows = conn.execute(
+        f"""
+        SELECT {owner_column} AS owner_id, {target_column} AS target_id
+        FROM {table}
+        WHERE {owner_column} IN (SELECT value FROM json_each(?))
+        """,
+        (json.dumps(list(owner_ids)),),
+    ).fetchall()
+    for row in rows:
+        links[row["owner_id"]].add(row["target_id"])
+    # The result is shared through the query cache, so hand out frozen sets.
+    return {owner_id: frozenset(target_ids) for owner_id, target_ids in links.items()}
+
+
+@cached_query("backlog_dependency")
+def fetch_backlog_dependency_id_sets(backlog_ids):
+    with get_conn() as conn:
+        return load_link_id_sets(
+            conn, "backlog_dependency", "backlog_id", "dependency_id", backlog_ids
+        )
+
+
+@cached_query(*(table for table, _ in MEETING_NOTE_LINKS.values()))
+def fetch_meeting_note_link_id_sets(meeting_note_ids):
+    with get_conn() as conn:
+        return {
+            kind: load_link_id_sets(
+                conn, table, "meeting_note_id", target_column, meeting_note_ids
+            )
+            for kind, (table, target_column) in MEETING_NOTE_LINKS.items()
+        }
+
+
+def insert_dependency(conn, task, sub_task, team):
+    cursor = conn.execute(
+        "INSERT INTO dependency (task, sub_task, team) VALUES (?, ?, ?)",
+        (task, sub_task, team),
+    )
+    return cursor.lastrowid
+
+
+def insert_theme(conn, name):
+    cursor = conn.execute(
+        "INSERT OR IGNORE INTO theme (name) VALUES (?)",
+        (name,),
+    )
+    return cursor.lastrowid
+
+def insert_evaluation(conn, name, note=None):
+    cursor = conn.execute(
+        "INSERT OR IGNORE INTO evaluation (name, note) VALUES (?, ?)",
+        (name, note),
+    )
+    return cursor.lastrowid
+
+
+def insert_meeting_note(conn, meeting_id, meeting_date, topic, note_type, note, status="open"):
+    cursor = conn.execute(
+        f"""
+        INSERT INTO meeting_note (
+            meeting_id, meeting_date, meeting_date_key, topic, note_type, note, status
+        )
+        VALUES (?, ?, {meeting_date_key_sql("?")}, ?, LOWER(TRIM(?)), ?, LOWER(TRIM(?)))
+        """,
+        (meeting_id, meeting_date, meeting_date, meeting_date, topic, note_type, note, status),
+    )
+    return cursor.lastrowid
+
+
+def insert_meeting(conn, title, meeting_datetime):
+    cursor = conn.execute(
+        "INSERT INTO meeting (title, meeting_datetime) VALUES (?, ?)",
+        (title, meeting_datetime),
+    )
+    return cursor.lastrowid
+
+
+def insert_sub_backlog(conn, title, note):
+    cursor = conn.execute(
+        "INSERT INTO sub_backlog (title, note) VALUES (?, ?)",
+        (title, note),
+    )
+    return cursor.lastrowid
+
+
+def sync_links(conn, table, owner_column, target_column, owner_ids, target_ids):
+    # Makes each owner's links exactly target_ids; unchanged pairs are left alone.
+    owners = json.dumps(list(dict.fromkeys(int(owner_id) for owner_id in owner_ids)))
+    targets = json.dumps(list(dict.fromkeys(int(target_id) for target_id in target_ids)))
+    removed = conn.execute(
+        f"""
+        DELETE FROM {table}
+        WHERE {owner_column} IN (SELECT value FROM json_each(?))
+            AND {target_column} NOT IN (SELECT value FROM json_each(?))
+        """,
+        (owners, targets),
+    ).rowcount
+    added = conn.execute(
+        f"""
+        INSERT OR IGNORE INTO {table} ({owner_column}, {target_column})
+        SELECT owner.value, target.value
+        FROM json_each(?) AS owner
+        CROSS JOIN json_each(?) AS target
+        """,
+        (owners, targets),
+    ).rowcount
+    return added, removed
+
+
+def upsert_sub_backlog_backlogs(conn, sub_backlog_id, backlog_ids):
+    return sync_links(
+        conn,
+        "sub_backlog_backlog",
+        "sub_backlog_id",
+        "backlog_id",
+        [sub_backlog_id],
+        backlog_ids,
+    )
+
+
+def upsert_backlog_sub_backlogs(conn, backlog_id, sub_backlog_ids):
+    return sync_links(
+        conn,
+        "sub_backlog_backlog",
+        "backlog_id",
+        "sub_backlog_id",
+        [backlog_id],
+        sub_backlog_ids,
+    )
+
+
+def upsert_meeting_note_backlogs(conn, meeting_note_id, backlog_ids):
+    return sync_links(
+        conn,
+        "meeting_note_backlog",
+        "meeting_note_id",
+        "backlog_id",
+        [meeting_note_id],
+        backlog_ids,
+    )
+
+
+def upsert_meeting_note_dependencies(conn, meeting_note_id, dependency_ids):
+    return sync_links(
+        conn,
+        "meeting_note_dependency",
+        "meeting_note_id",
+        "dependency_id",
+        [meeting_note_id],
+        dependency_ids,
+    )
+
+
+def upsert_meeting_note_themes(conn, meeting_note_id, theme_ids):
+    return sync_links(
+        conn,
+        "meeting_note_theme",
+        "meeting_note_id",
+        "theme_id",
+        [meeting_note_id],
+        theme_ids,
+    )
+
+
+def upsert_meeting_note_evaluations(conn, meeting_note_id, evaluation_ids):
+    return sync_links(
+        conn,
+        "meeting_note_evaluation",
+        "meeting_note_id",
+        "evaluation_id",
+        [meeting_note_id],
+        evaluation_ids,
+    )
+
+
+def prepare_image(image_bytes, image_meta=None):
+    # Runs before the write block, so the thumbnail is never built under the
+    # writer's turn, and not at all for an image that is already stored.
+    if not image_bytes:
+        return None
+    image_meta = image_meta or {}
+    image_hash = image_hash_for(image_bytes)
+    with get_conn() as conn:
+        stored = conn.execute("SELECT 1 FROM image WHERE hash = ?", (image_hash,)).fetchone()
+    return {
+        "hash": image_hash,
+        "data": image_bytes,
+        "mime_type": image_meta.get("mime_type") or sniff_image_type(image_bytes),
+        "width": image_meta.get("width"),
+        "height": image_meta.get("height"),
+        "thumbnail": None if stored else make_thumbnail(image_bytes),
+    }
+
+
+def store_image(conn, prepared_image):
+    # A thumbnail left out because the image was gone by now is filled in by
+    # backfill_image_thumbnails when the app next starts.
+    if prepared_image is None:
+        return None
+    conn.execute(
+        """
+        INSERT OR IGNORE INTO image (hash, data, byte_size, mime_type, width, height, thumbnail)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            prepared_image["hash"],
+            prepared_image["data"],
+            len(prepared_image["data"]),
+            prepared_image["mime_type"],
+            prepared_image["width"],
+            prepared_image["height"],
+            prepared_image["thumbnail"],
+        ),
+    )
+    return prepared_image["hash"]
+
+
+def make_thumbnail(image_bytes, max_dimension=IMAGE_THUMBNAIL_SIZE):
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            image.thumbnail((max_dimension, max_dimension))
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+            output = io.BytesIO()
+            image.save(output, format="WEBP", quality=IMAGE_THUMBNAIL_QUALITY)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None
+    return output.getvalue()
+
+
+def backfill_image_thumbnails(batch_size=IMAGE_THUMBNAIL_BACKFILL_BATCH):
+    # Builds the thumbnails missing from images stored before migration 5 or
+    # left out by prepare_image, a batch at a time outside the write turn.
+    filled = 0
+    last_hash = ""
+    while True:
+        with get_conn() as conn:
+            rows = conn.execute(
+                """
+                SELECT hash, data FROM image
+                WHERE thumbnail IS NULL AND hash > ?
+                ORDER BY hash
+                LIMIT ?
+                """,
+                (last_hash, batch_size),
+            ).fetchall()
+        if not rows:
+            break
+        last_hash = rows[-1]["hash"]
+        thumbnails = []
+        for row in rows:
+            thumbnail = make_thumbnail(bytes(row["data"]))
+            if thumbnail is not None:
+                thumbnails.append((thumbnail, row["hash"]))
+        if thumbnails:
+            with write_conn() as conn:
+                conn.executemany(
+                    "UPDATE image SET thumbnail = ? WHERE hash = ? AND thumbnail IS NULL",
+                    thumbnails,
+                )
+            filled += len(thumbnails)
+    if filled:
+        fetch_image_thumbnail.clear()
+    return filled
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def fetch_image_thumbnail(image_hash):
+    if not image_hash:
+        return None
+    with get_conn() as conn:
+        row = conn.execute(
+            "SELECT thumbnail FROM image WHERE hash = ?",
+            (image_hash,),
+        ).fetchone()
+    return bytes(row["thumbnail"]) if row and row["thumbnail"] is not None else None
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def preview_image(image_bytes):
+    return make_thumbnail(image_bytes) or image_bytes
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def fetch_image(image_hash):
+    if not image_hash:
+        return None
+    with get_conn() as conn:
+        row = conn.execute(
+            "SELECT data FROM image WHERE hash = ?",
+            (image_hash,),
+        ).fetchone()
+    return bytes(row["data"]) if row else None
+
+
+def insert_backlog(
+    conn,
+    task,
+    task_details,
+    lob,
+    image_hash,
+    theme,
+    evaluation,
+    estimation,
+    team,
+    sprint,
+):
+    cursor = conn.execute(
+        """
+        INSERT INTO backlog (task, task_details, lob, image_hash, theme, evaluation, estimation, team, sprint)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            task,
+            task_details,
+            lob,
+            image_hash,
+            theme,
+            evaluation,
+            estimation,
+            team,
+            sprint,
+        ),
+    )
+    return cursor.lastrowid
+
+
+def upsert_backlog_dependencies(conn, backlog_id, dependency_ids):
+    return sync_links(
+        conn,
+        "backlog_dependency",
+        "backlog_id",
+        "dependency_id",
+        [backlog_id],
+        dependency_ids,
+    )
+
+
+def upsert_dependency_backlogs(conn, dependency_id, backlog_ids):
+    return sync_links(
+        conn,
+        "backlog_dependency",
+        "dependency_id",
+        "backlog_id",
+        [dependency_id],
+        backlog_ids,
+    )
+
+
+def merge_backlogs(
+    conn,
+    primary_id,
+    merged_ids,
+    task,
+    task_details,
+    lob,
+    theme,
+    evaluation,
+    estimation,
+    team,
+    sprint,
+    dependency_ids,
+):
+    insert_theme(conn, theme)
+    conn.execute(
+        """
+        UPDATE backlog
+        SET task = ?, task_details = ?, lob = ?, theme = ?, evaluation = ?, estimation = ?, team = ?, sprint = ?
+        WHERE id = ?
+        """,
+        (
+            task,
+            task_details,
+            lob,
+            theme,
+            evaluation,
+            estimation,
+            team,
+            sprint,
+            primary_id,
+        ),
+    )
+    upsert_backlog_dependencies(conn, primary_id, dependency_ids)
+    delete_ids = [backlog_id for backlog_id in merged_ids if backlog_id != primary_id]
+    if delete_ids:
+        placeholders = ",".join(["?"] * len(delete_ids))
+        conn.execute(
+            f"DELETE FROM backlog WHERE id IN ({placeholders})",
+            tuple(delete_ids),
+        )
+
+
+def split_backlog(conn, backlog_row, split_items, dependency_ids):
+    new_ids = [
+        insert_backlog(
+            conn,
+            item_task.strip(),
+            item_task_details.strip(),
+            backlog_row["lob"],
+            backlog_row["image_hash"],
+            backlog_row["theme"],
+            backlog_row["evaluation"],
+            item_estimation,
+            backlog_row["team"],
+            backlog_row["sprint"],
+        )
+        for item_task, item_task_details, item_estimation in split_items
+    ]
+    sync_links(
+        conn,
+        "backlog_dependency",
+        "backlog_id",
+        "dependency_id",
+        new_ids,
+        dependency_ids,
+    )
+    conn.execute("DELETE FROM backlog WHERE id = ?", (backlog_row["id"],))
+    return new_ids
+
+
+def dependency_label(dep_row):
+    return f"{dep_row['task']} / {dep_row['sub_task'] or ''} [{dep_row['team']}]"
+
+
+def sniff_image_type(image_bytes):
+    if image_bytes.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if image_bytes.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if image_bytes[:4] == b"RIFF" and image_bytes[8:12] == b"WEBP":
+        return "image/webp"
+    if image_bytes[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    return None
+
+
+def decode_pasted_image(value, max_dimension):
+    data_url = value.get("dataUrl")
+    if not isinstance(data_url, str) or not data_url.startswith("data:image/"):
+        return None, None, "Pasted value is not an image."
+    header, _, payload = data_url.partition(",")
+    declared_type = header[len("data:"):].split(";", 1)[0]
+    try:
+        image_bytes = base64.b64decode(payload, validate=True)
+    except ValueError:
+        return None, None, "Pasted image could not be decoded."
+    if not image_bytes:
+        return None, None, "Pasted image is empty."
+    if len(image_bytes) > PASTE_IMAGE_MAX_BYTES:
+        return None, None, (
+            f"Pasted image is {len(image_bytes) // 1024} KB; "
+            f"the limit is {PASTE_IMAGE_MAX_BYTES // 1024} KB."
+        )
+    mime_type = sniff_image_type(image_bytes)
+    if mime_type is None or mime_type != declared_type:
+        return None, None, "Pasted image format is not supported."
+    # The size the client reports is not trusted; read it from the image.
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            width, height = image.size
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return None, None, "Pasted image could not be read."
+    if not (0 < width <= max_dimension and 0 < height <= max_dimension):
+        return None, None, (
+            f"Pasted image is {width}x{height}; "
+            f"the limit is {max_dimension}px on the longest side."
+        )
+    image_meta = {
+        "mime_type": mime_type,
+        "width": width,
+        "height": height,
+        "original_width": value.get("originalWidth"),
+        "original_height": value.get("originalHeight"),
+        "original_bytes": value.get("originalBytes"),
+        "pasted_at": value.get("pastedAt"),
+    }
+    return image_bytes, image_meta, None
+
+
+def backlog_label(backlog_row):
+    estimation_value = backlog_row["estimation"]
+    estimation_display = "-" if estimation_value is None else estimation_value
+    team_display = backlog_row["team"] or "-"
+    sprint_display = backlog_row["sprint"] or "-"
+    return (
+        f"{backlog_row['id']}: {backlog_row['task']} / {backlog_row['task_details'] or ''} "
+        f"(est {estimation_display}, {team_display}, {sprint_display})"
+    )
+
+
+def sub_backlog_label(sub_backlog_row):
+    return f"{sub_backlog_row['title']} (#{sub_backlog_row['id']})"
+
+
+class LabelIndex:
+    # Shared across sessions through cached_query, so it is built read-only.
+    def __init__(self, items):
+        self.ids = tuple(item_id for item_id, _ in items)
+        self.labels = tuple(label for _, label in items)
+        self.id_to_label = MappingProxyType(dict(items))
+        self.label_to_id = MappingProxyType({label: item_id for item_id, label in items})
+        self._folded = tuple(label.casefold() for label in self.labels)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def labels_for(self, ids):
+        return [self.id_to_label[item_id] for item_id in ids if item_id in self.id_to_label]
+
+    def ids_for(self, labels):
+        return [self.label_to_id[label] for label in labels if label in self.label_to_id]
+
+    def search(self, text, limit=LABEL_SEARCH_LIMIT):
+        terms = text.casefold().split()
+        matches = []
+        for label, folded in zip(self.labels, self._folded):
+            if all(term in folded for term in terms):
+                matches.append(label)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+
+@cached_query("backlog")
+def fetch_backlog_label_index():
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT id, task, task_details, estimation, team, sprint
+            FROM backlog
+            ORDER BY id
+            """
+        ).fetchall()
+    return LabelIndex([(row["id"], backlog_label(row)) for row in rows])
+
+
+@cached_query("dependency")
+def fetch_dependency_label_index():
+    with get_conn() as conn:
+        rows = conn.execute(
+            "SELECT id, task, sub_task, team FROM dependency ORDER BY id"
+        ).fetchall()
+    return LabelIndex([(row["id"], dependency_label(row)) for row in rows])
+
+
+@cached_query("sub_backlog")
+def fetch_sub_backlog_label_index():
+    with get_conn() as conn:
+        rows = conn.execute("SELECT id, title FROM sub_backlog ORDER BY id").fetchall()
+    return LabelIndex([(row["id"], sub_backlog_label(row)) for row in rows])
+
+
+@cached_query("theme")
+def fetch_theme_label_index():
+    with get_conn() as conn:
+        rows = conn.execute("SELECT id, name FROM theme ORDER BY name").fetchall()
+    return LabelIndex([(row["id"], row["name"]) for row in rows])
+
+
+@cached_query("evaluation")
+def fetch_evaluation_label_index():
+    with get_conn() as conn:
+        rows = conn.execute("SELECT id, name FROM evaluation ORDER BY name").fetchall()
+    return LabelIndex([(row["id"], row["name"]) for row in rows])
+
+
+def parse_estimation(value):
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None, None
+    if isinstance(value, numbers.Number):
+        if float(value).is_integer():
+            return int(value), None
+        return None, "invalid_estimation"
+    text = str(value).strip()
+    if text == "":
+        return None, None
+    text = text.replace(",", "")
+    try:
+        numeric = float(text)
+    except ValueError:
+        return None, "invalid_estimation"
+    if not numeric.is_integer():
+        return None, "invalid_estimation"
+    return int(numeric), None
+
+
+def csv_text_column(frame, column):
+    if not column or column == PLACEHOLDER_OPTION:
+        return pd.Series(None, index=frame.index, dtype=object)
+    text = frame[column].astype("string").str.strip().fillna("")
+    return text.astype(object).where(text != "", None)
+
+
+def parse_estimation_column(frame, column):
+    if not column or column == PLACEHOLDER_OPTION:
+        blank = pd.Series(True, index=frame.index)
+        return pd.Series(None, index=frame.index, dtype=object), ~blank
+    series = frame[column]
+    if pd.api.types.is_numeric_dtype(series):
+        numeric = series.astype(float)
+        blank = numeric.isna()
+    else:
+        text = (
+            series.astype("string")
+            .str.strip()
+            .str.replace(",", "", regex=False)
+            .fillna("")
+        )
+        blank = text == ""
+        numeric = pd.to_numeric(text.where(~blank), errors="coerce")
+    invalid = ~blank & (numeric.isna() | (numeric % 1 != 0))
+    estimation = numeric.where(~blank & ~invalid).astype("Int64").astype(object)
+    return estimation.where(estimation.notna(), None), invalid
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def import_backlog_csv(conn, frame, mapping, batch_size=BULK_IMPORT_BATCH_SIZE):
+    columns = {
+        field: csv_text_column(frame, mapping.get(field))
+        for field in ("task", "task_details", "lob", "theme", "evaluation", "team", "sprint")
+    }
+    estimation, invalid_estimation = parse_estimation_column(
+        frame, mapping.get("estimation")
+    )
+    missing_task = columns["task"].isna()
+    missing_theme = ~missing_task & columns["theme"].isna()
+    invalid_estimation = ~missing_task & ~missing_theme & invalid_estimation
+    valid = ~(missing_task | missing_theme | invalid_estimation)
+    skip_reasons = {
+        "missing_task": int(missing_task.sum()),
+        "missing_theme": int(missing_theme.sum()),
+        "invalid_estimation": int(invalid_estimation.sum()),
+    }
+    themes = columns["theme"][valid].unique()
+    evaluations = columns["evaluation"][valid].dropna().unique()
+    conn.executemany(
+        "INSERT OR IGNORE INTO theme (name) VALUES (?)",
+        ((name,) for name in themes),
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO evaluation (name) VALUES (?)",
+        ((name,) for name in evaluations),
+    )
+    rows = zip(
+        columns["task"][valid].to_numpy(),
+        columns["task_details"][valid].to_numpy(),
+        columns["lob"][valid].to_numpy(),
+        columns["theme"][valid].to_numpy(),
+        columns["evaluation"][valid].to_numpy(),
+        estimation[valid].to_numpy(),
+        columns["team"][valid].to_numpy(),
+        columns["sprint"][valid].to_numpy(),
+    )
+    with deferred_search_index(conn, "backlog"):
+        for batch in batched(rows, batch_size):
+            conn.executemany(
+                """
+                INSERT INTO backlog (task, task_details, lob, theme, evaluation, estimation, team, sprint)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                batch,
+            )
+    return {"inserted": int(valid.sum())}, skip_reasons
+
+
+def collapse_whitespace(series):
+    text = series.astype("string").str.replace(r"\s+", " ", regex=True).str.strip()
+    return text.astype(object).where(text.notna(), None)
+
+
+def normalize_dependency_frame(frame):
+    canonical_teams = {team.casefold(): team for team in DEPENDENCY_TEAMS}
+    normalized = pd.DataFrame(
+        {field: collapse_whitespace(frame[field]) for field in ("task", "sub_task", "team")}
+    )
+    folded_team = normalized["team"].str.casefold()
+    normalized["team"] = normalized["team"].where(
+        ~folded_team.isin(canonical_teams), folded_team.map(canonical_teams)
+    )
+    return normalized
+
+
+def dependency_key_hashes(frame):
+    # Natural key: team, task and sub-task, ignoring case and spacing.
+    keys = pd.DataFrame(
+        {
+            "team": frame["team"].str.casefold(),
+            "task": frame["task"].str.casefold(),
+            "sub_task": frame["sub_task"].fillna("").str.casefold(),
+        }
+    )
+    return pd.util.hash_pandas_object(keys, index=False).to_numpy()
+
+
+def import_dependency_csv(conn, frame, mapping, update_existing=False):
+    columns = {
+        field: csv_text_column(frame, mapping.get(field))
+        for field in ("task", "sub_task", "team")
+    }
+    missing_task = columns["task"].isna()
+    missing_team = ~missing_task & columns["team"].isna()
+    valid = ~(missing_task | missing_team)
+    skip_reasons = {
+        "missing_task": int(missing_task.sum()),
+        "missing_team": int(missing_team.sum()),
+    }
+    incoming = normalize_dependency_frame(pd.DataFrame(columns)[valid])
+    incoming["key"] = dependency_key_hashes(incoming)
+    repeated = incoming["key"].duplicated()
+    skip_reasons["duplicate"] = int(repeated.sum())
+    incoming = incoming[~repeated]
+    # Only rows that can share a chunk key are read. LOWER(TRIM()) agrees with
+    # the casefolded key for printable ASCII with single spaces; any other
+    # task is read regardless and matched in pandas.
+    existing = pd.DataFrame.from_records(
+        conn.execute(
+            """
+            SELECT id, task, sub_task, team FROM dependency
+            WHERE LOWER(TRIM(task)) IN (SELECT value FROM json_each(?))
+                OR task GLOB '*[^ -~]*'
+                OR task GLOB '*  *'
+            ORDER BY id
+            """,
+            (json.dumps(incoming["task"].str.casefold().unique().tolist()),),
+        ).fetchall(),
+        columns=["id", "task", "sub_task", "team"],
+    )
+    existing["key"] = dependency_key_hashes(normalize_dependency_frame(existing))
+    existing = existing.drop_duplicates("key")
+    merged = incoming.merge(
+        existing, on="key", how="left", suffixes=("", "_existing"), sort=False
+    )
+    new = merged["id"].isna()
+    changed = ~new & (
+        (merged["task"] != merged["task_existing"])
+        | (merged["sub_task"].fillna("") != merged["sub_task_existing"].fillna(""))
+        | (merged["team"] != merged["team_existing"])
+    )
+    inserts = zip(
+        merged["task"][new].to_numpy(),
+        merged["sub_task"][new].to_numpy(),
+        merged["team"][new].to_numpy(),
+    )
+    with deferred_search_index(conn, "dependency"):
+        for batch in batched(inserts, BULK_IMPORT_BATCH_SIZE):
+            conn.executemany(
+                "INSERT INTO dependency (task, sub_task, team) VALUES (?, ?, ?)",
+                batch,
+            )
+    changed_count = int(changed.sum())
+    updated = changed_count if update_existing else 0
+    if updated:
+        conn.executemany(
+            "UPDATE dependency SET task = ?, sub_task = ?, team = ? WHERE id = ?",
+            zip(
+                merged["task"][changed].to_numpy(),
+                merged["sub_task"][changed].to_numpy(),
+                merged["team"][changed].to_numpy(),
+                merged["id"][changed].astype(int).tolist(),
+            ),
+        )
+    counts = {
+        "inserted": int(new.sum()),
+        "updated": updated,
+        "changed_not_updated": changed_count - updated,
+        "unchanged": int((~new).sum()) - changed_count,
+    }
+    return counts, skip_reasons
+
+
+def read_csv_preview(uploaded_file, rows=CSV_PREVIEW_ROWS):
+    uploaded_file.seek(0)
+    return pd.read_csv(uploaded_file, nrows=rows)
+
+
+def fetch_csv_import_progress(file_hash, target):
+    with get_conn() as conn:
+        row = conn.execute(
+            """
+            SELECT rows_done, imported, counts, skip_reasons, settings
+            FROM csv_import_progress
+            WHERE file_hash = ? AND target = ?
+            """,
+            (file_hash, target),
+        ).fetchone()
+    return row
+
+
+def clear_csv_import_progress(file_hash, target):
+    with write_conn() as conn:
+        conn.execute(
+            "DELETE FROM csv_import_progress WHERE file_hash = ? AND target = ?",
+            (file_hash, target),
+        )
+
+
+def csv_import_settings(mapping, options=None):
+    return json.dumps({"mapping": mapping, "options": options or {}}, sort_keys=True)
+
+
+def stream_csv_import(
+    csv_file,
+    file_hash,
+    target,
+    mapping,
+    import_chunk,
+    on_progress=None,
+    chunk_rows=CSV_IMPORT_CHUNK_ROWS,
+    options=None,
+):
+    # Each chunk commits with its progress row, so a rerun after a failure
+    # skips the chunks that already landed. Those rows stay committed, so
+    # progress saved under another mapping or other options is neither
+    # resumed nor restarted over them; the caller has to clear it first.
+    settings = csv_import_settings(mapping, options)
+    progress = fetch_csv_import_progress(file_hash, target)
+    if progress is not None and progress["settings"] != settings:
+        raise ValueError(
+            "a previous import of this file used a different mapping or options; "
+            "start over before importing with the new settings"
+        )
+    rows_done = progress["rows_done"] if progress else 0
+    counts = json.loads(progress["counts"]) if progress else {}
+    skip_reasons = json.loads(progress["skip_reasons"]) if progress else {}
+    if options:
+        import_chunk = functools.partial(import_chunk, **options)
+    usecols = sorted(
+        {column for column in mapping.values() if column and column != PLACEHOLDER_OPTION}
+    )
+    file_size = csv_file.seek(0, io.SEEK_END)
+    csv_file.seek(0)
+    rows_read = 0
+    with pd.read_csv(
+        csv_file,
+        usecols=usecols,
+        dtype=str,
+        chunksize=chunk_rows,
+    ) as reader:
+        for chunk in reader:
+            rows_read += len(chunk)
+            if rows_read > rows_done:
+                with write_conn() as conn:
+                    chunk_counts, chunk_skips = import_chunk(conn, chunk, mapping)
+                    for outcome, count in chunk_counts.items():
+                        counts[outcome] = counts.get(outcome, 0) + count
+                    for reason, count in chunk_skips.items():
+                        skip_reasons[reason] = skip_reasons.get(reason, 0) + count
+                    rows_done = rows_read
+                    conn.execute(
+                        """
+                        INSERT INTO csv_import_progress (
+                            file_hash, target, rows_done, imported, counts, skip_reasons,
+                            settings, updated_at
+                        )
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (file_hash, target) DO UPDATE SET
+                            rows_done = excluded.rows_done,
+                            imported = excluded.imported,
+                            counts = excluded.counts,
+                            skip_reasons = excluded.skip_reasons,
+                            settings = excluded.settings,
+                            updated_at = excluded.updated_at
+                        """,
+                        (
+                            file_hash,
+                            target,
+                            rows_done,
+                            counts.get("inserted", 0) + counts.get("updated", 0),
+                            json.dumps(counts),
+                            json.dumps(skip_reasons),
+                            settings,
+                            datetime.now().isoformat(timespec="seconds"),
+                        ),
+                    )
+            if on_progress is not None:
+                fraction = csv_file.tell() / max(file_size, 1)
+                on_progress(rows_read, min(fraction, 1.0))
+    clear_csv_import_progress(file_hash, target)
+    return counts, skip_reasons
@@ -0,0 +1,535 @@
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+from PIL import Image
+
+import backlog_db as db
+
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+LOBS = ["Retail", "Corporate", "Wealth", "Cards", "Payments"]
+NOTE_TYPES = ["Todo", "Decision", ""]
+NOTE_STATUSES = ["open", "in-progress", "completed"]
+WORDS = (
+    "account api audit batch billing cache checkout customer dashboard data export "
+    "feature flag gateway import invoice ledger login migration mobile notification "
+    "onboarding payment portal pricing profile report refund search settlement "
+    "statement sync token transfer upload validation webhook workflow"
+).split()
+
+
+def sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def make_image(rng, size=(640, 480)):
+    image = Image.effect_noise(size, rng.randint(20, 80)).convert("RGB")
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def seed(conn, backlogs, rng, image_count, image_ratio):
+    timings = {}
+    themes = [f"Theme {index}" for index in range(max(5, backlogs // 2000))]
+    evaluations = [f"Evaluation {index}" for index in range(8)]
+    dependencies = max(10, backlogs // 5)
+    sub_backlogs = max(10, backlogs // 10)
+    meetings = max(5, backlogs // 50)
+    meeting_notes = max(10, backlogs // 2)
+
+    started = time.perf_counter()
+    conn.executemany("INSERT OR IGNORE INTO theme (name) VALUES (?)", ((name,) for name in themes))
+    conn.executemany(
+        "INSERT OR IGNORE INTO evaluation (name) VALUES (?)",
+        ((name,) for name in evaluations),
+    )
+    image_hashes = [
+        db.store_image(
+            conn, db.prepare_image(make_image(rng), {"mime_type": "image/png"})
+        )
+        for _ in range(image_count)
+    ]
+    timings["themes_evaluations_images"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with db.deferred_search_index(conn, "backlog"):
+        conn.executemany(
+            """
+            INSERT INTO backlog (task, task_details, lob, image_hash, theme, evaluation, estimation, team, sprint)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (
+                    f"{sentence(rng, 3)} #{index}",
+                    sentence(rng, 12),
+                    rng.choice(LOBS),
+                    rng.choice(image_hashes)
+                    if image_hashes and rng.random() < image_ratio
+                    else None,
+                    rng.choice(themes),
+                    rng.choice(evaluations + [None]),
+                    rng.choice([None, 1, 2, 3, 5, 8, 13]),
+                    rng.choice(db.BACKLOG_TEAMS + [None]),
+                    rng.choice(db.SPRINTS + [None]),
+                )
+                for index in range(backlogs)
+            ),
+        )
+    timings["backlog"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    with db.deferred_search_index(conn, "dependency"):
+        conn.executemany(
+            "INSERT INTO dependency (task, sub_task, team) VALUES (?, ?, ?)",
+            (
+                (sentence(rng, 3), sentence(rng, 4), rng.choice(db.DEPENDENCY_TEAMS))
+                for _ in range(dependencies)
+            ),
+        )
+    conn.executemany(
+        "INSERT INTO sub_backlog (title, note) VALUES (?, ?)",
+        ((sentence(rng, 3), sentence(rng, 8)) for _ in range(sub_backlogs)),
+    )
+    timings["dependency_sub_backlog"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    first_meeting = datetime(2024, 1, 1, 9, 0)
+    conn.executemany(
+        "INSERT INTO meeting (title, meeting_datetime) VALUES (?, ?)",
+        (
+            (
+                sentence(rng, 3),
+                (first_meeting + timedelta(days=index)).strftime("%Y-%m-%d %H:%M"),
+            )
+            for index in range(meetings)
+        ),
+    )
+    with db.deferred_search_index(conn, "meeting_note"):
+        conn.executemany(
+            """
+            INSERT INTO meeting_note (meeting_id, meeting_date, topic, note_type, note, status)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (
+                    meeting_id,
+                    (first_meeting + timedelta(days=meeting_id - 1)).strftime("%Y-%m-%d"),
+                    sentence(rng, 3),
+                    rng.choice(NOTE_TYPES),
+                    sentence(rng, 20),
+                    rng.choice(NOTE_STATUSES),
+                )
+                for meeting_id in (rng.randint(1, meetings) for _ in range(meeting_notes))
+            ),
+        )
+    timings["meeting_meeting_note"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    link_specs = [
+        ("backlog_dependency", "backlog_id", backlogs, "dependency_id", dependencies, 2),
+        ("sub_backlog_backlog", "backlog_id", backlogs, "sub_backlog_id", sub_backlogs, 1),
+        ("meeting_note_backlog", "meeting_note_id", meeting_notes, "backlog_id", backlogs, 1),
+        (
+            "meeting_note_dependency",
+            "meeting_note_id",
+            meeting_notes,
+            "dependency_id",
+            dependencies,
+            1,
+        ),
+        ("meeting_note_theme", "meeting_note_id", meeting_notes, "theme_id", len(themes), 1),
+        (
+            "meeting_note_evaluation",
+            "meeting_note_id",
+            meeting_notes,
+            "evaluation_id",
+            len(evaluations),
+            1,
+        ),
+    ]
+    for table, owner_column, owners, target_column, targets, per_owner in link_specs:
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {table} ({owner_column}, {target_column}) VALUES (?, ?)",
+            (
+                (owner_id, rng.randint(1, targets))
+                for owner_id in range(1, owners + 1)
+                for _ in range(rng.randint(0, per_owner * 2))
+            ),
+        )
+    timings["links"] = time.perf_counter() - started
+    return timings
+
+
+def table_counts(conn):
+    tables = [
+        row["name"]
+        for row in conn.execute(
+            """
+            SELECT name FROM sqlite_master
+            WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND name NOT LIKE 'search_index_%'
+            ORDER BY name
+            """
+        ).fetchall()
+    ]
+    return {
+        table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in tables
+    }
+
+
+def result_size(result):
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, dict) and all(
+        isinstance(value, int) for value in result.values()
+    ):
+        return sum(result.values())
+    if isinstance(result, (list, dict, pd.DataFrame)):
+        return len(result)
+    if isinstance(result, int):
+        return result
+    return None
+
+
+def measure(name, category, func, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - started)
+    return {
+        "name": name,
+        "category": category,
+        "runs": repeat,
+        "median_ms": statistics.median(samples) * 1000,
+        "min_ms": min(samples) * 1000,
+        "max_ms": max(samples) * 1000,
+        "rows": result_size(result),
+    }
+
+
+def uncached(func):
+    return getattr(func, "uncached", None) or getattr(func, "__wrapped__", func)
+
+
+def read_cases(conn):
+    sample = {
+        "backlog_id": conn.execute(
+            """
+            SELECT backlog_id FROM backlog_dependency
+            GROUP BY backlog_id ORDER BY COUNT(*) DESC LIMIT 1
+            """
+        ).fetchone(),
+        "dependency_id": conn.execute(
+            "SELECT MIN(id) FROM dependency"
+        ).fetchone(),
+        "sub_backlog_id": conn.execute("SELECT MIN(id) FROM sub_backlog").fetchone(),
+        "meeting_note_id": conn.execute("SELECT MIN(id) FROM meeting_note").fetchone(),
+        "theme_id": conn.execute("SELECT MIN(id) FROM theme").fetchone(),
+        "evaluation_id": conn.execute("SELECT MIN(id) FROM evaluation").fetchone(),
+        "image_hash": conn.execute("SELECT MIN(hash) FROM image").fetchone(),
+    }
+    sample = {key: row[0] if row else None for key, row in sample.items()}
+    sample_backlog_ids = tuple(
+        row[0] for row in conn.execute("SELECT id FROM backlog ORDER BY id LIMIT 100")
+    )
+    filters = (("team", db.BACKLOG_TEAMS[0]), ("search", WORDS[0]))
+    note_filters = (("note_type", "todo"), ("status", "open"))
+    cases = [
+        ("fetch_themes", ()),
+        ("fetch_evaluations", ()),
+        ("fetch_theme_rows", ()),
+        ("fetch_evaluation_rows", ()),
+        ("fetch_meeting_notes", ()),
+        ("fetch_todo_meeting_notes", ()),
+        ("fetch_meeting_note_feed", ((), 100)),
+        ("fetch_meeting_note_feed", (note_filters, 100)),
+        ("count_meeting_notes", (note_filters,)),
+        ("fetch_meeting_notes_for_backlog", (sample["backlog_id"],)),
+        ("fetch_meeting_notes_for_dependency", (sample["dependency_id"],)),
+        ("fetch_meeting_notes_for_theme", (sample["theme_id"],)),
+        ("fetch_meeting_notes_for_evaluation", (sample["evaluation_id"],)),
+        ("fetch_meeting_notes_for_sub_backlog", (sample["sub_backlog_id"],)),
+        ("fetch_meetings", ()),
+        ("fetch_dependencies", ()),
+        ("fetch_sprint_team_rollup", ()),
+        ("fetch_team_capacities", ()),
+        ("fetch_backlogs", ()),
+        ("search_items", (WORDS[1],)),
+        ("search_item_ids", ("backlog", WORDS[2])),
+        ("count_backlogs", (filters,)),
+        ("fetch_backlog_page", (filters, 100)),
+        ("fetch_backlog_dependency_ids", (sample["backlog_id"],)),
+        ("fetch_backlogs_for_dependency", (sample["dependency_id"],)),
+        ("fetch_sub_backlogs", ()),
+        ("count_cross_view_backlogs", (("sub_backlog", "dependency"),)),
+        ("fetch_cross_view_page", (("sub_backlog", "dependency"), (), "task")),
+        ("fetch_backlogs_for_sub_backlog", (sample["sub_backlog_id"],)),
+        ("fetch_sub_backlog_ids_for_backlog", (sample["backlog_id"],)),
+        ("fetch_backlog_ids_for_sub_backlog", (sample["sub_backlog_id"],)),
+        ("fetch_meeting_note_backlog_ids", (sample["meeting_note_id"],)),
+        ("fetch_meeting_note_dependency_ids", (sample["meeting_note_id"],)),
+        ("fetch_meeting_note_theme_ids", (sample["meeting_note_id"],)),
+        ("fetch_meeting_note_evaluation_ids", (sample["meeting_note_id"],)),
+        ("fetch_meeting_note_link_id_sets", ((sample["meeting_note_id"],),)),
+        ("fetch_backlog_dependency_id_sets", (sample_backlog_ids,)),
+        ("fetch_image_thumbnail", (sample["image_hash"],)),
+        ("fetch_image", (sample["image_hash"],)),
+    ]
+    return cases
+
+
+def sprint_team_pivot():
+    rollup_df = pd.DataFrame([dict(row) for row in db.fetch_sprint_team_rollup.uncached()])
+    if rollup_df.empty:
+        return rollup_df
+    return rollup_df.pivot_table(
+        index="sprint",
+        columns="team",
+        values="total_estimation",
+        aggfunc="sum",
+        fill_value=0,
+    )
+
+
+def rolled_back(func):
+    # Each write case runs in its own transaction and is rolled back, so
+    # repeats and later cases see the same seeded data.
+    def run():
+        conn = db.open_conn()
+        try:
+            conn.execute("BEGIN")
+            return func(conn)
+        finally:
+            conn.rollback()
+            conn.close()
+
+    return run
+
+
+def write_cases(conn, rng, import_rows):
+    backlog_ids = [row[0] for row in conn.execute("SELECT id FROM backlog LIMIT 500")]
+    dependency_ids = [row[0] for row in conn.execute("SELECT id FROM dependency LIMIT 20")]
+    backlog_row = conn.execute(
+        "SELECT * FROM backlog WHERE estimation IS NOT NULL LIMIT 1"
+    ).fetchone()
+    image_bytes = make_image(rng)
+    backlog_csv = pd.DataFrame(
+        {
+            "task": [f"{sentence(rng, 3)} #{index}" for index in range(import_rows)],
+            "task_details": [sentence(rng, 8) for _ in range(import_rows)],
+            "theme": [f"Import theme {index % 20}" for index in range(import_rows)],
+            "estimation": [str(rng.choice([1, 2, 3, 5, 8])) for _ in range(import_rows)],
+            "team": [rng.choice(db.BACKLOG_TEAMS) for _ in range(import_rows)],
+            "sprint": [rng.choice(db.SPRINTS) for _ in range(import_rows)],
+        }
+    )
+    dependency_csv = pd.DataFrame(
+        {
+            "task": [sentence(rng, 3) for _ in range(import_rows)],
+            "sub_task": [sentence(rng, 4) for _ in range(import_rows)],
+            "team": [rng.choice(db.DEPENDENCY_TEAMS) for _ in range(import_rows)],
+        }
+    )
+
+    def insert_backlogs(write_conn):
+        for index in range(100):
+            db.insert_backlog(
+                write_conn,
+                f"Bench task {index}",
+                None,
+                None,
+                None,
+                "Theme 0",
+                None,
+                3,
+                db.BACKLOG_TEAMS[0],
+                db.SPRINTS[0],
+            )
+        return 100
+
+    return [
+        ("insert_backlog x100", rolled_back(insert_backlogs)),
+        (
+            "upsert_backlog_dependencies",
+            rolled_back(
+                lambda write_conn: db.upsert_backlog_dependencies(
+                    write_conn, backlog_ids[0], dependency_ids
+                )
+            ),
+        ),
+        (
+            "sync_links 500 backlogs x 20 dependencies",
+            rolled_back(
+                lambda write_conn: db.sync_links(
+                    write_conn,
+                    "backlog_dependency",
+                    "backlog_id",
+                    "dependency_id",
+                    backlog_ids,
+                    dependency_ids,
+                )
+            ),
+        ),
+        (
+            "merge_backlogs x5",
+            rolled_back(
+                lambda write_conn: db.merge_backlogs(
+                    write_conn,
+                    backlog_ids[0],
+                    backlog_ids[:5],
+                    "Merged task",
+                    None,
+                    None,
+                    "Theme 0",
+                    None,
+                    8,
+                    db.BACKLOG_TEAMS[0],
+                    db.SPRINTS[0],
+                    dependency_ids[:3],
+                )
+            ),
+        ),
+        (
+            "split_backlog x3",
+            rolled_back(
+                lambda write_conn: db.split_backlog(
+                    write_conn,
+                    backlog_row,
+                    [("Split task", f"Part {index}", 1) for index in range(3)],
+                    dependency_ids[:3],
+                )
+            ),
+        ),
+        (
+            "store_image",
+            rolled_back(
+                lambda write_conn: db.store_image(write_conn, db.prepare_image(image_bytes))
+            ),
+        ),
+        (
+            f"import_backlog_csv {import_rows} rows",
+            rolled_back(
+                lambda write_conn: db.import_backlog_csv(
+                    write_conn,
+                    backlog_csv,
+                    {column: column for column in backlog_csv.columns},
+                )
+            ),
+        ),
+        (
+            f"import_dependency_csv {import_rows} rows",
+            rolled_back(
+                lambda write_conn: db.import_dependency_csv(
+                    write_conn,
+                    dependency_csv,
+                    {column: column for column in dependency_csv.columns},
+                )
+            ),
+        ),
+    ]
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    work_dir = tempfile.mkdtemp(prefix="backlog-bench-")
+    db.DB_PATH = args.db or os.path.join(work_dir, "backlog.db")
+    try:
+        if args.db and os.path.exists(args.db) and not args.reseed:
+            db.init_db()
+            seed_timings = {}
+        else:
+            if os.path.exists(db.DB_PATH):
+                os.remove(db.DB_PATH)
+            db.init_db()
+            with db.get_conn() as conn:
+                seed_timings = seed(
+                    conn, args.backlogs, rng, args.images, args.image_ratio
+                )
+        with db.get_conn() as conn:
+            counts = table_counts(conn)
+            cases = read_cases(conn)
+            writes = write_cases(conn, rng, args.import_rows)
+
+        results = []
+        for name, params in cases:
+            func = getattr(db, name)
+            results.append(
+                measure(name, "read", lambda: uncached(func)(*params), args.repeat)
+            )
+            if hasattr(func, "uncached"):
+                func(*params)
+                results.append(
+                    measure(f"{name} (cached)", "read_cached", lambda: func(*params), args.repeat)
+                )
+        results.append(measure("sprint_team_pivot", "view", sprint_team_pivot, args.repeat))
+        for name, func in writes:
+            results.append(measure(name, "write", func, args.repeat))
+        return {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "config": vars(args),
+            "seed_seconds": seed_timings,
+            "counts": counts,
+            "results": results,
+        }
+    finally:
+        db.close_pool()
+        if not args.db:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Seed a synthetic backlog database and time the data layer."
+    )
+    parser.add_argument("--scale", choices=SCALES, default="10k")
+    parser.add_argument("--backlogs", type=int, help="Backlog rows (overrides --scale)")
+    parser.add_argument("--images", type=int, default=20, help="Distinct image blobs")
+    parser.add_argument(
+        "--image-ratio", type=float, default=0.1, help="Share of backlogs with an image"
+    )
+    parser.add_argument("--import-rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--db", help="Database file to keep (default: temporary)")
+    parser.add_argument("--reseed", action="store_true", help="Recreate an existing --db")
+    parser.add_argument("--output", default="benchmark_report.json")
+    args = parser.parse_args(argv)
+    if args.backlogs is None:
+        args.backlogs = SCALES[args.scale]
+    return args
+
+
+def main(argv=None):
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    args = parse_args(argv)
+    report = run(args)
+    with open(args.output, "w", encoding="utf-8") as report_file:
+        json.dump(report, report_file, indent=2)
+    for result in report["results"]:
+        print(
+            f"{result['category']:<12} {result['median_ms']:>10.2f} ms  "
+            f"{result['rows'] if result['rows'] is not None else '':>8}  {result['name']}"
+        )
+    print(f"Report written to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
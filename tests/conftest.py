@@ -0,0 +1,210 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import backlog_db  # noqa: E402
+
+# The schema as the app created it before versioned migrations existed.
+BASELINE_SCHEMA = """
+CREATE TABLE backlog (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task TEXT NOT NULL,
+    task_details TEXT,
+    lob TEXT,
+    image_blob BLOB,
+    theme TEXT NOT NULL,
+    evaluation TEXT,
+    estimation INTEGER,
+    team TEXT,
+    sprint TEXT
+);
+
+CREATE TABLE dependency (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task TEXT NOT NULL,
+    sub_task TEXT,
+    team TEXT NOT NULL
+);
+
+CREATE TABLE theme (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE evaluation (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL UNIQUE,
+    note TEXT
+);
+
+CREATE TABLE backlog_dependency (
+    backlog_id INTEGER NOT NULL,
+    dependency_id INTEGER NOT NULL,
+    PRIMARY KEY (backlog_id, dependency_id),
+    FOREIGN KEY (backlog_id) REFERENCES backlog(id) ON DELETE CASCADE,
+    FOREIGN KEY (dependency_id) REFERENCES dependency(id) ON DELETE CASCADE
+);
+
+CREATE TABLE sub_backlog (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    backlog_id INTEGER,
+    title TEXT NOT NULL,
+    note TEXT
+);
+
+CREATE TABLE sub_backlog_backlog (
+    sub_backlog_id INTEGER NOT NULL,
+    backlog_id INTEGER NOT NULL,
+    PRIMARY KEY (sub_backlog_id, backlog_id),
+    FOREIGN KEY (sub_backlog_id) REFERENCES sub_backlog(id) ON DELETE CASCADE,
+    FOREIGN KEY (backlog_id) REFERENCES backlog(id) ON DELETE CASCADE
+);
+
+CREATE TABLE meeting (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    meeting_datetime TEXT NOT NULL
+);
+
+CREATE TABLE meeting_note (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    meeting_id INTEGER,
+    meeting_date TEXT,
+    topic TEXT,
+    note_type TEXT NOT NULL DEFAULT '',
+    note TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'open',
+    FOREIGN KEY (meeting_id) REFERENCES meeting(id) ON DELETE SET NULL
+);
+
+CREATE TABLE meeting_note_backlog (
+    meeting_note_id INTEGER NOT NULL,
+    backlog_id INTEGER NOT NULL,
+    PRIMARY KEY (meeting_note_id, backlog_id),
+    FOREIGN KEY (meeting_note_id) REFERENCES meeting_note(id) ON DELETE CASCADE,
+    FOREIGN KEY (backlog_id) REFERENCES backlog(id) ON DELETE CASCADE
+);
+
+CREATE TABLE meeting_note_dependency (
+    meeting_note_id INTEGER NOT NULL,
+    dependency_id INTEGER NOT NULL,
+    PRIMARY KEY (meeting_note_id, dependency_id),
+    FOREIGN KEY (meeting_note_id) REFERENCES meeting_note(id) ON DELETE CASCADE,
+    FOREIGN KEY (dependency_id) REFERENCES dependency(id) ON DELETE CASCADE
+);
+
+CREATE TABLE meeting_note_theme (
+    meeting_note_id INTEGER NOT NULL,
+    theme_id INTEGER NOT NULL,
+    PRIMARY KEY (meeting_note_id, theme_id),
+    FOREIGN KEY (meeting_note_id) REFERENCES meeting_note(id) ON DELETE CASCADE,
+    FOREIGN KEY (theme_id) REFERENCES theme(id) ON DELETE CASCADE
+);
+
+CREATE TABLE meeting_note_evaluation (
+    meeting_note_id INTEGER NOT NULL,
+    evaluation_id INTEGER NOT NULL,
+    PRIMARY KEY (meeting_note_id, evaluation_id),
+    FOREIGN KEY (meeting_note_id) REFERENCES meeting_note(id) ON DELETE CASCADE,
+    FOREIGN KEY (evaluation_id) REFERENCES evaluation(id) ON DELETE CASCADE
+);
+"""
+
+BACKLOGS = 40
+DEPENDENCIES = 12
+SUB_BACKLOGS = 6
+MEETING_NOTES = 20
+
+
+def seed_baseline(conn, rng):
+    conn.executemany(
+        """
+        INSERT INTO backlog (task, theme, estimation, team, sprint)
+        VALUES (?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                f"task {index}",
+                "theme",
+                rng.choice([None, 1, 2, 3, 5, 8]),
+                rng.choice([None, *backlog_db.BACKLOG_TEAMS]),
+                rng.choice([None, *backlog_db.SPRINTS[:3]]),
+            )
+            for index in range(BACKLOGS)
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO dependency (task, team) VALUES (?, ?)",
+        [(f"dependency {index}", "PC") for index in range(DEPENDENCIES)],
+    )
+    conn.executemany(
+        "INSERT INTO sub_backlog (title) VALUES (?)",
+        [(f"sub-backlog {index}",) for index in range(SUB_BACKLOGS)],
+    )
+    conn.executemany(
+        "INSERT INTO meeting_note (meeting_date, note_type, note, status) VALUES (?, ?, ?, ?)",
+        [
+            (
+                rng.choice([None, "", "2024-03-01", "2024-04-02 10:00"]),
+                rng.choice(["Todo", " todo ", "DECISION"]),
+                f"note {index}",
+                rng.choice(["Open", "in-progress ", "completed"]),
+            )
+            for index in range(MEETING_NOTES)
+        ],
+    )
+    for table, owner_column, owners, target_column, targets in (
+        ("backlog_dependency", "backlog_id", BACKLOGS, "dependency_id", DEPENDENCIES),
+        ("sub_backlog_backlog", "backlog_id", BACKLOGS, "sub_backlog_id", SUB_BACKLOGS),
+        ("meeting_note_backlog", "backlog_id", BACKLOGS, "meeting_note_id", MEETING_NOTES),
+    ):
+        conn.executemany(
+            f"INSERT OR IGNORE INTO {table} ({owner_column}, {target_column}) VALUES (?, ?)",
+            [
+                (rng.randint(1, owners), rng.randint(1, targets))
+                for _ in range(owners * 2)
+            ],
+        )
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / "backlog.db"
+    monkeypatch.setattr(backlog_db, "DB_PATH", str(path))
+    return path
+
+
+@pytest.fixture
+def pool(db_path):
+    backlog_db.close_pool()
+    yield backlog_db.get_pool()
+    backlog_db.close_pool()
+
+
+@pytest.fixture
+def baseline_conn(db_path):
+    conn = backlog_db.open_conn()
+    conn.executescript(BASELINE_SCHEMA)
+    seed_baseline(conn, random.Random(7))
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def migrated_conn(baseline_conn):
+    backlog_db.migrate_db(baseline_conn)
+    return baseline_conn
+
+
+@pytest.fixture
+def pooled_db(migrated_conn):
+    backlog_db.close_pool()
+    backlog_db.get_query_cache.clear()
+    yield migrated_conn
+    backlog_db.close_pool()
+    backlog_db.get_query_cache.clear()
@@ -0,0 +1,101 @@
+import backlog_db
+
+
+def all_ids(conn, where="1 = 1", params=()):
+    return [
+        row["id"]
+        for row in conn.execute(f"SELECT id FROM backlog WHERE {where} ORDER BY id", params)
+    ]
+
+
+def test_count_backlogs_applies_choice_text_and_search_filters(pooled_db):
+    conn = pooled_db
+    conn.execute("UPDATE backlog SET task_details = '50% done' WHERE id = 3")
+    conn.execute("UPDATE backlog SET lob = 'Retail' WHERE id IN (4, 5)")
+    conn.commit()
+    assert backlog_db.count_backlogs() == len(all_ids(conn))
+    assert backlog_db.count_backlogs((("team", "Team 1"),)) == len(
+        all_ids(conn, "team = ?", ("Team 1",))
+    )
+    assert backlog_db.count_backlogs((("lob", "reta"),)) == 2
+    assert backlog_db.count_backlogs((("search", "50%"),)) == 1
+    assert backlog_db.count_backlogs((("task_details", "50%"),)) == 1
+    assert backlog_db.count_backlogs((("task_details", "5_%"),)) == 0
+    assert backlog_db.count_backlogs((("task", "  "),)) == len(all_ids(conn))
+
+
+def test_fetch_backlog_page_walks_every_row_by_keyset(pooled_db):
+    filters = (("theme", "theme"),)
+    seen = []
+    rows, has_prev, has_next = backlog_db.fetch_backlog_page(filters, 15)
+    pages = [rows]
+    assert not has_prev
+    while has_next:
+        rows, has_prev, has_next = backlog_db.fetch_backlog_page(
+            filters, 15, ("next", rows[-1]["id"])
+        )
+        assert has_prev
+        pages.append(rows)
+    for page in pages:
+        seen.extend(row["id"] for row in page)
+    assert seen == all_ids(pooled_db)
+    assert [len(page) for page in pages] == [15, 15, 10]
+
+    rows, has_prev, has_next = backlog_db.fetch_backlog_page(
+        filters, 15, ("prev", pages[2][0]["id"])
+    )
+    assert [row["id"] for row in rows] == [row["id"] for row in pages[1]]
+    assert has_prev and has_next
+
+
+def test_fetch_backlog_page_falls_back_to_the_first_page(pooled_db):
+    first, _, _ = backlog_db.fetch_backlog_page((), 10)
+    rows, has_prev, has_next = backlog_db.fetch_backlog_page((), 10, ("prev", first[0]["id"]))
+    assert [row["id"] for row in rows] == [row["id"] for row in first]
+    assert not has_prev and has_next
+
+
+def link_counts(conn, table):
+    return dict(
+        conn.execute(f"SELECT backlog_id, COUNT(*) FROM {table} GROUP BY backlog_id").fetchall()
+    )
+
+
+def test_cross_view_page_joins_links_for_one_page_of_backlogs(pooled_db):
+    links = ("sub_backlog", "dependency")
+    rows = backlog_db.fetch_cross_view_page(links, page=2, page_size=5)
+    page_ids = list(dict.fromkeys(row["backlog_id"] for row in rows))
+    assert page_ids == all_ids(pooled_db)[5:10]
+
+    sub_backlogs = link_counts(pooled_db, "sub_backlog_backlog")
+    dependencies = link_counts(pooled_db, "backlog_dependency")
+    for backlog_id in page_ids:
+        expected = max(sub_backlogs.get(backlog_id, 0), 1) * max(
+            dependencies.get(backlog_id, 0), 1
+        )
+        assert sum(row["backlog_id"] == backlog_id for row in rows) == expected
+
+
+def test_cross_view_page_aggregates_one_row_per_backlog(pooled_db):
+    rows = backlog_db.fetch_cross_view_page(
+        ("dependency",), sort_key="estimation", descending=True, page_size=50, aggregate=True
+    )
+    assert len(rows) == len(all_ids(pooled_db))
+    dependencies = link_counts(pooled_db, "backlog_dependency")
+    assert {row["backlog_id"]: row["dependency_count"] for row in rows} == {
+        backlog_id: dependencies.get(backlog_id, 0) for backlog_id in all_ids(pooled_db)
+    }
+    estimations = [row["backlog_estimation"] for row in rows]
+    assert estimations == sorted(
+        estimations, key=lambda value: (value is not None, value), reverse=True
+    )
+
+
+def test_count_cross_view_backlogs_can_require_links(pooled_db):
+    links = ("sub_backlog", "dependency")
+    assert backlog_db.count_cross_view_backlogs(links) == len(all_ids(pooled_db))
+    sub_backlogs = link_counts(pooled_db, "sub_backlog_backlog")
+    dependencies = link_counts(pooled_db, "backlog_dependency")
+    assert backlog_db.count_cross_view_backlogs(links, linked_only=True) == len(
+        set(sub_backlogs) & set(dependencies)
+    )
@@ -0,0 +1,321 @@
+import io
+
+import pandas as pd
+import pytest
+
+import backlog_db
+
+MAPPING = {
+    "task": "Task",
+    "task_details": "Details",
+    "lob": None,
+    "theme": "Theme",
+    "evaluation": None,
+    "estimation": None,
+    "team": None,
+    "sprint": None,
+}
+
+
+def csv_file(rows):
+    lines = ["Task,Details,Theme"]
+    lines.extend(f"Imported {index},Details {index},Theme {index % 3}" for index in range(rows))
+    return io.BytesIO("\n".join(lines).encode())
+
+
+def imported_count(conn):
+    return conn.execute(
+        "SELECT COUNT(*) FROM backlog WHERE task LIKE 'Imported %'"
+    ).fetchone()[0]
+
+
+def failing_after(chunks):
+    calls = []
+
+    def import_chunk(conn, frame, mapping):
+        if len(calls) == chunks:
+            raise RuntimeError("import interrupted")
+        calls.append(len(frame))
+        return backlog_db.import_backlog_csv(conn, frame, mapping)
+
+    return import_chunk
+
+
+def stream(mapping, import_chunk=backlog_db.import_backlog_csv):
+    return backlog_db.stream_csv_import(
+        csv_file(25), "file-hash", "backlog", mapping, import_chunk, chunk_rows=10
+    )
+
+
+def test_import_backlog_csv_validates_columns_and_reports_skips(pooled_db):
+    conn = pooled_db
+    frame = pd.DataFrame(
+        {
+            "Task": ["Imported 1", " Imported 2 ", None, "Imported 4", "Imported 5", "Imported 6"],
+            "Theme": ["Billing", "Billing", "Billing", "  ", "Search", "Search"],
+            "Estimate": ["3", "1,000", "2", "5", "2.5", None],
+            "Evaluation": ["High", None, None, None, None, "High"],
+        }
+    )
+    mapping = {**MAPPING, "task_details": None, "estimation": "Estimate", "evaluation": "Evaluation"}
+
+    counts, skip_reasons = backlog_db.import_backlog_csv(conn, frame, mapping)
+
+    assert counts == {"inserted": 3}
+    assert skip_reasons == {"missing_task": 1, "missing_theme": 1, "invalid_estimation": 1}
+    rows = conn.execute(
+        "SELECT task, theme, estimation, evaluation FROM backlog "
+        "WHERE task LIKE 'Imported %' ORDER BY task"
+    ).fetchall()
+    assert [tuple(row) for row in rows] == [
+        ("Imported 1", "Billing", 3, "High"),
+        ("Imported 2", "Billing", 1000, None),
+        ("Imported 6", "Search", None, "High"),
+    ]
+    assert {"Billing", "Search"} <= {
+        row["name"] for row in conn.execute("SELECT name FROM theme")
+    }
+    assert conn.execute("SELECT COUNT(*) FROM evaluation WHERE name = 'High'").fetchone()[0] == 1
+
+
+def test_import_backlog_csv_indexes_rows_and_restores_the_search_trigger(pooled_db):
+    conn = pooled_db
+    frame = pd.DataFrame(
+        {"Task": [f"Imported {index}" for index in range(7)], "Details": None, "Theme": "Theme"}
+    )
+
+    backlog_db.import_backlog_csv(conn, frame, MAPPING, batch_size=3)
+
+    assert imported_count(conn) == 7
+    assert conn.execute(
+        "SELECT COUNT(*) FROM search_index WHERE kind = 'backlog' AND title LIKE 'Imported %'"
+    ).fetchone()[0] == 7
+    assert conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'backlog_search_insert'"
+    ).fetchone()
+
+
+def search_insert_trigger(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'backlog_search_insert'"
+    ).fetchone()
+
+
+def load_then_fail(conn):
+    with pytest.raises(RuntimeError):
+        with backlog_db.deferred_search_index(conn, "backlog"):
+            conn.execute("INSERT INTO backlog (task, theme) VALUES ('Half loaded', 'Ops')")
+            raise RuntimeError("load failed")
+
+
+def test_deferred_search_index_keeps_the_trigger_when_the_load_rolls_back(pooled_db):
+    conn = pooled_db
+    conn.commit()
+    load_then_fail(conn)
+    conn.rollback()
+    assert search_insert_trigger(conn)
+    assert conn.execute("SELECT COUNT(*) FROM backlog WHERE task = 'Half loaded'").fetchone()[0] == 0
+
+
+def test_deferred_search_index_indexes_rows_left_by_a_failed_load(pooled_db):
+    conn = pooled_db
+    conn.commit()
+    load_then_fail(conn)
+    conn.commit()
+    assert search_insert_trigger(conn)
+    assert backlog_db.search_items("Half loaded", ("backlog",))
+
+
+def test_stream_csv_import_defers_indexing_without_schema_changes(pooled_db):
+    schema_version = pooled_db.execute("PRAGMA schema_version").fetchone()[0]
+
+    stream(MAPPING)
+
+    assert pooled_db.execute("PRAGMA schema_version").fetchone()[0] == schema_version
+    assert pooled_db.execute("SELECT COUNT(*) FROM search_index_deferral").fetchone()[0] == 0
+    assert pooled_db.execute(
+        "SELECT COUNT(*) FROM search_index WHERE kind = 'backlog' AND title LIKE 'Imported %'"
+    ).fetchone()[0] == 25
+    pooled_db.execute("INSERT INTO backlog (task, theme) VALUES ('After import', 'Ops')")
+    pooled_db.commit()
+    assert backlog_db.search_items("After import", ("backlog",))
+
+
+def test_read_csv_preview_reads_only_the_first_rows():
+    preview = backlog_db.read_csv_preview(csv_file(100), rows=5)
+    assert list(preview.columns) == ["Task", "Details", "Theme"]
+    assert len(preview) == 5
+
+
+def test_stream_csv_import_reports_progress_per_chunk(pooled_db):
+    progress = []
+    counts, skip_reasons = backlog_db.stream_csv_import(
+        csv_file(25),
+        "file-hash",
+        "backlog",
+        MAPPING,
+        backlog_db.import_backlog_csv,
+        lambda rows, fraction: progress.append((rows, fraction)),
+        chunk_rows=10,
+    )
+
+    assert counts == {"inserted": 25}
+    assert skip_reasons == {"missing_task": 0, "missing_theme": 0, "invalid_estimation": 0}
+    assert [rows for rows, _ in progress] == [10, 20, 25]
+    assert progress[-1][1] == 1.0
+    assert imported_count(pooled_db) == 25
+
+
+def test_stream_csv_import_resumes_after_a_failed_chunk(pooled_db):
+    with pytest.raises(RuntimeError):
+        stream(MAPPING, failing_after(2))
+    assert imported_count(pooled_db) == 20
+    assert backlog_db.fetch_csv_import_progress("file-hash", "backlog")["rows_done"] == 20
+
+    counts, _ = stream(MAPPING)
+
+    assert counts["inserted"] == 25
+    assert imported_count(pooled_db) == 25
+    assert backlog_db.fetch_csv_import_progress("file-hash", "backlog") is None
+
+
+def test_stream_csv_import_refuses_to_resume_with_a_changed_mapping(pooled_db):
+    with pytest.raises(RuntimeError):
+        stream(MAPPING, failing_after(2))
+    changed = {**MAPPING, "task_details": None}
+
+    with pytest.raises(ValueError):
+        stream(changed)
+    assert imported_count(pooled_db) == 20
+    assert backlog_db.fetch_csv_import_progress("file-hash", "backlog")["rows_done"] == 20
+
+    backlog_db.clear_csv_import_progress("file-hash", "backlog")
+    counts, _ = stream(changed)
+
+    assert counts["inserted"] == 25
+    assert imported_count(pooled_db) == 45
+
+
+def test_stream_csv_import_records_options_with_the_progress(pooled_db):
+    calls = []
+
+    def import_chunk(conn, frame, mapping, update_existing=False):
+        calls.append(update_existing)
+        if len(calls) == 2:
+            raise RuntimeError("import interrupted")
+        return backlog_db.import_backlog_csv(conn, frame, mapping)
+
+    with pytest.raises(RuntimeError):
+        backlog_db.stream_csv_import(
+            csv_file(25),
+            "file-hash",
+            "backlog",
+            MAPPING,
+            import_chunk,
+            chunk_rows=10,
+            options={"update_existing": True},
+        )
+    assert calls == [True, True]
+    with pytest.raises(ValueError):
+        backlog_db.stream_csv_import(
+            csv_file(25),
+            "file-hash",
+            "backlog",
+            MAPPING,
+            import_chunk,
+            chunk_rows=10,
+            options={"update_existing": False},
+        )
+    assert imported_count(pooled_db) == 10
+
+
+def test_import_dependency_csv_skips_rows_without_task_or_team(pooled_db):
+    frame = pd.DataFrame(
+        {"Task": ["Deploy API", None, "Rotate keys"], "Team": ["Ops", "Ops", " "]}
+    )
+    counts, skip_reasons = backlog_db.import_dependency_csv(
+        pooled_db, frame, {"task": "Task", "sub_task": None, "team": "Team"}
+    )
+    assert counts["inserted"] == 1
+    assert skip_reasons == {"missing_task": 1, "missing_team": 1, "duplicate": 0}
+
+
+DEPENDENCY_MAPPING = {"task": "Task", "sub_task": "Sub-task", "team": "Team"}
+
+
+def import_dependencies(conn, update_existing):
+    conn.executemany(
+        "INSERT INTO dependency (task, sub_task, team) VALUES (?, ?, ?)",
+        [("Deploy API", "Schema", "Ops"), ("Rotate keys", None, "Security")],
+    )
+    frame = pd.DataFrame(
+        {
+            "Task": ["deploy  api", "Rotate keys", "Write runbook", "Rotate keys"],
+            "Sub-task": ["SCHEMA", None, None, None],
+            "Team": ["Ops", "Security", "Ops", "Security"],
+        }
+    )
+    counts, skip_reasons = backlog_db.import_dependency_csv(
+        conn, frame, DEPENDENCY_MAPPING, update_existing=update_existing
+    )
+    assert skip_reasons["duplicate"] == 1
+    return counts
+
+
+def test_import_dependency_csv_reports_changed_rows_it_leaves_alone(pooled_db):
+    counts = import_dependencies(pooled_db, update_existing=False)
+
+    assert counts == {
+        "inserted": 1,
+        "updated": 0,
+        "changed_not_updated": 1,
+        "unchanged": 1,
+    }
+    assert pooled_db.execute(
+        "SELECT COUNT(*) FROM dependency WHERE task = 'Deploy API' AND sub_task = 'Schema'"
+    ).fetchone()[0] == 1
+
+
+def test_import_dependency_csv_updates_changed_rows_when_asked(pooled_db):
+    counts = import_dependencies(pooled_db, update_existing=True)
+
+    assert counts == {
+        "inserted": 1,
+        "updated": 1,
+        "changed_not_updated": 0,
+        "unchanged": 1,
+    }
+    assert pooled_db.execute(
+        "SELECT COUNT(*) FROM dependency WHERE task = 'deploy api' AND sub_task = 'SCHEMA'"
+    ).fetchone()[0] == 1
+
+
+def test_import_dependency_csv_matches_tasks_outside_plain_ascii(pooled_db):
+    pooled_db.executemany(
+        "INSERT INTO dependency (task, sub_task, team) VALUES (?, ?, ?)",
+        [("Éclair  rollout", None, "Ops"), ("STRASSE map", None, "Ops")],
+    )
+    frame = pd.DataFrame(
+        {"Task": ["éclair rollout", "Straße map"], "Sub-task": None, "Team": "Ops"}
+    )
+    counts, _ = backlog_db.import_dependency_csv(pooled_db, frame, DEPENDENCY_MAPPING)
+
+    assert counts["inserted"] == 0
+    assert counts["changed_not_updated"] == 2
+
+
+def test_import_dependency_csv_matches_rows_stored_with_padding(pooled_db):
+    pooled_db.executemany(
+        "INSERT INTO dependency (task, sub_task, team) VALUES (?, ?, ?)",
+        [(" Login flow ", None, "Auth"), ("Pay", " Refund ", "PC")],
+    )
+    frame = pd.DataFrame(
+        {"Task": ["Login flow", "pay"], "Sub-task": [None, "refund"], "Team": ["Auth", "PC"]}
+    )
+    counts, _ = backlog_db.import_dependency_csv(pooled_db, frame, DEPENDENCY_MAPPING)
+
+    assert counts["inserted"] == 0
+    assert counts["changed_not_updated"] + counts["unchanged"] == 2
+    assert pooled_db.execute(
+        "SELECT COUNT(*) FROM dependency WHERE TRIM(task) IN ('Login flow', 'Pay')"
+    ).fetchone()[0] == 2
@@ -0,0 +1,166 @@
+import base64
+import io
+
+from PIL import Image
+
+import backlog_db
+
+PNG_BYTES = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+
+def screenshot(width=1200, height=800):
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), "navy").save(output, format="PNG")
+    return output.getvalue()
+
+
+def image_rows(conn):
+    return {
+        row["hash"]: bytes(row["data"])
+        for row in conn.execute("SELECT hash, data FROM image")
+    }
+
+
+def test_migration_moves_backlog_blobs_into_the_image_store(baseline_conn):
+    conn = baseline_conn
+    conn.execute("UPDATE backlog SET image_blob = ? WHERE id IN (1, 2)", (b"shared",))
+    conn.execute("UPDATE backlog SET image_blob = ? WHERE id = 3", (b"own",))
+    conn.commit()
+    backlog_db.migrate_db(conn)
+
+    assert set(image_rows(conn).values()) == {b"shared", b"own"}
+    hashes = dict(
+        conn.execute("SELECT id, image_hash FROM backlog WHERE id IN (1, 2, 3)").fetchall()
+    )
+    assert hashes[1] == hashes[2] == backlog_db.image_hash_for(b"shared")
+    assert hashes[3] == backlog_db.image_hash_for(b"own")
+    assert conn.execute(
+        "SELECT COUNT(*) FROM backlog WHERE image_blob IS NOT NULL"
+    ).fetchone()[0] == 0
+
+
+def store(conn, image_bytes, image_meta=None):
+    return backlog_db.store_image(conn, backlog_db.prepare_image(image_bytes, image_meta))
+
+
+def test_store_image_keeps_one_row_per_content_hash(pooled_db):
+    conn = pooled_db
+    first = store(conn, b"screenshot")
+    second = store(conn, b"screenshot")
+    assert first == second == backlog_db.image_hash_for(b"screenshot")
+    assert list(image_rows(conn)) == [first]
+    assert backlog_db.prepare_image(b"") is None
+    assert backlog_db.store_image(conn, None) is None
+
+
+def test_images_are_released_with_their_last_backlog(pooled_db):
+    conn = pooled_db
+    image_hash = store(conn, b"shared")
+    conn.execute("UPDATE backlog SET image_hash = ? WHERE id IN (1, 2)", (image_hash,))
+    conn.execute("DELETE FROM backlog WHERE id = 1")
+    assert image_hash in image_rows(conn)
+    conn.execute("UPDATE backlog SET image_hash = NULL WHERE id = 2")
+    assert image_hash not in image_rows(conn)
+
+
+def pasted(image_bytes, mime_type="image/png", width=800, height=600):
+    return {
+        "dataUrl": f"data:{mime_type};base64," + base64.b64encode(image_bytes).decode(),
+        "width": width,
+        "height": height,
+        "originalWidth": 3200,
+        "originalHeight": 2400,
+        "pastedAt": 1,
+    }
+
+
+def test_decode_pasted_image_reads_dimensions_from_the_image():
+    png = screenshot(800, 600)
+    image_bytes, image_meta, error = backlog_db.decode_pasted_image(
+        pasted(png, width=1, height=1), 1600
+    )
+    assert error is None
+    assert image_bytes == png
+    assert (image_meta["mime_type"], image_meta["width"], image_meta["height"]) == (
+        "image/png",
+        800,
+        600,
+    )
+    assert image_meta["original_width"] == 3200
+
+
+def test_decode_pasted_image_rejects_invalid_payloads():
+    cases = [
+        {"dataUrl": "not an image"},
+        pasted(screenshot(), mime_type="image/webp"),
+        pasted(screenshot(2000, 600)),
+        pasted(PNG_BYTES),
+        pasted(b"plain text"),
+    ]
+    for value in cases:
+        image_bytes, image_meta, error = backlog_db.decode_pasted_image(value, 1600)
+        assert (image_bytes, image_meta) == (None, None)
+        assert error
+
+
+def test_store_image_records_mime_type_and_dimensions(pooled_db):
+    conn = pooled_db
+    image_hash = store(conn, PNG_BYTES, {"mime_type": "image/png", "width": 800, "height": 600})
+    row = conn.execute(
+        "SELECT mime_type, width, height FROM image WHERE hash = ?", (image_hash,)
+    ).fetchone()
+    assert tuple(row) == ("image/png", 800, 600)
+
+
+def test_make_thumbnail_shrinks_to_the_thumbnail_size():
+    thumbnail = backlog_db.make_thumbnail(screenshot())
+    with Image.open(io.BytesIO(thumbnail)) as image:
+        assert image.format == "WEBP"
+        assert image.size == (backlog_db.IMAGE_THUMBNAIL_SIZE, 213)
+    assert backlog_db.make_thumbnail(PNG_BYTES) is None
+
+
+def test_prepare_image_builds_a_thumbnail_only_for_new_images(pooled_db):
+    image_bytes = screenshot()
+    prepared = backlog_db.prepare_image(image_bytes, {"width": 1200, "height": 800})
+    assert prepared["mime_type"] == "image/png"
+    assert prepared["thumbnail"] is not None
+
+    with backlog_db.write_conn() as conn:
+        image_hash = backlog_db.store_image(conn, prepared)
+
+    assert backlog_db.prepare_image(image_bytes)["thumbnail"] is None
+    with backlog_db.write_conn() as conn:
+        assert backlog_db.store_image(conn, backlog_db.prepare_image(image_bytes)) == image_hash
+    row = pooled_db.execute(
+        "SELECT COUNT(*) AS images, MAX(thumbnail IS NOT NULL) AS has_thumbnail FROM image"
+    ).fetchone()
+    assert (row["images"], row["has_thumbnail"]) == (1, 1)
+
+
+def test_fetch_image_thumbnail_serves_the_thumbnail_stored_with_the_image(pooled_db):
+    with backlog_db.write_conn() as conn:
+        image_hash = store(conn, screenshot())
+    stored = pooled_db.execute(
+        "SELECT thumbnail FROM image WHERE hash = ?", (image_hash,)
+    ).fetchone()["thumbnail"]
+    backlog_db.fetch_image_thumbnail.clear()
+    assert backlog_db.fetch_image_thumbnail(image_hash) == bytes(stored)
+    assert backlog_db.fetch_image_thumbnail("missing") is None
+
+
+def test_backfill_image_thumbnails_fills_only_missing_thumbnails(pooled_db):
+    with backlog_db.write_conn() as conn:
+        old_hash = store(conn, screenshot())
+        conn.execute("UPDATE image SET thumbnail = NULL WHERE hash = ?", (old_hash,))
+        broken_hash = store(conn, b"not an image")
+    backlog_db.fetch_image_thumbnail.clear()
+    assert backlog_db.fetch_image_thumbnail(old_hash) is None
+    assert backlog_db.fetch_image_thumbnail(broken_hash) is None
+
+    assert backlog_db.backfill_image_thumbnails(batch_size=1) == 1
+    thumbnail = backlog_db.fetch_image_thumbnail(old_hash)
+    with Image.open(io.BytesIO(thumbnail)) as image:
+        assert image.format == "WEBP"
+    assert backlog_db.fetch_image_thumbnail(broken_hash) is None
+    assert backlog_db.backfill_image_thumbnails() == 0
@@ -0,0 +1,44 @@
+import backlog_db
+
+
+def test_label_index_maps_ids_and_labels_both_ways():
+    index = backlog_db.LabelIndex([(1, "Alpha"), (2, "Beta"), (3, "Gamma")])
+    assert len(index) == 3
+    assert index.labels_for([3, 1, 99]) == ["Gamma", "Alpha"]
+    assert index.ids_for(["Beta", "Missing"]) == [2]
+
+
+def test_label_index_search_matches_every_term_up_to_the_limit():
+    index = backlog_db.LabelIndex(
+        [(item_id, f"Payment step {item_id}") for item_id in range(1, 6)]
+        + [(6, "Refund flow")]
+    )
+    assert index.search("STEP pay", limit=3) == [
+        "Payment step 1",
+        "Payment step 2",
+        "Payment step 3",
+    ]
+    assert index.search("refund") == ["Refund flow"]
+    assert index.search("refund payment") == []
+
+
+def test_label_indexes_are_rebuilt_after_a_write(pooled_db):
+    index = backlog_db.fetch_sub_backlog_label_index()
+    assert backlog_db.fetch_sub_backlog_label_index() is index
+    with backlog_db.write_conn() as conn:
+        new_id = backlog_db.insert_sub_backlog(conn, "Checkout", None)
+    rebuilt = backlog_db.fetch_sub_backlog_label_index()
+    assert rebuilt is not index
+    assert rebuilt.labels_for([new_id]) == [f"Checkout (#{new_id})"]
+
+
+def test_theme_and_evaluation_label_indexes_list_names_in_order(pooled_db):
+    with backlog_db.write_conn() as conn:
+        backlog_db.insert_theme(conn, "Zeta")
+        backlog_db.insert_theme(conn, "Alpha")
+        backlog_db.insert_evaluation(conn, "High")
+    themes = backlog_db.fetch_theme_label_index()
+    assert list(themes.labels) == sorted(themes.labels)
+    assert {"Alpha", "Zeta"} <= set(themes.labels)
+    evaluations = backlog_db.fetch_evaluation_label_index()
+    assert evaluations.labels_for(evaluations.ids_for(["High"])) == ["High"]
@@ -0,0 +1,144 @@
+import json
+
+import pandas as pd
+
+import backlog_db
+
+
+def note_statuses(conn, note_ids):
+    return {
+        row["id"]: row["status"]
+        for row in conn.execute(
+            "SELECT id, status FROM meeting_note WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(note_ids)),),
+        )
+    }
+
+
+def test_update_meeting_note_statuses_skips_rows_changed_since_the_snapshot(migrated_conn):
+    conn = migrated_conn
+    conn.executemany(
+        "UPDATE meeting_note SET status = ? WHERE id = ?",
+        [("open", 1), ("open", 2), ("completed", 3)],
+    )
+    conn.execute("DELETE FROM meeting_note WHERE id = 4")
+    changes = pd.DataFrame(
+        {
+            "id": [1, 2, 3, 4],
+            "expected_status": ["open", "open", "open", "open"],
+            "status": ["in-progress", "completed", "in-progress", "completed"],
+        }
+    )
+
+    updated, conflicts = backlog_db.update_meeting_note_statuses(conn, changes)
+
+    assert updated == 2
+    assert conflicts["id"].tolist() == [3, 4]
+    assert conflicts["current_status"].tolist()[0] == "completed"
+    assert pd.isna(conflicts["current_status"].tolist()[1])
+    assert note_statuses(conn, [1, 2, 3]) == {1: "in-progress", 2: "completed", 3: "completed"}
+
+
+def test_insert_meeting_note_stores_normalized_values(migrated_conn):
+    note_id = backlog_db.insert_meeting_note(
+        migrated_conn, None, " 2024-05-01 ", "Topic", " TODO ", "note", "Open "
+    )
+    row = migrated_conn.execute(
+        "SELECT note_type, status, meeting_date_key FROM meeting_note WHERE id = ?",
+        (note_id,),
+    ).fetchone()
+    assert tuple(row) == ("todo", "open", "2024-05-01 00:00:00")
+
+
+def test_meeting_note_triggers_normalize_raw_writes(migrated_conn):
+    conn = migrated_conn
+    conn.execute(
+        "INSERT INTO meeting_note (meeting_date, note_type, note, status) "
+        "VALUES ('2024-04-02 10:00', 'Decision', 'raw', ' Completed')"
+    )
+    note_id = conn.execute("SELECT MAX(id) FROM meeting_note").fetchone()[0]
+    conn.execute(
+        "UPDATE meeting_note SET meeting_date = '  ', status = 'In-Progress' WHERE id = ?",
+        (note_id,),
+    )
+    row = conn.execute(
+        "SELECT note_type, status, meeting_date_key FROM meeting_note WHERE id = ?",
+        (note_id,),
+    ).fetchone()
+    assert tuple(row) == ("decision", "in-progress", None)
+
+
+def test_migration_normalizes_existing_notes(migrated_conn):
+    assert migrated_conn.execute(
+        """
+        SELECT COUNT(*) FROM meeting_note
+        WHERE note_type != LOWER(TRIM(note_type)) OR status != LOWER(TRIM(status))
+        """
+    ).fetchone()[0] == 0
+    keys = {
+        row["meeting_date"]: row["meeting_date_key"]
+        for row in migrated_conn.execute("SELECT meeting_date, meeting_date_key FROM meeting_note")
+    }
+    expected = {
+        None: None,
+        "": None,
+        "2024-03-01": "2024-03-01 00:00:00",
+        "2024-04-02 10:00": "2024-04-02 10:00:00",
+    }
+    assert keys == {meeting_date: expected[meeting_date] for meeting_date in keys}
+
+
+def test_fetch_todo_meeting_notes_orders_blank_dates_last(pooled_db):
+    with backlog_db.write_conn() as conn:
+        conn.execute("DELETE FROM meeting_note")
+        for meeting_date in ("2024-03-01", "", "2024-04-02 10:00", None):
+            backlog_db.insert_meeting_note(conn, None, meeting_date, None, "Todo", "note")
+    rows = backlog_db.fetch_todo_meeting_notes()
+    assert [row["meeting_date"] for row in rows] == ["2024-04-02 10:00", "2024-03-01", None, ""]
+
+
+def walk_feed(filters, page_size):
+    pages = []
+    after = None
+    while True:
+        rows, has_more = backlog_db.fetch_meeting_note_feed(filters, page_size, after)
+        pages.append([row["id"] for row in rows])
+        if not has_more:
+            return pages
+        after = (rows[-1]["meeting_date_key"], rows[-1]["id"])
+
+
+def test_fetch_meeting_note_feed_walks_dated_then_undated_notes(pooled_db):
+    with backlog_db.get_conn() as conn:
+        expected = [
+            row["id"]
+            for row in conn.execute(
+                "SELECT id FROM meeting_note ORDER BY meeting_date_key DESC, id DESC"
+            )
+        ]
+    pages = walk_feed((), 6)
+    assert [len(page) for page in pages] == [6, 6, 6, 2]
+    assert [note_id for page in pages for note_id in page] == expected
+
+
+def test_meeting_note_feed_filters_run_in_sql(pooled_db):
+    with backlog_db.write_conn() as conn:
+        conn.execute("DELETE FROM meeting_note")
+        note_ids = {
+            (meeting_date, status): backlog_db.insert_meeting_note(
+                conn, None, meeting_date, None, "todo", f"rollout {status}", status
+            )
+            for meeting_date in ("2024-02-28", "2024-03-01", "2024-03-31 18:00", "later")
+            for status in ("open", "completed")
+        }
+    filters = (("status", "open"), ("date_from", "2024-03-01"), ("date_to", "2024-03-31"))
+
+    pages = walk_feed(filters, 1)
+
+    assert pages == [
+        [note_ids[("2024-03-31 18:00", "open")]],
+        [note_ids[("2024-03-01", "open")]],
+    ]
+    assert backlog_db.count_meeting_notes(filters) == 2
+    assert backlog_db.count_meeting_notes((("search", "rollout compl"),)) == 4
+    assert backlog_db.count_meeting_notes() == 8
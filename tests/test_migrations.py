@@ -0,0 +1,241 @@
+import sqlite3
+
+import pytest
+
+import backlog_db
+
+
+def rollup_rows(conn):
+    return {
+        (row["sprint"], row["team"]): (row["total_estimation"], row["item_count"])
+        for row in conn.execute(
+            "SELECT sprint, team, total_estimation, item_count FROM sprint_team_rollup"
+        )
+    }
+
+
+def recomputed_rollup_rows(conn):
+    return {
+        (row["sprint"], row["team"]): (row["total_estimation"], row["item_count"])
+        for row in conn.execute(
+            """
+            SELECT sprint, team, COALESCE(SUM(estimation), 0) AS total_estimation,
+                COUNT(*) AS item_count
+            FROM backlog
+            WHERE sprint IS NOT NULL AND team IS NOT NULL
+            GROUP BY sprint, team
+            """
+        )
+    }
+
+
+def test_migrate_db_upgrades_baseline_to_latest_version(baseline_conn):
+    latest = backlog_db.SCHEMA_MIGRATIONS[-1][0]
+    assert backlog_db.migrate_db(baseline_conn) == latest
+    applied = [
+        row["version"]
+        for row in baseline_conn.execute("SELECT version FROM schema_version ORDER BY version")
+    ]
+    assert applied == [version for version, _, _ in backlog_db.SCHEMA_MIGRATIONS]
+    assert backlog_db.migrate_db(baseline_conn) == latest
+    assert baseline_conn.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0] == len(
+        applied
+    )
+
+
+def test_migrate_db_rolls_back_a_failed_step_with_its_version(baseline_conn, monkeypatch):
+    def failing_step(conn):
+        backlog_db.execute_script(
+            conn,
+            """
+            CREATE TABLE half_done (id INTEGER PRIMARY KEY);
+            INSERT INTO missing_table VALUES (1);
+            """,
+        )
+
+    latest = backlog_db.SCHEMA_MIGRATIONS[-1][0]
+    monkeypatch.setattr(
+        backlog_db,
+        "SCHEMA_MIGRATIONS",
+        [*backlog_db.SCHEMA_MIGRATIONS, (latest + 1, "failing", failing_step)],
+    )
+    with pytest.raises(sqlite3.OperationalError):
+        backlog_db.migrate_db(baseline_conn)
+
+    assert backlog_db.fetch_schema_version(baseline_conn) == latest
+    assert (
+        baseline_conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'half_done'").fetchone()
+        is None
+    )
+
+
+def test_migrate_db_keeps_baseline_rows(baseline_conn):
+    before = baseline_conn.execute(
+        "SELECT id, task, estimation, team, sprint FROM backlog ORDER BY id"
+    ).fetchall()
+    backlog_db.migrate_db(baseline_conn)
+    after = baseline_conn.execute(
+        "SELECT id, task, estimation, team, sprint FROM backlog ORDER BY id"
+    ).fetchall()
+    assert [tuple(row) for row in after] == [tuple(row) for row in before]
+    assert backlog_db.find_unindexed_queries(baseline_conn) == []
+
+
+def test_find_unindexed_queries_reports_reverse_lookup_scans(migrated_conn):
+    for name, _, _ in backlog_db.SCHEMA_INDEXES:
+        migrated_conn.execute(f"DROP INDEX {name}")
+    unindexed = dict(backlog_db.find_unindexed_queries(migrated_conn))
+    assert "backlogs for dependency" in unindexed
+    assert "theme rename" in unindexed
+    assert "todo meeting notes" in unindexed
+    assert "dependencies for backlog" not in unindexed
+    backlog_db.ensure_indexes(migrated_conn)
+    assert backlog_db.find_unindexed_queries(migrated_conn) == []
+
+
+def test_init_db_creates_the_schema_once_per_process(pool):
+    backlog_db.init_db.clear()
+    latest = backlog_db.SCHEMA_MIGRATIONS[-1][0]
+    assert backlog_db.init_db() == latest
+    with backlog_db.get_conn() as conn:
+        conn.execute("DELETE FROM schema_version")
+    assert backlog_db.init_db() == latest
+    with backlog_db.get_conn() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM schema_version").fetchone()[0] == 0
+    backlog_db.init_db.clear()
+
+
+def test_migration_backfills_sprint_team_rollup(migrated_conn):
+    expected = recomputed_rollup_rows(migrated_conn)
+    assert expected
+    assert rollup_rows(migrated_conn) == expected
+
+
+def test_sprint_team_rollup_follows_backlog_writes(migrated_conn):
+    conn = migrated_conn
+    conn.execute(
+        "INSERT INTO backlog (task, theme, estimation, team, sprint) VALUES (?, ?, ?, ?, ?)",
+        ("new", "theme", 13, "Team 1", "Sprint 9"),
+    )
+    conn.execute(
+        "INSERT INTO backlog (task, theme, estimation, team, sprint) VALUES (?, ?, ?, ?, ?)",
+        ("no sprint", "theme", 3, "Team 2", None),
+    )
+    conn.execute("UPDATE backlog SET estimation = 21 WHERE id = 1")
+    conn.execute("UPDATE backlog SET sprint = 'Sprint 10' WHERE id IN (2, 3)")
+    conn.execute("UPDATE backlog SET team = NULL WHERE id = 4")
+    conn.execute("UPDATE backlog SET team = 'Team 2', sprint = 'Sprint 1' WHERE id = 5")
+    conn.execute("UPDATE backlog SET estimation = NULL WHERE id = 6")
+    conn.execute("DELETE FROM backlog WHERE id IN (7, 8, 9)")
+    conn.commit()
+    assert rollup_rows(conn) == recomputed_rollup_rows(conn)
+
+
+def test_sprint_team_rollup_drops_emptied_cells(migrated_conn):
+    conn = migrated_conn
+    conn.execute("DELETE FROM backlog")
+    conn.commit()
+    assert rollup_rows(conn) == {}
+
+
+def test_team_capacity_upserts_and_clears(pooled_db):
+    with backlog_db.get_conn() as conn:
+        backlog_db.upsert_team_capacity(conn, "Team 1", 20)
+        backlog_db.upsert_team_capacity(conn, "Team 2", 15)
+    with backlog_db.get_conn() as conn:
+        backlog_db.upsert_team_capacity(conn, "Team 1", 25)
+        backlog_db.upsert_team_capacity(conn, "Team 2", None)
+    assert backlog_db.fetch_team_capacities() == {"Team 1": 25}
+
+
+def link_count_rows(conn):
+    columns = ", ".join(backlog_db.BACKLOG_LINK_COUNTS)
+    return {
+        row[0]: tuple(row[1:])
+        for row in conn.execute(f"SELECT backlog_id, {columns} FROM backlog_link_count")
+        if any(row[1:])
+    }
+
+
+def recomputed_link_count_rows(conn):
+    counts = ", ".join(
+        f"(SELECT COUNT(*) FROM {link_table} l WHERE l.backlog_id = b.id)"
+        for link_table in backlog_db.BACKLOG_LINK_COUNTS.values()
+    )
+    return {
+        row[0]: tuple(row[1:])
+        for row in conn.execute(f"SELECT b.id, {counts} FROM backlog b")
+        if any(row[1:])
+    }
+
+
+def test_migration_backfills_backlog_link_counts(migrated_conn):
+    expected = recomputed_link_count_rows(migrated_conn)
+    assert expected
+    assert link_count_rows(migrated_conn) == expected
+
+
+def test_backlog_link_counts_follow_link_writes(migrated_conn):
+    conn = migrated_conn
+    conn.execute(
+        "INSERT INTO backlog (task, theme, team, sprint) VALUES ('linked', 'theme', NULL, NULL)"
+    )
+    new_id = conn.execute("SELECT MAX(id) FROM backlog").fetchone()[0]
+    conn.executemany(
+        "INSERT OR IGNORE INTO backlog_dependency (backlog_id, dependency_id) VALUES (?, ?)",
+        [(new_id, 1), (new_id, 2), (1, 3), (2, 4)],
+    )
+    conn.execute(
+        "INSERT OR IGNORE INTO sub_backlog_backlog (sub_backlog_id, backlog_id) VALUES (1, ?)",
+        (new_id,),
+    )
+    conn.execute(
+        "INSERT OR IGNORE INTO meeting_note_backlog (meeting_note_id, backlog_id) VALUES (1, ?)",
+        (new_id,),
+    )
+    conn.execute(
+        "INSERT INTO backlog (task, theme, team, sprint) VALUES ('moved', 'theme', NULL, NULL)"
+    )
+    conn.execute(
+        "UPDATE backlog_dependency SET backlog_id = ? WHERE backlog_id = 2",
+        (new_id + 1,),
+    )
+    conn.execute("DELETE FROM sub_backlog_backlog WHERE backlog_id IN (3, 4)")
+    conn.execute("DELETE FROM meeting_note_backlog WHERE meeting_note_id = 2")
+    conn.commit()
+    assert link_count_rows(conn) == recomputed_link_count_rows(conn)
+
+
+def test_backlog_link_counts_follow_cascading_deletes(migrated_conn):
+    conn = migrated_conn
+    conn.execute("DELETE FROM dependency WHERE id IN (1, 2)")
+    conn.execute("DELETE FROM meeting_note WHERE id = 3")
+    conn.execute("DELETE FROM backlog WHERE id IN (5, 6)")
+    conn.commit()
+    assert link_count_rows(conn) == recomputed_link_count_rows(conn)
+    assert conn.execute(
+        "SELECT COUNT(*) FROM backlog_link_count WHERE backlog_id IN (5, 6)"
+    ).fetchone()[0] == 0
+
+
+def search_triggers(conn):
+    return {
+        row["name"]
+        for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%_search_%'"
+        )
+    }
+
+
+def test_search_index_is_skipped_without_trigram_support(baseline_conn, monkeypatch):
+    monkeypatch.setattr(backlog_db.sqlite3, "sqlite_version_info", (3, 31, 1))
+    backlog_db.migrate_db(baseline_conn)
+
+    assert search_triggers(baseline_conn) == set()
+    baseline_conn.execute("INSERT INTO backlog (task, theme) VALUES ('After', 'Ops')")
+    assert (
+        baseline_conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'search_index'"
+        ).fetchone()
+        is None
+    )
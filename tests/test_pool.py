@@ -0,0 +1,117 @@
+import sqlite3
+import threading
+
+import pytest
+
+import backlog_db
+
+
+def make_pool(size=2, timeout=0.1, health_check_interval=30):
+    return backlog_db.ConnectionPool(
+        backlog_db.open_conn, size, timeout, health_check_interval
+    )
+
+
+def test_get_conn_reuses_one_pooled_connection(pool):
+    with backlog_db.get_conn() as first:
+        pass
+    with backlog_db.get_conn() as second:
+        pass
+    assert first is second
+    assert pool.stats() == {"size": pool.size, "open": 1, "idle": 1}
+
+
+def test_nested_blocks_share_the_outer_connection_and_transaction(pool):
+    with backlog_db.get_conn() as outer:
+        outer.execute("CREATE TABLE item (name TEXT)")
+        with backlog_db.get_conn() as inner:
+            assert inner is outer
+            inner.execute("INSERT INTO item VALUES ('nested')")
+        assert outer.in_transaction
+    with backlog_db.get_conn() as conn:
+        assert conn.execute("SELECT name FROM item").fetchall()[0]["name"] == "nested"
+
+
+def test_connection_commits_on_exit_and_rolls_back_on_error(pool):
+    with backlog_db.get_conn() as conn:
+        conn.execute("CREATE TABLE item (name TEXT)")
+        conn.execute("INSERT INTO item VALUES ('kept')")
+    with pytest.raises(RuntimeError):
+        with backlog_db.get_conn() as conn:
+            conn.execute("INSERT INTO item VALUES ('dropped')")
+            raise RuntimeError("abort")
+    with backlog_db.get_conn() as conn:
+        names = [row["name"] for row in conn.execute("SELECT name FROM item")]
+    assert names == ["kept"]
+
+
+def test_handled_errors_return_the_connection_to_the_pool(pool):
+    with backlog_db.get_conn() as conn:
+        conn.execute("CREATE TABLE item (name TEXT UNIQUE)")
+        conn.execute("INSERT INTO item VALUES ('taken')")
+    for error in (RuntimeError("abort"), sqlite3.IntegrityError("duplicate")):
+        with pytest.raises(type(error)):
+            with backlog_db.get_conn() as conn:
+                conn.execute("INSERT INTO item VALUES ('dropped')")
+                raise error
+    with pytest.raises(sqlite3.IntegrityError):
+        with backlog_db.get_conn() as conn:
+            conn.execute("INSERT INTO item VALUES ('taken')")
+    with backlog_db.get_conn() as reused:
+        assert not reused.in_transaction
+        names = [row["name"] for row in reused.execute("SELECT name FROM item")]
+    assert reused is conn
+    assert names == ["taken"]
+    assert pool.stats() == {"size": pool.size, "open": 1, "idle": 1}
+
+
+def test_sqlite_operational_errors_discard_the_connection(pool):
+    with pytest.raises(sqlite3.OperationalError):
+        with backlog_db.get_conn() as conn:
+            conn.execute("SELECT * FROM missing_table")
+    with backlog_db.get_conn() as replacement:
+        assert replacement is not conn
+    assert pool.stats()["open"] == 1
+
+
+def test_pool_times_out_when_every_connection_is_checked_out(db_path):
+    pool = make_pool(size=1)
+    held = pool.acquire()
+    with pytest.raises(sqlite3.OperationalError):
+        pool.acquire()
+    pool.release(held)
+    assert pool.acquire() is held
+    pool.close()
+
+
+def test_pool_hands_a_released_connection_to_a_waiting_thread(db_path):
+    pool = make_pool(size=1, timeout=5)
+    held = pool.acquire()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.acquire()))
+    waiter.start()
+    pool.release(held)
+    waiter.join(5)
+    assert acquired == [held]
+    assert pool.stats()["open"] == 1
+
+
+def test_pool_replaces_a_broken_idle_connection(db_path):
+    pool = make_pool(size=1, health_check_interval=0)
+    conn = pool.acquire()
+    pool.release(conn)
+    conn.close()
+    replacement = pool.acquire()
+    assert replacement is not conn
+    assert replacement.execute("SELECT 1").fetchone()[0] == 1
+    assert pool.stats()["open"] == 1
+
+
+def test_closed_pool_refuses_new_checkouts(db_path):
+    pool = make_pool()
+    conn = pool.acquire()
+    pool.close()
+    pool.release(conn)
+    assert pool.stats()["open"] == 0
+    with pytest.raises(sqlite3.ProgrammingError):
+        pool.acquire()
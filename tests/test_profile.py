@@ -0,0 +1,65 @@
+import pytest
+
+import backlog_db
+
+
+@pytest.fixture
+def profile(pooled_db, monkeypatch):
+    with backlog_db.get_conn():
+        pass
+    monkeypatch.setattr(backlog_db, "PROFILE_ENABLED", True)
+    profile = backlog_db.RerunProfile("session")
+    backlog_db.get_profile_state().profile = profile
+    yield profile
+    backlog_db.get_profile_state().profile = None
+
+
+def test_profile_times_statements_with_their_row_counts(profile):
+    with backlog_db.get_conn() as conn:
+        conn.execute("SELECT id FROM backlog WHERE id <= 3").fetchall()
+        conn.execute("UPDATE backlog SET lob = 'Retail' WHERE id IN (1, 2)")
+        conn.executemany(
+            "INSERT INTO theme (name) VALUES (?)", [("Profiled 1",), ("Profiled 2",)]
+        )
+
+    sql = [statement["sql"] for statement in profile.statements]
+    assert sql == [
+        "SELECT id FROM backlog WHERE id <= 3",
+        "UPDATE backlog SET lob = 'Retail' WHERE id IN (1, 2)",
+        "INSERT INTO theme (name) VALUES (?)",
+    ]
+    assert [statement["rows"] for statement in profile.statements] == [3, 2, 2]
+    assert all(statement["seconds"] >= 0 for statement in profile.statements)
+
+
+def test_profile_counts_rows_read_by_iterating_the_cursor(profile):
+    with backlog_db.get_conn() as conn:
+        ids = [row["id"] for row in conn.execute("SELECT id FROM backlog WHERE id <= 4")]
+        assert list(conn.execute("SELECT id FROM backlog WHERE id < 0")) == []
+
+    assert ids == [1, 2, 3, 4]
+    assert [statement["rows"] for statement in profile.statements] == [4, 0]
+
+
+def test_profile_summary_breaks_the_rerun_into_sections(profile):
+    profile.mark("setup")
+    with backlog_db.get_conn() as conn:
+        conn.execute("SELECT COUNT(*) FROM backlog").fetchone()
+    profile.mark("Backlog")
+
+    summary = profile.summary()
+    assert summary["session_id"] == "session"
+    assert [section["name"] for section in summary["sections"]] == ["setup", "Backlog"]
+    assert summary["statement_count"] == 1
+    assert summary["total_seconds"] >= summary["sql_seconds"]
+
+
+def test_profiling_is_off_unless_enabled(pooled_db):
+    profile = backlog_db.RerunProfile("session")
+    backlog_db.get_profile_state().profile = profile
+    try:
+        with backlog_db.get_conn() as conn:
+            conn.execute("SELECT 1").fetchone()
+    finally:
+        backlog_db.get_profile_state().profile = None
+    assert profile.statements == []
@@ -0,0 +1,79 @@
+import pytest
+
+import backlog_db
+
+
+def test_written_tables_for_finds_every_written_table():
+    sql = """
+        INSERT OR IGNORE INTO theme (name) VALUES (?);
+        UPDATE backlog SET theme = ? WHERE theme = ?;
+        DELETE FROM backlog_dependency WHERE backlog_id = ?;
+        REPLACE INTO image (hash, data) VALUES (?, ?);
+    """
+    assert backlog_db.written_tables_for(sql) == {
+        "theme",
+        "backlog",
+        "backlog_dependency",
+        "image",
+    }
+    assert backlog_db.written_tables_for("SELECT * FROM backlog") == frozenset()
+    assert backlog_db.written_tables_for(
+        "CREATE TRIGGER t AFTER UPDATE OF image_hash ON backlog BEGIN SELECT 1; END"
+    ) == frozenset()
+
+
+def test_cached_query_serves_cached_rows_until_a_pooled_commit(pooled_db):
+    themes = backlog_db.fetch_themes()
+    pooled_db.execute("INSERT INTO theme (name) VALUES ('Outside the pool')")
+    pooled_db.commit()
+    assert backlog_db.fetch_themes() == themes
+
+    with backlog_db.get_conn() as conn:
+        conn.execute("INSERT INTO theme (name) VALUES ('Committed')")
+
+    assert {"Outside the pool", "Committed"} <= set(backlog_db.fetch_themes())
+
+
+def test_cached_query_returns_a_fresh_list_per_call(pooled_db):
+    themes = backlog_db.fetch_themes()
+    themes.append("Local only")
+    assert "Local only" not in backlog_db.fetch_themes()
+
+
+def test_writes_bump_tables_reached_through_cascades(pooled_db):
+    query_cache = backlog_db.get_query_cache()
+    with backlog_db.get_conn() as conn:
+        query_cache.set_dependents(backlog_db.fetch_table_dependents(conn))
+        conn.execute("INSERT OR IGNORE INTO backlog_dependency VALUES (1, 1)")
+    assert 1 in backlog_db.fetch_backlog_dependency_ids(1)
+
+    with backlog_db.get_conn() as conn:
+        conn.execute("DELETE FROM dependency WHERE id = 1")
+    assert 1 not in backlog_db.fetch_backlog_dependency_ids(1)
+
+
+def test_query_cache_drops_entries_that_read_a_written_table():
+    query_cache = backlog_db.QueryCache(max_entries=10)
+    query_cache.get_or_compute("themes", ("theme",), lambda: ["a"])
+    query_cache.get_or_compute("backlogs", ("backlog",), lambda: ["b"])
+    query_cache.bump(["theme"])
+    assert list(query_cache._entries) == ["backlogs"]
+    assert query_cache.get_or_compute("themes", ("theme",), lambda: ["c"]) == ["c"]
+
+
+def test_copy_result_copies_nested_containers():
+    shared = ([{"ids": [1, 2]}], {"kinds": {3}})
+    copied = backlog_db.copy_result(shared)
+    copied[0][0]["ids"].append(9)
+    copied[1]["kinds"].add(9)
+    assert shared == ([{"ids": [1, 2]}], {"kinds": {3}})
+
+
+def test_cached_query_skips_reads_inside_a_rolled_back_write(pooled_db):
+    with pytest.raises(RuntimeError):
+        with backlog_db.write_conn() as conn:
+            conn.execute("INSERT INTO theme (name) VALUES ('Rolled back')")
+            assert "Rolled back" in backlog_db.fetch_themes()
+            raise RuntimeError("abort")
+
+    assert "Rolled back" not in backlog_db.fetch_themes()
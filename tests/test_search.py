@@ -0,0 +1,92 @@
+import backlog_db
+
+
+def search(text, kinds=None):
+    return [
+        (row["kind"], row["item_id"]) for row in backlog_db.search_items(text, kinds, None)
+    ]
+
+
+def test_migration_indexes_every_searchable_row(migrated_conn):
+    conn = migrated_conn
+    counts = dict(
+        conn.execute("SELECT kind, COUNT(*) FROM search_index GROUP BY kind").fetchall()
+    )
+    assert counts == {
+        kind: conn.execute(f"SELECT COUNT(*) FROM {kind}").fetchone()[0]
+        for kind in backlog_db.SEARCH_SOURCES
+    }
+
+
+def test_search_items_matches_substrings_across_kinds(pooled_db):
+    conn = pooled_db
+    conn.execute("UPDATE backlog SET task = 'Checkout redesign' WHERE id = 1")
+    conn.execute("UPDATE dependency SET sub_task = 'checkout api' WHERE id = 2")
+    conn.execute("UPDATE meeting_note SET topic = 'Checkout' WHERE id = 3")
+    conn.commit()
+    assert set(search("check")) == {("backlog", 1), ("dependency", 2), ("meeting_note", 3)}
+    assert search("check", ("dependency",)) == [("dependency", 2)]
+    assert search("checkout redesign") == [("backlog", 1)]
+    assert search("eckou", ("backlog",)) == [("backlog", 1)]
+    assert search("   ") == []
+
+
+def test_search_items_ranks_title_matches_first(pooled_db):
+    conn = pooled_db
+    conn.execute("UPDATE backlog SET task_details = 'Billing export' WHERE id = 1")
+    conn.execute("UPDATE backlog SET task = 'Billing' WHERE id = 2")
+    conn.commit()
+    assert search("billing", ("backlog",)) == [("backlog", 2), ("backlog", 1)]
+
+
+def test_search_triggers_follow_writes(pooled_db):
+    with backlog_db.get_conn() as conn:
+        conn.execute(
+            "INSERT INTO dependency (task, sub_task, team) VALUES ('Ledger sync', NULL, 'PC')"
+        )
+        dependency_id = conn.execute("SELECT MAX(id) FROM dependency").fetchone()[0]
+    assert backlog_db.search_item_ids("dependency", "ledger") == [dependency_id]
+
+    with backlog_db.get_conn() as conn:
+        conn.execute("UPDATE dependency SET task = 'Journal sync' WHERE id = ?", (dependency_id,))
+    assert backlog_db.search_item_ids("dependency", "ledger") == []
+    assert backlog_db.search_item_ids("dependency", "journal") == [dependency_id]
+
+    with backlog_db.get_conn() as conn:
+        conn.execute("DELETE FROM dependency WHERE id = ?", (dependency_id,))
+    assert backlog_db.search_item_ids("dependency", "journal") == []
+
+
+def test_backlog_filters_use_the_search_index(pooled_db):
+    conn = pooled_db
+    conn.execute("UPDATE backlog SET lob = 'Payments' WHERE id IN (4, 5)")
+    conn.commit()
+    assert backlog_db.count_backlogs((("search", "paym"),)) == 2
+
+
+def test_short_terms_fall_back_to_a_like_scan(pooled_db):
+    conn = pooled_db
+    conn.execute("UPDATE backlog SET task = 'QA sign-off' WHERE id = 1")
+    conn.execute("UPDATE backlog SET task = '検索の改善' WHERE id = 2")
+    conn.commit()
+    assert backlog_db.build_match_query("qa") is None
+    assert backlog_db.build_match_query("qa sign") == '"sign"'
+    assert backlog_db.build_match_query("sign-off") == '"sign-off"'
+    assert search("qa sign", ("backlog",)) == [("backlog", 1)]
+    assert search("検索", ("backlog",)) == [("backlog", 2)]
+    assert backlog_db.count_backlogs((("search", "qa"),)) == 1
+    assert backlog_db.count_backlogs((("search", "の改善"),)) == 1
+
+
+def test_every_term_must_match_whatever_its_length(pooled_db):
+    conn = pooled_db
+    conn.execute(
+        "UPDATE backlog SET task = 'login page', task_details = 'mobile ui' WHERE id = 1"
+    )
+    conn.commit()
+    for text in ("login mobile", "login ui", "ui login", "ui"):
+        assert search(text, ("backlog",)) == [("backlog", 1)], text
+        assert backlog_db.count_backlogs((("search", text),)) == 1, text
+    for text in ("login ux", "page qa"):
+        assert search(text, ("backlog",)) == [], text
+        assert backlog_db.count_backlogs((("search", text),)) == 0, text
@@ -0,0 +1,138 @@
+import backlog_db
+
+
+def linked(conn, backlog_id):
+    return {
+        row["dependency_id"]
+        for row in conn.execute(
+            "SELECT dependency_id FROM backlog_dependency WHERE backlog_id = ?",
+            (backlog_id,),
+        )
+    }
+
+
+def link_rowids(conn, backlog_id):
+    return {
+        row["dependency_id"]: row["rowid"]
+        for row in conn.execute(
+            "SELECT rowid, dependency_id FROM backlog_dependency WHERE backlog_id = ?",
+            (backlog_id,),
+        )
+    }
+
+
+def sync(conn, owner_ids, target_ids):
+    return backlog_db.sync_links(
+        conn, "backlog_dependency", "backlog_id", "dependency_id", owner_ids, target_ids
+    )
+
+
+def test_sync_links_replaces_links_with_the_target_set(migrated_conn):
+    conn = migrated_conn
+    sync(conn, [1], [1, 2, 3])
+    assert sync(conn, [1], [2, 3, 4]) == (1, 1)
+    assert linked(conn, 1) == {2, 3, 4}
+
+
+def test_sync_links_leaves_unchanged_pairs_alone(migrated_conn):
+    conn = migrated_conn
+    sync(conn, [1], [1, 2, 3])
+    before = link_rowids(conn, 1)
+    assert sync(conn, [1], [1, 2, 3]) == (0, 0)
+    sync(conn, [1], [2, 3, 5])
+    after = link_rowids(conn, 1)
+    assert {dependency_id: after[dependency_id] for dependency_id in (2, 3)} == {
+        dependency_id: before[dependency_id] for dependency_id in (2, 3)
+    }
+
+
+def test_sync_links_handles_several_owners_and_only_those(migrated_conn):
+    conn = migrated_conn
+    untouched = linked(conn, 10)
+    sync(conn, [1], [1, 2])
+    sync(conn, [2], [3])
+    assert sync(conn, [1, 2, 1], [5, 5]) == (2, 3)
+    assert linked(conn, 1) == {5}
+    assert linked(conn, 2) == {5}
+    assert linked(conn, 10) == untouched
+
+
+def test_sync_links_with_no_targets_clears_the_owner(migrated_conn):
+    conn = migrated_conn
+    sync(conn, [1], [1, 2])
+    assert sync(conn, [1], []) == (0, 2)
+    assert linked(conn, 1) == set()
+
+
+def test_sync_links_keeps_link_counts_current(migrated_conn):
+    conn = migrated_conn
+    sync(conn, [1, 2], [1, 2, 3])
+    sync(conn, [2], [4])
+    counts = dict(
+        conn.execute(
+            "SELECT backlog_id, dependency_count FROM backlog_link_count "
+            "WHERE backlog_id IN (1, 2)"
+        ).fetchall()
+    )
+    assert counts == {1: 3, 2: 1}
+
+
+
+def test_upsert_helpers_sync_from_either_side(migrated_conn):
+    conn = migrated_conn
+    backlog_db.upsert_backlog_dependencies(conn, 1, [1, 2])
+    backlog_db.upsert_dependency_backlogs(conn, 2, [3])
+    assert linked(conn, 1) == {1}
+    assert linked(conn, 3) >= {2}
+
+
+def test_merge_backlogs_keeps_the_primary_and_drops_the_rest(migrated_conn):
+    conn = migrated_conn
+    backlog_db.merge_backlogs(
+        conn, 1, [1, 2, 3], "merged", None, None, "merged theme", "Must", 5, "PC", None, [4, 5]
+    )
+    row = conn.execute("SELECT task, theme, estimation FROM backlog WHERE id = 1").fetchone()
+    assert tuple(row) == ("merged", "merged theme", 5)
+    assert conn.execute("SELECT COUNT(*) FROM backlog WHERE id IN (2, 3)").fetchone()[0] == 0
+    assert linked(conn, 1) == {4, 5}
+    assert conn.execute("SELECT 1 FROM theme WHERE name = 'merged theme'").fetchone()
+
+
+def test_split_backlog_copies_the_row_and_its_dependencies(migrated_conn):
+    conn = migrated_conn
+    sync(conn, [1], [2, 3])
+    backlog_row = conn.execute("SELECT * FROM backlog WHERE id = 1").fetchone()
+    new_ids = backlog_db.split_backlog(
+        conn, backlog_row, [(" first ", "", 2), ("second", " details ", 3)], [2, 3]
+    )
+    assert conn.execute("SELECT 1 FROM backlog WHERE id = 1").fetchone() is None
+    rows = conn.execute(
+        "SELECT task, task_details, estimation, theme FROM backlog WHERE id IN (?, ?) ORDER BY id",
+        new_ids,
+    ).fetchall()
+    assert [tuple(row) for row in rows] == [
+        ("first", "", 2, backlog_row["theme"]),
+        ("second", "details", 3, backlog_row["theme"]),
+    ]
+    assert all(linked(conn, new_id) == {2, 3} for new_id in new_ids)
+
+
+def test_load_link_id_sets_reads_every_owner_in_one_query(migrated_conn):
+    conn = migrated_conn
+    sync(conn, [1], [2, 3])
+    sync(conn, [2], [])
+    links = backlog_db.load_link_id_sets(
+        conn, "backlog_dependency", "backlog_id", "dependency_id", [1, 2]
+    )
+    assert links == {1: frozenset({2, 3}), 2: frozenset()}
+
+
+def test_fetch_meeting_note_link_id_sets_returns_every_link_kind(pooled_db):
+    with backlog_db.write_conn() as conn:
+        backlog_db.upsert_meeting_note_backlogs(conn, 1, [4])
+        backlog_db.upsert_meeting_note_dependencies(conn, 1, [5])
+    links = backlog_db.fetch_meeting_note_link_id_sets((1, 2))
+    assert set(links) == set(backlog_db.MEETING_NOTE_LINKS)
+    assert links["backlog"][1] == {4}
+    assert links["dependency"][1] == {5}
+    assert links["theme"] == {1: frozenset(), 2: frozenset()}
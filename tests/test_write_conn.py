@@ -0,0 +1,71 @@
+import sqlite3
+import threading
+
+import pytest
+
+import backlog_db
+
+
+def test_connections_open_in_wal_mode(pooled_db):
+    with backlog_db.get_conn() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_write_conn_refuses_to_nest_in_a_plain_connection_block(pooled_db):
+    with backlog_db.get_conn():
+        with pytest.raises(RuntimeError):
+            with backlog_db.write_conn():
+                pass
+    assert not backlog_db.get_write_queue().is_owner()
+
+
+def test_write_conn_holds_the_turn_until_the_outermost_commit(pooled_db):
+    write_queue = backlog_db.get_write_queue()
+    with backlog_db.write_conn() as outer:
+        with backlog_db.write_conn() as inner:
+            assert inner is outer
+            inner.execute("INSERT INTO theme (name) VALUES ('Nested')")
+        assert write_queue.is_owner()
+        assert outer.in_transaction
+    assert not write_queue.is_owner()
+    assert "Nested" in backlog_db.fetch_themes()
+
+
+def test_write_queue_serves_writers_in_arrival_order():
+    write_queue = backlog_db.WriteQueue()
+    order = []
+    started = []
+
+    def writer(name):
+        started.append(name)
+        with write_queue.turn():
+            order.append(name)
+
+    with write_queue.turn():
+        threads = []
+        for name in ("first", "second", "third"):
+            thread = threading.Thread(target=writer, args=(name,))
+            thread.start()
+            threads.append(thread)
+            while len(write_queue._waiting) < len(threads):
+                pass
+    for thread in threads:
+        thread.join(timeout=5)
+    assert order == ["first", "second", "third"]
+
+
+def test_begin_immediate_retries_while_the_database_is_busy(db_path, monkeypatch):
+    monkeypatch.setattr(backlog_db, "DB_WRITE_RETRY_DELAY", 0.01)
+    holder = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+    holder.execute("BEGIN IMMEDIATE")
+    conn = sqlite3.connect(db_path, timeout=0, isolation_level=None)
+    releaser = threading.Timer(0.05, holder.rollback)
+    releaser.start()
+    try:
+        backlog_db.begin_immediate(conn)
+        assert conn.in_transaction
+    finally:
+        releaser.join()
+        conn.rollback()
+        conn.close()
+        holder.close()